@@ -0,0 +1,317 @@
+import asyncio
+from base64 import b64decode
+from collections import deque
+import json
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+from urllib.parse import urlsplit
+import weakref
+
+from algosdk import constants, encoding, error
+from algosdk.v2client.algod import AlgodClient, api_version_path_prefix
+from algosdk.v2client.models import DryrunRequest
+
+from graviton.blackbox import DryRunExecutor, DryRunTransactionParams, _freeze
+from graviton.cache import DryRunMemo
+from graviton.inspector import DryRunInspector, DryRunProperty
+from graviton.models import ExecutionMode, PyTypes
+
+T = TypeVar("T")
+
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_TIMEOUT = 30.0
+
+
+class AsyncAlgodClient:
+    """Non-blocking client for the subset of the algod API that graviton requires.
+
+    Each request is sent over its own HTTP/1.0 connection using asyncio streams
+    so that no thread is ever blocked waiting on algod. Connecting, sending the request and reading
+    the response each raise a `TimeoutError` when they take over `timeout` seconds (unless it's None).
+    """
+
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ):
+        assert (
+            timeout is None or timeout > 0
+        ), f"timeout must be positive but was {timeout}"
+        self.algod_token = algod_token
+        self.algod_address = algod_address
+        self.headers = headers
+        self.timeout = timeout
+
+        url = urlsplit(algod_address)
+        assert url.scheme in (
+            "http",
+            "https",
+        ), f"unsupported scheme in algod address {algod_address}"
+        self._use_ssl: bool = url.scheme == "https"
+        self._host: str = url.hostname or "localhost"
+        self._port: int = url.port or (443 if self._use_ssl else 80)
+        self._base_path: str = url.path.rstrip("/")
+
+    @classmethod
+    def from_algod(
+        cls, algod: AlgodClient, timeout: Optional[float] = DEFAULT_TIMEOUT
+    ) -> "AsyncAlgodClient":
+        assert isinstance(
+            algod, AlgodClient
+        ), f"can only make an AsyncAlgodClient from an AlgodClient but was given {type(algod)}"
+        return cls(
+            algod.algod_token,
+            algod.algod_address,
+            headers=algod.headers,
+            timeout=timeout,
+        )
+
+    async def dryrun(self, drr: DryrunRequest) -> dict:
+        """Async version of `AlgodClient.dryrun()`"""
+        data = b64decode(encoding.msgpack_encode(drr))
+        return await self.algod_request(
+            "POST",
+            "/teal/dryrun",
+            data=data,
+            headers={"Content-Type": "application/msgpack"},
+        )
+
+    async def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> dict:
+        """Async version of `AlgodClient.algod_request()` for JSON responses"""
+        header = {
+            "Host": self._host,
+            "User-Agent": "graviton",
+            "Connection": "close",
+            "Content-Length": str(len(data or b"")),
+        }
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+        if requrl not in constants.unversioned_paths:
+            requrl = api_version_path_prefix + requrl
+
+        head = f"{method} {self._base_path}{requrl} HTTP/1.0\r\n" + "".join(
+            f"{k}: {v}\r\n" for k, v in header.items()
+        )
+        reader, writer = await self._timed(
+            asyncio.open_connection(self._host, self._port, ssl=self._use_ssl or None),
+            f"connecting to {self.algod_address}",
+        )
+        try:
+            writer.write(head.encode() + b"\r\n" + (data or b""))
+            await self._timed(writer.drain(), f"sending {method} {requrl}")
+            raw = await self._timed(reader.read(), f"awaiting {method} {requrl}")
+        finally:
+            writer.close()
+
+        code, body = self._parse_response(raw)
+        if not 200 <= code < 300:
+            msg = body.decode("utf-8", errors="replace")
+            try:
+                msg = json.loads(msg)["message"]
+            except Exception:
+                pass
+            raise error.AlgodHTTPError(msg, code)
+
+        try:
+            return json.loads(body)
+        except Exception as e:
+            raise error.AlgodResponseError(
+                "Failed to parse JSON response from algod"
+            ) from e
+
+    async def _timed(self, aw: Awaitable[T], doing: str) -> T:
+        try:
+            return await asyncio.wait_for(aw, self.timeout)
+        except asyncio.TimeoutError:
+            # as a blocking socket would, and so that pools and controllers treat it as a node failure:
+            raise TimeoutError(f"timed out after {self.timeout}s {doing}") from None
+
+    @classmethod
+    def _parse_response(cls, raw: bytes) -> Tuple[int, bytes]:
+        head, sep, body = raw.partition(b"\r\n\r\n")
+        assert sep, f"malformed HTTP response from algod: {raw[:100]!r}"
+
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        code = int(status_line.split()[1])
+        headers = {
+            k.strip().lower(): v.strip()
+            for k, _, v in (line.partition(":") for line in header_lines)
+        }
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = cls._dechunk(body)
+        return code, body
+
+    @classmethod
+    def _dechunk(cls, body: bytes) -> bytes:
+        chunks: List[bytes] = []
+        pos = 0
+        while True:
+            eol = body.index(b"\r\n", pos)
+            size = int(body[pos:eol].split(b";")[0], 16)
+            if size == 0:
+                return b"".join(chunks)
+            chunks.append(body[eol + 2 : eol + 2 + size])
+            pos = eol + 2 + size + 2
+
+
+class AsyncDryRunExecutor(DryRunExecutor):
+    """Asyncio flavor of `DryRunExecutor`
+
+    The coroutines `arun_one()` and `arun_sequence()` and the async generator `aiter_sequence()`
+    produce exactly the same `DryRunInspector`s as their synchronous counterparts, which remain available.
+    At most `max_in_flight` dry run requests are awaited concurrently per event loop, each of which
+    times out after `timeout` seconds (cf. `AsyncAlgodClient`). With `compile_once`, the program is compiled
+    on a worker thread, so that the event loop isn't blocked.
+    """
+
+    def __init__(
+        self,
+        algod: AlgodClient,
+        mode: ExecutionMode,
+        teal: str,
+        *,
+        abi_method_signature: Optional[str] = None,
+        omit_method_selector: bool = False,
+        validation: bool = True,
+        compile_once: bool = False,
+        memo: Optional[DryRunMemo] = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        projection: Optional[Iterable[DryRunProperty]] = None,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ):
+        # pools, caches and other wrapping clients have no async counterpart:
+        assert isinstance(
+            algod, AlgodClient
+        ), f"AsyncDryRunExecutor requires an AlgodClient but was given {type(algod)}"
+        super().__init__(
+            algod,
+            mode,
+            teal,
+            abi_method_signature=abi_method_signature,
+            omit_method_selector=omit_method_selector,
+            validation=validation,
+            compile_once=compile_once,
+            memo=memo,
+            projection=projection,
+        )
+        assert (
+            max_in_flight >= 1
+        ), f"max_in_flight must be positive but was {max_in_flight}"
+        self.max_in_flight: int = max_in_flight
+        self.async_algod: AsyncAlgodClient = AsyncAlgodClient.from_algod(
+            algod, timeout=timeout
+        )
+        # semaphores are bound to an event loop, so keep one per loop:
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_in_flight)
+        return self._semaphores[loop]
+
+    async def arun_one(
+        self,
+        args: Sequence[PyTypes],
+        *,
+        txn_params: Optional[DryRunTransactionParams] = None,
+        verbose: bool = False,
+    ) -> DryRunInspector:
+        """Async version of `run_one()`"""
+        args, encoded_args = self._executor_prep(tuple(args))
+        if self.memo is not None:
+            key = self._memo_key(args, encoded_args, _freeze(txn_params))
+            memoized = self.memo.get(key)
+            if memoized is not None:
+                return memoized
+
+        if self.compile_once and self._bytecode is None:
+            # compiling blocks, so keep it off the event loop:
+            await asyncio.get_running_loop().run_in_executor(None, self._program)
+        dryrun_req = self._dryrun_request([encoded_args], txn_params)
+        if verbose:
+            print(f"{type(self)}.arun_one(): {dryrun_req=}")
+        async with self._semaphore():
+            dryrun_resp = await self.async_algod.dryrun(dryrun_req)
+        if verbose:
+            print(f"{type(self)}.arun_one(): {dryrun_resp=}")
+        inspector = DryRunInspector.from_single_response(
+            dryrun_resp,
+            args,
+            encoded_args,
+            abi_type=self.abi_return_type,
+            projection=self.projection,
+        )
+        if self.memo is not None:
+            self.memo.put(key, inspector)
+        return inspector
+
+    async def arun_sequence(
+        self,
+        inputs: Sequence[Sequence[PyTypes]],
+        *,
+        txn_params: Optional[DryRunTransactionParams] = None,
+        verbose: bool = False,
+    ) -> List[DryRunInspector]:
+        """Async version of `run_sequence()`. The order of the results is the same as that of `inputs`."""
+        assert inputs, "must provide at least one input args tuple"
+        return list(
+            await asyncio.gather(
+                *(
+                    self.arun_one(args, txn_params=txn_params, verbose=verbose)
+                    for args in inputs
+                )
+            )
+        )
+
+    async def aiter_sequence(
+        self,
+        inputs: Iterable[Sequence[PyTypes]],
+        *,
+        txn_params: Optional[DryRunTransactionParams] = None,
+        verbose: bool = False,
+    ) -> AsyncIterator[DryRunInspector]:
+        """Yield an inspector for each element of `inputs`, in order.
+
+        `inputs` is consumed lazily and no more than `max_in_flight` dry runs are scheduled ahead
+        of the inspector being yielded, so arbitrarily long (even infinite) `inputs` are supported.
+        """
+        pending: Deque[asyncio.Task] = deque()
+        inputs_iter = iter(inputs)
+        try:
+            for args in inputs_iter:
+                pending.append(
+                    asyncio.ensure_future(
+                        self.arun_one(args, txn_params=txn_params, verbose=verbose)
+                    )
+                )
+                if len(pending) >= self.max_in_flight:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,1472 @@
+from base64 import b32decode, b64decode, b64encode
+from dataclasses import dataclass
+from hashlib import sha256
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from Cryptodome.Hash import SHA512, keccak
+
+from algosdk import abi, constants
+from algosdk.encoding import decode_address, encode_as_bytes
+from algosdk.logic import get_application_address
+from algosdk.transaction import LogicSigTransaction
+from algosdk.v2client.models import DryrunRequest
+
+from graviton.models import LockedState
+
+TealValue = Union[int, bytes]
+
+MAX_UINT64 = 2**64 - 1
+MAX_BYTES = 4096
+MAX_STACK = 1000
+MAX_LOGS = 32
+MAX_LOG_BYTES = 1024
+SCRATCH_SLOTS = 256
+
+APP_BUDGET = 700
+MAX_APP_BUDGET = 70_000
+LSIG_BUDGET = 20_000
+# reported by `global LogicSigVersion`: the highest program version that the consensus protocol supports
+LOGIC_SIG_VERSION = 8
+
+ZERO_ADDRESS = bytes(32)
+
+EMPTY_VALUE: Dict[str, Any] = {"type": 0, "uint": 0, "bytes": ""}
+
+NAMED_INTS = {
+    # TypeEnum:
+    "pay": 1,
+    "keyreg": 2,
+    "acfg": 3,
+    "axfer": 4,
+    "afrz": 5,
+    "appl": 6,
+    # OnCompletion:
+    "NoOp": 0,
+    "OptIn": 1,
+    "CloseOut": 2,
+    "ClearState": 3,
+    "UpdateApplication": 4,
+    "DeleteApplication": 5,
+}
+
+TYPE_ENUMS = {"pay": 1, "keyreg": 2, "acfg": 3, "axfer": 4, "afrz": 5, "appl": 6}
+
+
+class AVMError(Exception):
+    """An error which fails the program being evaluated"""
+
+
+# --------------------------- Assembly --------------------------- #
+
+# immediate kinds:
+# b - uint8, s - int8, l - label, v - varuint, B - bytes, V - varuints, L - list of bytes,
+# f - field name, t - txn array field name followed by a uint8 index
+OP_SPECS: Dict[str, Tuple[int, str]] = {
+    **{
+        op: (1, "")
+        for op in (
+            "+ - * / % < > <= >= == != && || ! ~ & | ^ "
+            "len itob btoi concat substring3 extract3 extract_uint16 extract_uint32 extract_uint64 "
+            "getbyte setbyte getbit setbit bzero b< b> b<= b>= b== b!= "
+            "pop dup dup2 swap select err return assert retsub "
+            "loads stores log app_global_get app_global_put app_global_del "
+            "intc_0 intc_1 intc_2 intc_3 bytec_0 bytec_1 bytec_2 bytec_3 "
+            "arg_0 arg_1 arg_2 arg_3 args shl shr bitlen addw mulw"
+        ).split()
+    },
+    "sqrt": (4, ""),
+    "exp": (1, ""),
+    "sha256": (35, ""),
+    "keccak256": (130, ""),
+    "sha512_256": (45, ""),
+    "b+": (10, ""),
+    "b-": (10, ""),
+    "b*": (20, ""),
+    "b/": (20, ""),
+    "b%": (20, ""),
+    "b|": (6, ""),
+    "b&": (6, ""),
+    "b^": (6, ""),
+    "b~": (4, ""),
+    "intcblock": (1, "V"),
+    "bytecblock": (1, "L"),
+    "intc": (1, "b"),
+    "bytec": (1, "b"),
+    "pushint": (1, "v"),
+    "pushbytes": (1, "B"),
+    "pushints": (1, "V"),
+    "pushbytess": (1, "L"),
+    "arg": (1, "b"),
+    "load": (1, "b"),
+    "store": (1, "b"),
+    "dig": (1, "b"),
+    "bury": (1, "b"),
+    "cover": (1, "b"),
+    "uncover": (1, "b"),
+    "popn": (1, "b"),
+    "dupn": (1, "b"),
+    "substring": (1, "bb"),
+    "extract": (1, "bb"),
+    "replace2": (1, "b"),
+    "txn": (1, "f"),
+    "global": (1, "f"),
+    "txna": (1, "t"),
+    "txnas": (1, "f"),
+    "bnz": (1, "l"),
+    "bz": (1, "l"),
+    "b": (1, "l"),
+    "callsub": (1, "l"),
+    "proto": (1, "bb"),
+    "frame_dig": (1, "s"),
+    "frame_bury": (1, "s"),
+}
+
+# pseudo ops which assemble into constant references or pushes
+PSEUDO_OPS = {"int", "byte", "addr", "method"}
+
+
+def _varuint_size(x: int) -> int:
+    size = 1
+    while x >= 0x80:
+        x >>= 7
+        size += 1
+    return size
+
+
+def _tokenize(line: str) -> List[str]:
+    """Split a line of TEAL into tokens, respecting string literals and dropping comments"""
+    tokens: List[str] = []
+    i, n = 0, len(line)
+    while i < n:
+        if line[i].isspace():
+            i += 1
+            continue
+        if line.startswith("//", i):
+            break
+        j = i
+        if line[i] == '"':
+            j += 1
+            while j < n and line[j] != '"':
+                j += 2 if line[j] == "\\" else 1
+            j += 1
+        else:
+            while j < n and not line[j].isspace():
+                j += 1
+        tokens.append(line[i:j])
+        i = j
+    return tokens
+
+
+def _parse_int(token: str) -> int:
+    if token in NAMED_INTS:
+        return NAMED_INTS[token]
+    try:
+        if len(token) > 1 and token[0] == "0" and token[1].isdigit():
+            value = int(token, 8)
+        else:
+            value = int(token, 0)
+    except ValueError:
+        raise ValueError(f"unable to parse {token!r} as an integer")
+    if not 0 <= value <= MAX_UINT64:
+        raise ValueError(f"{token} is not a uint64")
+    return value
+
+
+def _parse_string(token: str) -> bytes:
+    if len(token) < 2 or token[-1] != '"':
+        raise ValueError(f"unterminated string literal {token}")
+    body, out, i = token[1:-1], bytearray(), 0
+    escapes = {"n": 10, "r": 13, "t": 9, "\\": 92, '"': 34}
+    while i < len(body):
+        c = body[i]
+        if c != "\\":
+            out += c.encode("utf-8")
+            i += 1
+            continue
+        e = body[i + 1 : i + 2]
+        if e in escapes:
+            out.append(escapes[e])
+            i += 2
+        elif e == "x":
+            out.append(int(body[i + 2 : i + 4], 16))
+            i += 4
+        else:
+            raise ValueError(f"invalid escape sequence in {token}")
+    return bytes(out)
+
+
+def _b32decode(s: str) -> bytes:
+    return b32decode(s + "=" * (-len(s) % 8))
+
+
+def _parse_bytes(tokens: List[str]) -> Tuple[bytes, int]:
+    """Parse a byte constant from the beginning of `tokens`, returning it and the number of tokens consumed"""
+    if not tokens:
+        raise ValueError("missing byte constant")
+    first = tokens[0]
+    if first.startswith("0x"):
+        return bytes.fromhex(first[2:]), 1
+    if first.startswith('"'):
+        return _parse_string(first), 1
+    decoders: List[Tuple[str, Callable[[str], bytes]]] = [
+        ("base64", b64decode),
+        ("b64", b64decode),
+        ("base32", _b32decode),
+        ("b32", _b32decode),
+    ]
+    for prefix, decode in decoders:
+        if first == prefix and len(tokens) > 1:
+            return decode(tokens[1]), 2
+        if first.startswith(prefix + "(") and first.endswith(")"):
+            return decode(first[len(prefix) + 1 : -1]), 1
+    raise ValueError(f"unable to parse byte constant {' '.join(tokens)}")
+
+
+class Instruction:
+    __slots__ = ("op", "imm", "line", "pc", "cost", "index")
+
+    def __init__(self, op: str, imm: tuple, line: int):
+        self.op = op
+        self.imm = imm
+        self.line = line
+        self.pc = 0
+        self.index = 0
+        self.cost = OP_SPECS[op][0]
+
+    def size(self) -> int:
+        size = 1
+        for kind, x in zip(OP_SPECS[self.op][1], self.imm):
+            if kind in "bsf":
+                size += 1
+            elif kind in "lt":
+                size += 2
+            elif kind == "v":
+                size += _varuint_size(x)
+            elif kind == "B":
+                size += _varuint_size(len(x)) + len(x)
+            elif kind == "V":
+                size += _varuint_size(len(x)) + sum(map(_varuint_size, x))
+            else:  # L
+                size += _varuint_size(len(x)) + sum(
+                    _varuint_size(len(b)) + len(b) for b in x
+                )
+        return size
+
+
+@dataclass(frozen=True)
+class TealProgram:
+    """TEAL source assembled for evaluation by the local AVM"""
+
+    version: int
+    lines: List[str]
+    code: List[Instruction]
+
+    @classmethod
+    def assemble(cls, source: str) -> "TealProgram":
+        lines = source.splitlines()
+        version = 1
+        parsed: List[Tuple[int, str, List[str]]] = []
+        labels: Dict[str, int] = {}
+        for n, text in enumerate(lines, start=1):
+            tokens = _tokenize(text)
+            if not tokens:
+                continue
+            if tokens[0] == "#pragma":
+                if tokens[1:2] == ["version"] and len(tokens) == 3:
+                    version = _parse_int(tokens[2])
+                continue
+            if tokens[0].endswith(":") and len(tokens) == 1:
+                labels[tokens[0][:-1]] = len(parsed)
+                continue
+            parsed.append((n, tokens[0], tokens[1:]))
+
+        # resolve pseudo ops, keeping constants which are used more than once in implicit constant blocks
+        ints: Dict[int, int] = {}
+        byteses: Dict[bytes, int] = {}
+        pseudo: List[Optional[TealValue]] = []
+        explicit_blocks = any(op in ("intcblock", "bytecblock") for _, op, _ in parsed)
+        for n, op, args in parsed:
+            value: Optional[TealValue] = None
+            if op == "int":
+                value = _parse_int(args[0]) if len(args) == 1 else None
+                if value is None:
+                    raise ValueError(f"line {n}: int expects 1 immediate")
+                ints[value] = ints.get(value, 0) + 1
+            elif op in ("byte", "addr", "method"):
+                if op == "byte":
+                    bvalue, used = _parse_bytes(args)
+                    if used != len(args):
+                        raise ValueError(f"line {n}: byte expects 1 immediate")
+                elif op == "addr":
+                    bvalue = decode_address(args[0])
+                else:
+                    bvalue = abi.Method.from_signature(
+                        _parse_string(args[0]).decode()
+                    ).get_selector()
+                byteses[bvalue] = byteses.get(bvalue, 0) + 1
+                value = bvalue
+            elif op not in OP_SPECS:
+                raise ValueError(f"line {n}: unknown opcode: {op}")
+            pseudo.append(value)
+
+        def block(counts: dict) -> list:
+            if explicit_blocks:
+                return []
+            shared = [c for c, k in counts.items() if k > 1 or version < 3]
+            return sorted(shared, key=lambda c: -counts[c])
+
+        int_block, bytes_block = block(ints), block(byteses)
+        code: List[Instruction] = []
+        if int_block:
+            code.append(Instruction("intcblock", (tuple(int_block),), 1))
+        if bytes_block:
+            code.append(Instruction("bytecblock", (tuple(bytes_block),), 1))
+        offset = len(code)
+        labels = {label: i + offset for label, i in labels.items()}
+
+        for (n, op, args), value in zip(parsed, pseudo):
+            if isinstance(value, int):
+                code.append(
+                    Instruction("intc", (int_block.index(value),), n)
+                    if value in int_block
+                    else Instruction("pushint", (value,), n)
+                )
+                continue
+            if isinstance(value, bytes):
+                code.append(
+                    Instruction("bytec", (bytes_block.index(value),), n)
+                    if value in bytes_block
+                    else Instruction("pushbytes", (value,), n)
+                )
+                continue
+            code.append(Instruction(op, cls._immediates(n, op, args, labels), n))
+
+        pc = _varuint_size(version)
+        for i, ins in enumerate(code):
+            ins.pc, ins.index = pc, i
+            pc += ins.size()
+        return cls(version, lines, code)
+
+    @classmethod
+    def _immediates(
+        cls, n: int, op: str, args: List[str], labels: Dict[str, int]
+    ) -> tuple:
+        kinds = OP_SPECS[op][1]
+        if kinds in ("V", "L"):
+            if kinds == "V":
+                return (tuple(map(_parse_int, args)),)
+            values, i = [], 0
+            while i < len(args):
+                value, used = _parse_bytes(args[i:])
+                values.append(value)
+                i += used
+            return (tuple(values),)
+        if kinds == "B":
+            value, used = _parse_bytes(args)
+            if used != len(args):
+                raise ValueError(f"line {n}: {op} expects 1 immediate")
+            return (value,)
+
+        expected = 2 if kinds == "t" else len(kinds)
+        if len(args) != expected:
+            raise ValueError(f"line {n}: {op} expects {expected} immediates")
+        imm: list = []
+        for kind, arg in zip(kinds, args):
+            if kind == "l":
+                if arg not in labels:
+                    raise ValueError(f"line {n}: reference to undefined label {arg}")
+                imm.append(labels[arg])
+            elif kind == "s":
+                imm.append(int(arg))
+            elif kind in "ft":
+                imm.append(arg)
+            else:
+                imm.append(_parse_int(arg))
+        if kinds == "t":
+            imm.append(_parse_int(args[1]))
+        return tuple(imm)
+
+
+# --------------------------- Evaluation --------------------------- #
+
+
+@dataclass
+class TxnContext:
+    """Everything a program may inspect besides its own state"""
+
+    txn: Any
+    group: List[Any]
+    group_index: int
+    is_app: bool
+    args: List[bytes]
+    app_id: int = 0
+    creator: bytes = ZERO_ADDRESS
+    global_state: Optional[Dict[bytes, TealValue]] = None
+    round: int = 0
+    latest_timestamp: int = 0
+    logic_sig_version: int = LOGIC_SIG_VERSION
+
+
+@dataclass
+class Evaluation:
+    trace: List[dict]
+    logs: List[bytes]
+    cost: int
+    error: Optional[str]
+    passed: bool
+    global_delta: List[dict]
+    global_state: Dict[bytes, TealValue]
+
+
+class Machine:
+    """State of a single program evaluation.
+
+    Evaluation errors out beyond `budget`, while `global OpcodeBudget` reports what remains of `available`
+    (by default, the `budget`) such as the budget pooled by the app calls of the group.
+    """
+
+    def __init__(
+        self,
+        program: TealProgram,
+        ctx: TxnContext,
+        budget: int,
+        available: Optional[int] = None,
+    ):
+        self.program = program
+        self.ctx = ctx
+        self.budget = budget
+        self.available = budget if available is None else min(available, budget)
+        self.cost = 0
+        self.stack: List[TealValue] = []
+        self.scratch: List[TealValue] = [0] * SCRATCH_SLOTS
+        self.rendered_scratch: List[dict] = []
+        self.callstack: List[Tuple[int, int, int, int]] = []
+        self.intc: Tuple[int, ...] = ()
+        self.bytec: Tuple[bytes, ...] = ()
+        self.logs: List[bytes] = []
+        self.log_bytes = 0
+        self.global_state: Dict[bytes, TealValue] = dict(ctx.global_state or {})
+        self.done = False
+        self._rendered: Dict[TealValue, dict] = {}
+
+    def render(self, value: TealValue) -> dict:
+        rendered = self._rendered.get(value)
+        if rendered is None:
+            rendered = self._rendered[value] = (
+                {"type": 2, "uint": value, "bytes": ""}
+                if isinstance(value, int)
+                else {"type": 1, "uint": 0, "bytes": b64encode(value).decode()}
+            )
+        return rendered
+
+    def step_state(self, ins: Instruction) -> dict:
+        return {
+            "pc": ins.pc,
+            "line": ins.line,
+            "stack": [self.render(v) for v in self.stack],
+            "scratch": list(self.rendered_scratch),
+        }
+
+    def run(self) -> Evaluation:
+        code = self.program.code
+        trace: List[dict] = []
+        error: Optional[str] = None
+        ins = code[0] if code else Instruction("err", (), 1)
+        ip = 0
+        # as with algod, a failing op is reported with the state it was executed in
+        before: Optional[dict] = None
+        try:
+            while ip < len(code):
+                ins = code[ip]
+                before = self.step_state(ins)
+                trace.append(before)
+                if self.cost + ins.cost > self.budget:
+                    self.cost = self.budget
+                    raise AVMError(
+                        f"dynamic cost budget exceeded, executing {ins.op}: local program cost was {self.cost}"
+                    )
+                self.cost += ins.cost
+                nxt = OPS[ins.op](self, ins)
+                if len(self.stack) > MAX_STACK:
+                    raise AVMError("stack overflow")
+                if self.done:
+                    ip = len(code)
+                ip = ip + 1 if nxt is None else nxt
+            before = None
+
+            if len(self.stack) != 1:
+                raise AVMError(f"stack len is {len(self.stack)} instead of 1")
+            if not isinstance(self.stack[0], int):
+                raise AVMError("stack finished with bytes not int")
+        except AVMError as e:
+            error = str(e)
+
+        final = self.step_state(ins) if before is None else dict(before)
+        if error:
+            final["error"] = error
+        trace.append(final)
+        return Evaluation(
+            trace=trace,
+            logs=self.logs,
+            cost=self.cost,
+            error=error,
+            passed=not error and self.stack[0] != 0,
+            global_delta=self.global_delta(),
+            global_state=self.global_state,
+        )
+
+    def global_delta(self) -> List[dict]:
+        initial = self.ctx.global_state or {}
+        delta = []
+        for key in sorted(set(initial) | set(self.global_state)):
+            value: Dict[str, Any]
+            if key not in self.global_state:
+                value = {"action": 3}
+            elif initial.get(key) == self.global_state[key]:
+                continue
+            elif isinstance(v := self.global_state[key], int):
+                value = {"action": 2, "uint": v}
+            else:
+                value = {"action": 1, "bytes": b64encode(v).decode()}
+            delta.append({"key": b64encode(key).decode(), "value": value})
+        return delta
+
+    # ---- stack helpers ---- #
+
+    def pop(self) -> TealValue:
+        if not self.stack:
+            raise AVMError("stack underflow")
+        return self.stack.pop()
+
+    def pop_uint(self, op: str) -> int:
+        v = self.pop()
+        if not isinstance(v, int):
+            raise AVMError(f"{op} arg wanted type uint64 got []byte")
+        return v
+
+    def pop_bytes(self, op: str) -> bytes:
+        v = self.pop()
+        if not isinstance(v, bytes):
+            raise AVMError(f"{op} arg wanted type []byte got uint64")
+        return v
+
+    def push(self, v: TealValue) -> None:
+        if isinstance(v, bytes) and len(v) > MAX_BYTES:
+            raise AVMError(f"byte array of length {len(v)} exceeds {MAX_BYTES}")
+        self.stack.append(v)
+
+    def store(self, slot: int, v: TealValue) -> None:
+        if not 0 <= slot < SCRATCH_SLOTS:
+            raise AVMError(f"invalid Scratch index {slot}")
+        self.scratch[slot] = v
+        if slot >= len(self.rendered_scratch):
+            self.rendered_scratch.extend(
+                [EMPTY_VALUE] * (slot + 1 - len(self.rendered_scratch))
+            )
+        self.rendered_scratch[slot] = self.render(v)
+
+    def load(self, slot: int) -> TealValue:
+        if not 0 <= slot < SCRATCH_SLOTS:
+            raise AVMError(f"invalid Scratch index {slot}")
+        return self.scratch[slot]
+
+    def require_mode(self, op: str, is_app: bool) -> None:
+        if self.ctx.is_app != is_app:
+            raise AVMError(f"{op} not allowed in current mode")
+
+
+OpHandler = Callable[[Machine, Instruction], Optional[int]]
+OPS: Dict[str, OpHandler] = {}
+
+
+def _op(*names: str) -> Callable[[OpHandler], OpHandler]:
+    def register(f: OpHandler) -> OpHandler:
+        for name in names:
+            OPS[name] = f
+        return f
+
+    return register
+
+
+def _uint_binary(name: str, f: Callable[[int, int], int]) -> None:
+    def handler(m: Machine, ins: Instruction) -> None:
+        b, a = m.pop_uint(name), m.pop_uint(name)
+        m.push(f(a, b))
+
+    OPS[name] = handler
+
+
+def _checked(name: str, f: Callable[[int, int], int]) -> Callable[[int, int], int]:
+    def g(a: int, b: int) -> int:
+        r = f(a, b)
+        if r > MAX_UINT64:
+            raise AVMError(f"{name} overflowed")
+        return r
+
+    return g
+
+
+def _sub(a: int, b: int) -> int:
+    if b > a:
+        raise AVMError("- would result negative")
+    return a - b
+
+
+def _div(name: str, f: Callable[[int, int], int]) -> Callable[[int, int], int]:
+    def g(a: int, b: int) -> int:
+        if b == 0:
+            raise AVMError(f"{name} 0")
+        return f(a, b)
+
+    return g
+
+
+def _exp(a: int, b: int) -> int:
+    if a == 0 and b == 0:
+        raise AVMError("0^0 is undefined")
+    if a > 1 and b >= 64:
+        raise AVMError(f"{a}^{b} overflow")
+    r = a**b
+    if r > MAX_UINT64:
+        raise AVMError(f"{a}^{b} overflow")
+    return r
+
+
+def _shift(name: str, f: Callable[[int, int], int]) -> Callable[[int, int], int]:
+    def g(a: int, b: int) -> int:
+        if b > 63:
+            raise AVMError(f"{name} arg too big, ({b})")
+        return f(a, b) & MAX_UINT64
+
+    return g
+
+
+for _name, _f in {
+    "+": _checked("+", lambda a, b: a + b),
+    "-": _sub,
+    "*": _checked("*", lambda a, b: a * b),
+    "/": _div("/", lambda a, b: a // b),
+    "%": _div("%", lambda a, b: a % b),
+    "<": lambda a, b: int(a < b),
+    ">": lambda a, b: int(a > b),
+    "<=": lambda a, b: int(a <= b),
+    ">=": lambda a, b: int(a >= b),
+    "&&": lambda a, b: int(bool(a and b)),
+    "||": lambda a, b: int(bool(a or b)),
+    "&": lambda a, b: a & b,
+    "|": lambda a, b: a | b,
+    "^": lambda a, b: a ^ b,
+    "exp": _exp,
+    "shl": _shift("shl", lambda a, b: a << b),
+    "shr": _shift("shr", lambda a, b: a >> b),
+}.items():
+    _uint_binary(_name, _f)
+
+
+@_op("==", "!=")
+def _op_eq(m: Machine, ins: Instruction) -> None:
+    b, a = m.pop(), m.pop()
+    if type(a) is not type(b):
+        raise AVMError(f"cannot compare ({type(a).__name__} to {type(b).__name__})")
+    m.push(int((a == b) == (ins.op == "==")))
+
+
+@_op("!")
+def _op_not(m: Machine, ins: Instruction) -> None:
+    m.push(int(m.pop_uint("!") == 0))
+
+
+@_op("~")
+def _op_bitnot(m: Machine, ins: Instruction) -> None:
+    m.push(m.pop_uint("~") ^ MAX_UINT64)
+
+
+@_op("sqrt")
+def _op_sqrt(m: Machine, ins: Instruction) -> None:
+    a = m.pop_uint("sqrt")
+    r = int(a**0.5)
+    while r * r > a:
+        r -= 1
+    while (r + 1) * (r + 1) <= a:
+        r += 1
+    m.push(r)
+
+
+@_op("bitlen")
+def _op_bitlen(m: Machine, ins: Instruction) -> None:
+    v = m.pop()
+    m.push(
+        v.bit_length() if isinstance(v, int) else int.from_bytes(v, "big").bit_length()
+    )
+
+
+@_op("addw", "mulw")
+def _op_wide(m: Machine, ins: Instruction) -> None:
+    b, a = m.pop_uint(ins.op), m.pop_uint(ins.op)
+    r = a + b if ins.op == "addw" else a * b
+    m.push(r >> 64)
+    m.push(r & MAX_UINT64)
+
+
+@_op("len")
+def _op_len(m: Machine, ins: Instruction) -> None:
+    m.push(len(m.pop_bytes("len")))
+
+
+@_op("itob")
+def _op_itob(m: Machine, ins: Instruction) -> None:
+    m.push(m.pop_uint("itob").to_bytes(8, "big"))
+
+
+@_op("btoi")
+def _op_btoi(m: Machine, ins: Instruction) -> None:
+    b = m.pop_bytes("btoi")
+    if len(b) > 8:
+        raise AVMError(f"btoi arg too long, got [{len(b)}]bytes")
+    m.push(int.from_bytes(b, "big"))
+
+
+@_op("concat")
+def _op_concat(m: Machine, ins: Instruction) -> None:
+    b, a = m.pop_bytes("concat"), m.pop_bytes("concat")
+    if len(a) + len(b) > MAX_BYTES:
+        raise AVMError(f"concat produced a too big ({len(a) + len(b)}) byte-array")
+    m.push(a + b)
+
+
+def _substring(b: bytes, start: int, end: int) -> bytes:
+    if end < start:
+        raise AVMError("substring end before start")
+    if end > len(b):
+        raise AVMError("substring range beyond length of string")
+    return b[start:end]
+
+
+@_op("substring")
+def _op_substring(m: Machine, ins: Instruction) -> None:
+    m.push(_substring(m.pop_bytes("substring"), *ins.imm))
+
+
+@_op("substring3")
+def _op_substring3(m: Machine, ins: Instruction) -> None:
+    end, start = m.pop_uint("substring3"), m.pop_uint("substring3")
+    m.push(_substring(m.pop_bytes("substring3"), start, end))
+
+
+def _extract(b: bytes, start: int, length: int) -> bytes:
+    if start > len(b) or start + length > len(b):
+        raise AVMError(f"extraction end {start + length} is beyond length: {len(b)}")
+    return b[start : start + length]
+
+
+@_op("extract")
+def _op_extract(m: Machine, ins: Instruction) -> None:
+    b = m.pop_bytes("extract")
+    start, length = ins.imm
+    m.push(_extract(b, start, length or max(0, len(b) - start)))
+
+
+@_op("extract3")
+def _op_extract3(m: Machine, ins: Instruction) -> None:
+    length, start = m.pop_uint("extract3"), m.pop_uint("extract3")
+    m.push(_extract(m.pop_bytes("extract3"), start, length))
+
+
+@_op("replace2")
+def _op_replace2(m: Machine, ins: Instruction) -> None:
+    b, a = m.pop_bytes("replace2"), m.pop_bytes("replace2")
+    start = ins.imm[0]
+    _extract(a, start, len(b))
+    m.push(a[:start] + b + a[start + len(b) :])
+
+
+@_op("extract_uint16", "extract_uint32", "extract_uint64")
+def _op_extract_uint(m: Machine, ins: Instruction) -> None:
+    start = m.pop_uint(ins.op)
+    b = m.pop_bytes(ins.op)
+    m.push(int.from_bytes(_extract(b, start, int(ins.op[11:]) // 8), "big"))
+
+
+@_op("getbyte")
+def _op_getbyte(m: Machine, ins: Instruction) -> None:
+    i, b = m.pop_uint("getbyte"), m.pop_bytes("getbyte")
+    if i >= len(b):
+        raise AVMError(f"getbyte index {i} beyond length {len(b)}")
+    m.push(b[i])
+
+
+@_op("setbyte")
+def _op_setbyte(m: Machine, ins: Instruction) -> None:
+    v, i, b = m.pop_uint("setbyte"), m.pop_uint("setbyte"), m.pop_bytes("setbyte")
+    if i >= len(b):
+        raise AVMError(f"setbyte index {i} beyond length {len(b)}")
+    if v > 255:
+        raise AVMError(f"setbyte value {v} > 255")
+    m.push(b[:i] + bytes([v]) + b[i + 1 :])
+
+
+@_op("getbit")
+def _op_getbit(m: Machine, ins: Instruction) -> None:
+    i, v = m.pop_uint("getbit"), m.pop()
+    if isinstance(v, int):
+        if i > 63:
+            raise AVMError(f"getbit index {i} beyond 64 bits")
+        m.push((v >> i) & 1)
+        return
+    if i >= 8 * len(v):
+        raise AVMError(f"getbit index {i} beyond byte array length")
+    m.push((v[i // 8] >> (7 - i % 8)) & 1)
+
+
+@_op("setbit")
+def _op_setbit(m: Machine, ins: Instruction) -> None:
+    bit, i, v = m.pop_uint("setbit"), m.pop_uint("setbit"), m.pop()
+    if bit > 1:
+        raise AVMError("setbit value > 1")
+    if isinstance(v, int):
+        if i > 63:
+            raise AVMError(f"setbit index {i} beyond 64 bits")
+        m.push(v | (1 << i) if bit else v & ~(1 << i))
+        return
+    if i >= 8 * len(v):
+        raise AVMError(f"setbit index {i} beyond byte array length")
+    ba = bytearray(v)
+    mask = 1 << (7 - i % 8)
+    ba[i // 8] = ba[i // 8] | mask if bit else ba[i // 8] & ~mask
+    m.push(bytes(ba))
+
+
+@_op("bzero")
+def _op_bzero(m: Machine, ins: Instruction) -> None:
+    n = m.pop_uint("bzero")
+    if n > MAX_BYTES:
+        raise AVMError(f"bzero attempted to create a too large string ({n})")
+    m.push(bytes(n))
+
+
+@_op("sha256", "keccak256", "sha512_256")
+def _op_hash(m: Machine, ins: Instruction) -> None:
+    b = m.pop_bytes(ins.op)
+    if ins.op == "sha256":
+        m.push(sha256(b).digest())
+    elif ins.op == "keccak256":
+        m.push(keccak.new(data=b, digest_bits=256).digest())
+    else:
+        m.push(SHA512.new(data=b, truncate="256").digest())
+
+
+def _bmath_operand(m: Machine, op: str) -> int:
+    b = m.pop_bytes(op)
+    if len(b) > 64:
+        raise AVMError(f"{op} math attempted on large byte-array")
+    return int.from_bytes(b, "big")
+
+
+def _bmath_result(r: int) -> bytes:
+    return r.to_bytes((r.bit_length() + 7) // 8, "big")
+
+
+@_op("b+", "b-", "b*", "b/", "b%", "b<", "b>", "b<=", "b>=", "b==", "b!=")
+def _op_bmath(m: Machine, ins: Instruction) -> None:
+    b, a = _bmath_operand(m, ins.op), _bmath_operand(m, ins.op)
+    op = ins.op[1:]
+    if op in ("<", ">", "<=", ">=", "==", "!="):
+        m.push(
+            int(
+                {
+                    "<": a < b,
+                    ">": a > b,
+                    "<=": a <= b,
+                    ">=": a >= b,
+                    "==": a == b,
+                    "!=": a != b,
+                }[op]
+            )
+        )
+        return
+    if op == "-" and b > a:
+        raise AVMError("byte math would have negative result")
+    if op in ("/", "%") and b == 0:
+        raise AVMError("division by zero")
+    r = {
+        "+": lambda: a + b,
+        "-": lambda: a - b,
+        "*": lambda: a * b,
+        "/": lambda: a // b,
+        "%": lambda: a % b,
+    }[op]()
+    m.push(_bmath_result(r))
+
+
+@_op("b|", "b&", "b^")
+def _op_bbitwise(m: Machine, ins: Instruction) -> None:
+    b, a = m.pop_bytes(ins.op), m.pop_bytes(ins.op)
+    n = max(len(a), len(b))
+    x, y = int.from_bytes(a, "big"), int.from_bytes(b, "big")
+    r = {"b|": x | y, "b&": x & y, "b^": x ^ y}[ins.op]
+    m.push(r.to_bytes(n, "big"))
+
+
+@_op("b~")
+def _op_bnot(m: Machine, ins: Instruction) -> None:
+    m.push(bytes(x ^ 0xFF for x in m.pop_bytes("b~")))
+
+
+@_op("pop")
+def _op_pop(m: Machine, ins: Instruction) -> None:
+    m.pop()
+
+
+@_op("popn")
+def _op_popn(m: Machine, ins: Instruction) -> None:
+    for _ in range(ins.imm[0]):
+        m.pop()
+
+
+@_op("dup")
+def _op_dup(m: Machine, ins: Instruction) -> None:
+    v = m.pop()
+    m.push(v)
+    m.push(v)
+
+
+@_op("dupn")
+def _op_dupn(m: Machine, ins: Instruction) -> None:
+    v = m.pop()
+    for _ in range(ins.imm[0] + 1):
+        m.push(v)
+
+
+@_op("dup2")
+def _op_dup2(m: Machine, ins: Instruction) -> None:
+    if len(m.stack) < 2:
+        raise AVMError("stack underflow")
+    m.stack.extend(m.stack[-2:])
+
+
+def _depth(m: Machine, n: int) -> int:
+    if n >= len(m.stack):
+        raise AVMError(f"{n} is beyond the stack of height {len(m.stack)}")
+    return len(m.stack) - 1 - n
+
+
+@_op("dig")
+def _op_dig(m: Machine, ins: Instruction) -> None:
+    m.push(m.stack[_depth(m, ins.imm[0])])
+
+
+@_op("bury")
+def _op_bury(m: Machine, ins: Instruction) -> None:
+    i = _depth(m, ins.imm[0])
+    m.stack[i] = m.stack[-1]
+    m.stack.pop()
+
+
+@_op("cover")
+def _op_cover(m: Machine, ins: Instruction) -> None:
+    i = _depth(m, ins.imm[0])
+    m.stack.insert(i, m.stack.pop())
+
+
+@_op("uncover")
+def _op_uncover(m: Machine, ins: Instruction) -> None:
+    m.push(m.stack.pop(_depth(m, ins.imm[0])))
+
+
+@_op("swap")
+def _op_swap(m: Machine, ins: Instruction) -> None:
+    b, a = m.pop(), m.pop()
+    m.push(b)
+    m.push(a)
+
+
+@_op("select")
+def _op_select(m: Machine, ins: Instruction) -> None:
+    c, b, a = m.pop_uint("select"), m.pop(), m.pop()
+    m.push(b if c else a)
+
+
+@_op("err")
+def _op_err(m: Machine, ins: Instruction) -> None:
+    raise AVMError("err opcode executed")
+
+
+@_op("return")
+def _op_return(m: Machine, ins: Instruction) -> None:
+    m.stack = [m.pop_uint("return")]
+    m.done = True
+
+
+@_op("assert")
+def _op_assert(m: Machine, ins: Instruction) -> None:
+    if not m.pop_uint("assert"):
+        raise AVMError(f"assert failed pc={ins.pc}")
+
+
+@_op("bnz", "bz")
+def _op_cond_branch(m: Machine, ins: Instruction) -> Optional[int]:
+    c = m.pop_uint(ins.op)
+    return ins.imm[0] if bool(c) == (ins.op == "bnz") else None
+
+
+@_op("b")
+def _op_branch(m: Machine, ins: Instruction) -> int:
+    return ins.imm[0]
+
+
+@_op("callsub")
+def _op_callsub(m: Machine, ins: Instruction) -> int:
+    m.callstack.append((ins.index + 1, len(m.stack), -1, 0))
+    return ins.imm[0]
+
+
+@_op("proto")
+def _op_proto(m: Machine, ins: Instruction) -> None:
+    if not m.callstack:
+        raise AVMError("proto was executed without a callsub")
+    args, rets = ins.imm
+    if args > len(m.stack):
+        raise AVMError(
+            f"callsub to proto that requires {args} args with stack height {len(m.stack)}"
+        )
+    ret_ip, _, _, _ = m.callstack[-1]
+    m.callstack[-1] = (ret_ip, len(m.stack) - args, args, rets)
+
+
+def _frame(m: Machine, ins: Instruction) -> int:
+    if not m.callstack or m.callstack[-1][2] < 0:
+        raise AVMError(f"{ins.op} with empty callstack")
+    _, height, args, _ = m.callstack[-1]
+    i = height + args + ins.imm[0]
+    if not 0 <= i < len(m.stack):
+        raise AVMError(f"{ins.op} {ins.imm[0]} in sub with {args} args")
+    return i
+
+
+@_op("frame_dig")
+def _op_frame_dig(m: Machine, ins: Instruction) -> None:
+    m.push(m.stack[_frame(m, ins)])
+
+
+@_op("frame_bury")
+def _op_frame_bury(m: Machine, ins: Instruction) -> None:
+    i = _frame(m, ins)
+    m.stack[i] = m.pop()
+
+
+@_op("retsub")
+def _op_retsub(m: Machine, ins: Instruction) -> int:
+    if not m.callstack:
+        raise AVMError("retsub with empty callstack")
+    ret_ip, height, args, rets = m.callstack.pop()
+    if args >= 0:
+        # a proto frame: replace the arguments and locals with the return values
+        if len(m.stack) < height + args + rets:
+            raise AVMError("retsub executed with stack below frame. Did you pop args?")
+        m.stack[height:] = m.stack[len(m.stack) - rets :] if rets else []
+    return ret_ip
+
+
+@_op("intcblock")
+def _op_intcblock(m: Machine, ins: Instruction) -> None:
+    m.intc = ins.imm[0]
+
+
+@_op("bytecblock")
+def _op_bytecblock(m: Machine, ins: Instruction) -> None:
+    m.bytec = ins.imm[0]
+
+
+def _const(block: tuple, i: int, what: str) -> TealValue:
+    if i >= len(block):
+        raise AVMError(f"{what} {i} beyond {len(block)} constants")
+    return block[i]
+
+
+@_op("intc", "intc_0", "intc_1", "intc_2", "intc_3")
+def _op_intc(m: Machine, ins: Instruction) -> None:
+    i = ins.imm[0] if ins.op == "intc" else int(ins.op[-1])
+    m.push(_const(m.intc, i, "intc"))
+
+
+@_op("bytec", "bytec_0", "bytec_1", "bytec_2", "bytec_3")
+def _op_bytec(m: Machine, ins: Instruction) -> None:
+    i = ins.imm[0] if ins.op == "bytec" else int(ins.op[-1])
+    m.push(_const(m.bytec, i, "bytec"))
+
+
+@_op("pushint", "pushbytes")
+def _op_push(m: Machine, ins: Instruction) -> None:
+    m.push(ins.imm[0])
+
+
+@_op("pushints", "pushbytess")
+def _op_pushes(m: Machine, ins: Instruction) -> None:
+    for v in ins.imm[0]:
+        m.push(v)
+
+
+@_op("load")
+def _op_load(m: Machine, ins: Instruction) -> None:
+    m.push(m.load(ins.imm[0]))
+
+
+@_op("store")
+def _op_store(m: Machine, ins: Instruction) -> None:
+    m.store(ins.imm[0], m.pop())
+
+
+@_op("loads")
+def _op_loads(m: Machine, ins: Instruction) -> None:
+    m.push(m.load(m.pop_uint("loads")))
+
+
+@_op("stores")
+def _op_stores(m: Machine, ins: Instruction) -> None:
+    v = m.pop()
+    m.store(m.pop_uint("stores"), v)
+
+
+@_op("arg", "arg_0", "arg_1", "arg_2", "arg_3", "args")
+def _op_arg(m: Machine, ins: Instruction) -> None:
+    m.require_mode(ins.op, is_app=False)
+    if ins.op == "args":
+        i = m.pop_uint("args")
+    else:
+        i = ins.imm[0] if ins.op == "arg" else int(ins.op[-1])
+    if i >= len(m.ctx.args):
+        raise AVMError(f"cannot load arg[{i}] of {len(m.ctx.args)}")
+    m.push(m.ctx.args[i])
+
+
+def _address(addr: Optional[str]) -> bytes:
+    return decode_address(addr) if addr else ZERO_ADDRESS
+
+
+def _txn_field(ctx: TxnContext, field: str) -> TealValue:
+    txn = ctx.txn
+    get = lambda name, default=None: getattr(txn, name, default)  # noqa: E731
+    scalars: Dict[str, Callable[[], TealValue]] = {
+        "Sender": lambda: _address(txn.sender),
+        "Fee": lambda: txn.fee,
+        "FirstValid": lambda: txn.first_valid_round,
+        "LastValid": lambda: txn.last_valid_round,
+        "Note": lambda: get("note") or b"",
+        "Lease": lambda: get("lease") or bytes(32),
+        "Receiver": lambda: _address(get("receiver")),
+        "Amount": lambda: get("amt") or 0,
+        "CloseRemainderTo": lambda: _address(get("close_remainder_to")),
+        "RekeyTo": lambda: _address(get("rekey_to")),
+        "TypeEnum": lambda: TYPE_ENUMS.get(txn.type, 0),
+        "Type": lambda: txn.type.encode(),
+        "GroupIndex": lambda: ctx.group_index,
+        "ApplicationID": lambda: get("index") or 0,
+        "OnCompletion": lambda: int(get("on_complete") or 0),
+        "NumAppArgs": lambda: len(get("app_args") or []),
+        "NumAccounts": lambda: len(get("accounts") or []),
+        "NumApplications": lambda: len(get("foreign_apps") or []),
+        "NumAssets": lambda: len(get("foreign_assets") or []),
+        "ApprovalProgram": lambda: get("approval_program") or b"",
+        "ClearStateProgram": lambda: get("clear_program") or b"",
+        "ExtraProgramPages": lambda: get("extra_pages") or 0,
+    }
+    if field not in scalars:
+        raise AVMError(f"unsupported txn field {field}")
+    return scalars[field]()
+
+
+def _txn_array(ctx: TxnContext, field: str, i: int) -> TealValue:
+    txn = ctx.txn
+    if field == "ApplicationArgs":
+        values: List[TealValue] = [
+            encode_as_bytes(a) for a in getattr(txn, "app_args", None) or []
+        ]
+    elif field == "Accounts":
+        values = [_address(txn.sender)] + [
+            decode_address(a) for a in getattr(txn, "accounts", None) or []
+        ]
+    elif field == "Applications":
+        values = [ctx.app_id] + list(getattr(txn, "foreign_apps", None) or [])
+    elif field == "Assets":
+        values = list(getattr(txn, "foreign_assets", None) or [])
+    else:
+        raise AVMError(f"unsupported txn array field {field}")
+    if i >= len(values):
+        raise AVMError(f"invalid {field} index {i}")
+    return values[i]
+
+
+@_op("txn")
+def _op_txn(m: Machine, ins: Instruction) -> None:
+    m.push(_txn_field(m.ctx, ins.imm[0]))
+
+
+@_op("txna")
+def _op_txna(m: Machine, ins: Instruction) -> None:
+    m.push(_txn_array(m.ctx, *ins.imm))
+
+
+@_op("txnas")
+def _op_txnas(m: Machine, ins: Instruction) -> None:
+    m.push(_txn_array(m.ctx, ins.imm[0], m.pop_uint("txnas")))
+
+
+@_op("global")
+def _op_global(m: Machine, ins: Instruction) -> None:
+    ctx = m.ctx
+    fields: Dict[str, Callable[[], TealValue]] = {
+        "MinTxnFee": lambda: constants.MIN_TXN_FEE,
+        "MinBalance": lambda: 100_000,
+        "MaxTxnLife": lambda: 1000,
+        "ZeroAddress": lambda: ZERO_ADDRESS,
+        "GroupSize": lambda: len(ctx.group),
+        "LogicSigVersion": lambda: ctx.logic_sig_version,
+        "Round": lambda: ctx.round,
+        "LatestTimestamp": lambda: ctx.latest_timestamp,
+        "CurrentApplicationID": lambda: ctx.app_id,
+        "CurrentApplicationAddress": lambda: decode_address(
+            get_application_address(ctx.app_id)
+        ),
+        "CreatorAddress": lambda: ctx.creator,
+        "CallerApplicationID": lambda: 0,
+        "CallerApplicationAddress": lambda: ZERO_ADDRESS,
+        "OpcodeBudget": lambda: max(m.available - m.cost, 0),
+    }
+    field = ins.imm[0]
+    if field not in fields:
+        raise AVMError(f"unsupported global field {field}")
+    m.push(fields[field]())
+
+
+@_op("log")
+def _op_log(m: Machine, ins: Instruction) -> None:
+    m.require_mode(ins.op, is_app=True)
+    b = m.pop_bytes("log")
+    if len(m.logs) >= MAX_LOGS:
+        raise AVMError(f"too many log calls in program. up to {MAX_LOGS} is allowed")
+    m.log_bytes += len(b)
+    if m.log_bytes > MAX_LOG_BYTES:
+        raise AVMError(f"program logs too large. {MAX_LOG_BYTES} bytes max")
+    m.logs.append(b)
+
+
+@_op("app_global_get")
+def _op_app_global_get(m: Machine, ins: Instruction) -> None:
+    m.require_mode(ins.op, is_app=True)
+    m.push(m.global_state.get(m.pop_bytes(ins.op), 0))
+
+
+@_op("app_global_put")
+def _op_app_global_put(m: Machine, ins: Instruction) -> None:
+    m.require_mode(ins.op, is_app=True)
+    v = m.pop()
+    m.global_state[m.pop_bytes(ins.op)] = v
+
+
+@_op("app_global_del")
+def _op_app_global_del(m: Machine, ins: Instruction) -> None:
+    m.require_mode(ins.op, is_app=True)
+    m.global_state.pop(m.pop_bytes(ins.op), None)
+
+
+assert set(OPS) == set(OP_SPECS), f"unimplemented ops: {set(OP_SPECS) - set(OPS)}"
+
+
+# --------------------------- Backend --------------------------- #
+
+
+class AVMClient(LockedState):
+    """Offline backend which evaluates dry run requests with an in-process TEAL interpreter.
+
+    An `AVMClient` may be used wherever an `AlgodClient` is, e.g.:
+
+    ```python
+    >>> inspectors = DryRunExecutor(AVMClient(), ExecutionMode.Application, teal).run_sequence(inputs)
+    ```
+
+    Its responses have the shape of algod's dry run responses, including the budget semantics:
+    app calls pool `app_budget` per app call of the request and are rejected when exceeding it,
+    while evaluation errors out beyond `max_app_budget` for apps and `lsig_budget` for logic sigs.
+    `global OpcodeBudget` reports what remains of the pooled budget, once the preceding app calls of
+    the group have consumed their share.
+
+    As with algod, the transactions of a request run as a group: the global state written by a passing
+    app call is seen by the calls of the same (existing) app which follow it. `global LogicSigVersion`
+    is the highest program version of the consensus protocol, `logic_sig_version`, and programs of
+    a higher version are rejected.
+
+    Limitations:
+    * only TEAL sources are supported, so `compile_once` is not
+    * the opcodes supported are the arithmetic, byte, stack, flow control, scratch, constant, `arg`,
+      `txn`, `global`, `log` and global state opcodes listed in `OP_SPECS`, without checks of the version
+      they were introduced in. Other opcodes, such as those for inner transactions or local state, fail
+      with an "unknown opcode" error
+    * reported `pc`s are those of this assembler, which does not replicate all of algod's optimizations,
+      and reported lines are those of the TEAL source rather than of algod's disassembly
+    """
+
+    def __init__(
+        self,
+        *,
+        app_budget: int = APP_BUDGET,
+        max_app_budget: int = MAX_APP_BUDGET,
+        lsig_budget: int = LSIG_BUDGET,
+        logic_sig_version: int = LOGIC_SIG_VERSION,
+    ):
+        self.app_budget = app_budget
+        self.max_app_budget = max_app_budget
+        self.lsig_budget = lsig_budget
+        self.logic_sig_version = logic_sig_version
+
+        self._lock = Lock()
+        self._programs: Dict[str, TealProgram] = {}
+
+    def compile(self, source: str, **kwargs) -> dict:
+        raise AssertionError(
+            "AVMClient evaluates TEAL sources, so it cannot compile_once"
+        )
+
+    def assemble(self, source: str) -> TealProgram:
+        """Assemble `source`, only the first time it is encountered"""
+        key = sha256(source.encode("utf-8")).hexdigest()
+        with self._lock:
+            program = self._programs.get(key)
+        if program is None:
+            program = TealProgram.assemble(source)
+            with self._lock:
+                self._programs[key] = program
+        return program
+
+    def dryrun(self, drr: DryrunRequest, **kwargs) -> dict:
+        """Same as `AlgodClient.dryrun()`, but evaluated locally"""
+        group = [stxn.transaction for stxn in drr.txns]
+        is_apps = [not isinstance(stxn, LogicSigTransaction) for stxn in drr.txns]
+        pooled_budget = self.app_budget * sum(is_apps)
+        # global state of existing apps, as left by the preceding transactions of the group:
+        app_states: Dict[int, Dict[bytes, TealValue]] = {}
+        txns = []
+        for i, stxn in enumerate(drr.txns):
+            try:
+                program, ctx = self._prepare(drr, i, group, is_apps[i])
+            except (AssertionError, ValueError) as e:
+                return {"error": str(e), "protocol-version": "", "txns": []}
+            if ctx.app_id in app_states:
+                ctx.global_state = app_states[ctx.app_id]
+
+            if not ctx.is_app:
+                ev = Machine(program, ctx, self.lsig_budget).run()
+                txns.append(
+                    {
+                        "logic-sig-trace": ev.trace,
+                        "logic-sig-messages": ["PASS" if ev.passed else "REJECT"],
+                        "logic-sig-disassembly": program.lines,
+                    }
+                )
+                continue
+
+            ev = Machine(program, ctx, self.max_app_budget, pooled_budget).run()
+            messages = ["ApprovalProgram", "PASS" if ev.passed else "REJECT"]
+            if ev.passed and ev.cost > pooled_budget:
+                messages = [
+                    "ApprovalProgram",
+                    "REJECT",
+                    f"cost budget exceeded: budget is {pooled_budget} but program cost was {ev.cost}",
+                ]
+            pooled_budget = max(0, pooled_budget - ev.cost)
+            if ctx.app_id and messages[1] == "PASS":
+                app_states[ctx.app_id] = ev.global_state
+            txn: Dict[str, Any] = {
+                "app-call-trace": ev.trace,
+                "app-call-messages": messages,
+                "disassembly": program.lines,
+                "budget-added": 0,
+                "budget-consumed": ev.cost,
+                "global-delta": ev.global_delta,
+                "local-deltas": [],
+            }
+            if ev.logs:
+                # as with algod, empty logs are omitted
+                txn["logs"] = [b64encode(log).decode() for log in ev.logs]
+            txns.append(txn)
+        return {"error": "", "protocol-version": "", "txns": txns}
+
+    def _prepare(
+        self, drr: DryrunRequest, i: int, group: List[Any], is_app: bool
+    ) -> Tuple[TealProgram, TxnContext]:
+        stxn = drr.txns[i]
+        round, timestamp = drr.round or 0, drr.latest_timestamp or 0
+        version = self.logic_sig_version
+        if not is_app:
+            sources = [
+                s.source
+                for s in drr.sources
+                if s.field_name == "lsig" and s.txn_index == i
+            ]
+            assert sources, f"AVMClient requires the TEAL source of logic sig {i}"
+            ctx = TxnContext(
+                stxn.transaction,
+                group,
+                i,
+                is_app=False,
+                args=[encode_as_bytes(a) for a in stxn.lsig.args or []],
+                round=round,
+                latest_timestamp=timestamp,
+                logic_sig_version=version,
+            )
+            return self._checked(self.assemble(sources[0])), ctx
+
+        txn = stxn.transaction
+        assert (
+            not drr.accounts
+        ), "AVMClient does not support accounts in the dry run request"
+        field_name = (
+            "clearp"
+            if int(txn.on_complete or 0) == NAMED_INTS["ClearState"]
+            else "approv"
+        )
+        apps = [a for a in drr.apps if a.id == txn.index] or (
+            drr.apps if not txn.index else []
+        )
+        app = apps[0] if apps else None
+        app_id = app.id if app else txn.index
+        sources = [
+            s.source
+            for s in drr.sources
+            if s.field_name == field_name and s.app_index in (app_id, txn.index)
+        ]
+        assert sources, f"AVMClient requires the TEAL source of app call {i}"
+
+        global_state: Dict[bytes, TealValue] = {}
+        creator = ZERO_ADDRESS
+        if app is not None:
+            creator = _address(app.params.creator)
+            for kv in app.params.global_state or []:
+                kv = kv if isinstance(kv, dict) else kv.dictify()
+                value = kv["value"]
+                global_state[b64decode(kv["key"])] = (
+                    b64decode(value.get("bytes") or "")
+                    if value.get("type") == 1
+                    else value.get("uint") or 0
+                )
+
+        ctx = TxnContext(
+            txn,
+            group,
+            i,
+            is_app=True,
+            args=[],
+            app_id=app_id,
+            creator=creator,
+            global_state=global_state,
+            round=round,
+            latest_timestamp=timestamp,
+            logic_sig_version=version,
+        )
+        return self._checked(self.assemble(sources[0])), ctx
+
+    def _checked(self, program: TealProgram) -> TealProgram:
+        assert (
+            program.version <= self.logic_sig_version
+        ), f"program version {program.version} greater than max supported version {self.logic_sig_version}"
+        return program
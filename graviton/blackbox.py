@@ -1,10 +1,22 @@
+from base64 import b64decode
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from copy import copy
 from dataclasses import asdict, dataclass, field
+from hashlib import sha256
+from itertools import islice
+from math import ceil
+from threading import Lock
 from typing import (
     Any,
     Callable,
+    Deque,
     Dict,
     Final,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Iterator,
     List,
     Optional,
     Sequence,
@@ -24,22 +36,41 @@ from algosdk.transaction import (
     SuggestedParams,
 )
 
-from graviton.dryrun import DryRunHelper
-from graviton.inspector import DryRunInspector, EncodingType
+from graviton.cache import DryRunMemo
+from graviton.concurrency import AdaptiveConcurrency
+from graviton.dryrun import (
+    MAX_GROUP_SIZE,
+    DryRunRequestTemplate,
+    Program,
+    dryrun_msgpack,
+)
+from graviton.inspector import (
+    DryRunInspector,
+    DryRunProperty,
+    EncodingType,
+    needs_trace,
+)
 from graviton.models import (
     ArgType,
     DryRunAccountType,
+    DryRunClient,
     ExecutionMode,
+    LockedState,
     PyTypes,
     Stringy,
     ZERO_ADDRESS,
 )
+from graviton.pool import AlgodPool
 
 TealAndMethodType = Union[Tuple[str], Tuple[str, str]]
 
 T = TypeVar("T")
 
 OneOrMany = Union[T, Sequence[T]]
+S = TypeVar("S")
+
+# a fixed number of worker threads, or an adaptive controller of the number of dry runs in flight
+MaxWorkers = Union[int, AdaptiveConcurrency]
 
 
 MAX_APP_ARG_LIMIT = atc.AtomicTransactionComposer.MAX_APP_ARG_LIMIT
@@ -54,6 +85,98 @@ EXISTING_APP_CALL: Final[int] = 42
 
 SUGGESTED_PARAMS = SuggestedParams(int(1000), int(1), int(100), "", flat_fee=True)
 
+# a sequence of clients is a shorthand for an `AlgodPool` of those clients
+AlgodType = Union[DryRunClient, Sequence[AlgodClient]]
+
+
+def _freeze(x: Any) -> Hashable:
+    """Hashable rendition of (possibly nested) transaction parameters, for use in memo keys"""
+    if isinstance(x, dict):
+        return tuple(sorted(((str(k), _freeze(v)) for k, v in x.items())))
+    if isinstance(x, (list, tuple)):
+        return tuple(_freeze(v) for v in x)
+    if x is None or isinstance(x, (str, bytes, int, float)):
+        return x
+    if hasattr(x, "__dict__"):
+        return (type(x).__name__, _freeze(vars(x)))
+    return repr(x)
+
+
+def _pmap(
+    f: Callable[[S], T], xs: List[S], max_workers: Optional[MaxWorkers]
+) -> List[T]:
+    """
+    Order preserving `map()` which runs on a pool of `max_workers` threads,
+    or serially when `max_workers` is None
+    """
+    if max_workers is None:
+        return list(map(f, xs))
+    if isinstance(max_workers, AdaptiveConcurrency):
+        return list(max_workers.map(f, xs))
+
+    assert max_workers >= 1, f"max_workers must be positive but was {max_workers}"
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(f, xs))
+
+
+def _ipmap(
+    f: Callable[[S], T],
+    xs: Iterable[S],
+    max_workers: Optional[MaxWorkers],
+    max_buffered: Optional[int] = None,
+) -> Iterator[T]:
+    """
+    Lazy version of `_pmap()`: `xs` is consumed only as results are requested, and at most
+    `max_buffered` (by default `2 * max_workers`, or `2 * max_limit` for an `AdaptiveConcurrency`)
+    results are computed ahead of the one being yielded
+    """
+    if max_workers is None:
+        yield from map(f, xs)
+        return
+    if isinstance(max_workers, AdaptiveConcurrency):
+        yield from max_workers.map(f, xs, max_buffered)
+        return
+
+    assert max_workers >= 1, f"max_workers must be positive but was {max_workers}"
+    if max_buffered is None:
+        max_buffered = 2 * max_workers
+    assert max_buffered >= 1, f"max_buffered must be positive but was {max_buffered}"
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    pending: Deque[Future] = deque()
+    try:
+        for x in xs:
+            pending.append(pool.submit(f, x))
+            if len(pending) >= max_buffered:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _chunks(xs: Iterable[S], size: int) -> Iterator[List[S]]:
+    it = iter(xs)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+# the executors of a sharded `multi_exec()`, as held by each of its worker processes
+_SHARD_EXECUTORS: List["DryRunExecutor"] = []
+
+
+def _init_shard_worker(execs: List["DryRunExecutor"]) -> None:
+    global _SHARD_EXECUTORS
+    _SHARD_EXECUTORS = execs
+
+
+def _run_shard(
+    exec_index: int, shard: List[Tuple[PyTypes, ...]], run_kwargs: Dict[str, Any]
+) -> List[DryRunInspector]:
+    inspectors = _SHARD_EXECUTORS[exec_index]._run(shard, **run_kwargs)
+    # scrape in the worker, and send back the scraped results rather than the raw traces:
+    return DryRunInspector.detach(cast(List[DryRunInspector], inspectors))
+
 
 class DryRunEncoder:
     """Encoding utilities for dry run executions and results"""
@@ -312,7 +435,7 @@ class DryRunTransactionParams:
                 setattr(self, k, v)
 
 
-class DryRunExecutor:
+class DryRunExecutor(LockedState):
 
     """Methods to package up and kick off dry run executions"""
 
@@ -324,20 +447,56 @@ class DryRunExecutor:
 
     def __init__(
         self,
-        algod: AlgodClient,
+        algod: AlgodType,
         mode: ExecutionMode,
         teal: str,
         *,
         abi_method_signature: Optional[str] = None,
         omit_method_selector: bool = False,
         validation: bool = True,
+        compile_once: bool = False,
+        memo: Optional[DryRunMemo] = None,
+        response_format: str = "json",
+        projection: Optional[Iterable[DryRunProperty]] = None,
     ):
-        self.algod: AlgodClient = algod
+        """
+        When `compile_once` is set, the TEAL program is compiled by algod on first use and its bytecode
+        is submitted in dry run requests instead of the source, so that algod needn't re-assemble it
+        for every dry run. The bytecode is kept by the executor, so it is only ever compiled by (and
+        submitted to) the executor's own client.
+
+        When a `memo` is provided, re-running the same program on the same args with the same `txn_params`
+        returns the `DryRunInspector` built the first time around, without a dry run request.
+        Batched inputs run as one group, so their inspectors are only returned again for the very same batch.
+
+        When `response_format` is "msgpack", an `AlgodClient` is asked for msgpack dry run responses,
+        which are normalized into the shape of JSON responses (cf. `dryrun_msgpack()`).
+
+        When a `projection` is provided, only the `DryRunProperty`s it contains are expected to be dug out
+        of the resulting inspectors. Traces are then neither normalized nor scraped unless one of them needs it,
+        and are otherwise only processed when first needed, e.g. for a report (cf. `DryRunInspector`).
+        """
+        assert response_format in (
+            "json",
+            "msgpack",
+        ), f"response_format must be json or msgpack but was {response_format}"
+        if isinstance(algod, (list, tuple)):
+            algod = AlgodPool(algod)
+        self.algod: DryRunClient = cast(DryRunClient, algod)
         self.mode: ExecutionMode = mode
         self.program: str = teal
         self.abi_method_signature: Optional[str] = abi_method_signature
         self.omit_method_selector: bool = omit_method_selector
         self.validation: bool = validation
+        self.compile_once: bool = compile_once
+        self.memo: Optional[DryRunMemo] = memo
+        self.response_format: str = response_format
+        self.projection: Optional[FrozenSet[DryRunProperty]] = (
+            None if projection is None else frozenset(projection)
+        )
+        self._fingerprint: str = sha256(teal.encode("utf-8")).hexdigest()
+        self._bytecode: Optional[bytes] = None
+        self._lock = Lock()
 
         self.is_app: bool
         self.abi_argument_types: Optional[List[EncodingType]]
@@ -403,15 +562,83 @@ class DryRunExecutor:
         *,
         txn_params: Optional[DryRunTransactionParams] = None,
         verbose: bool = False,
+        batch_size: Optional[int] = None,
+        max_workers: Optional[MaxWorkers] = None,
     ) -> Sequence[DryRunInspector]:
-        """Convenience method for easier typing - executes dry run sequence"""
+        """Convenience method for easier typing - executes dry run sequence
+
+        When `batch_size` is provided, up to `batch_size` (at most `MAX_GROUP_SIZE`) inputs
+        are packed as independent transactions into each dry run request, instead of sending
+        one request per input.
+        CAVEAT: the transactions of a request run as one atomic group. They share a pooled opcode budget,
+        and app global and local state: state written by one input is seen by the inputs which follow it
+        in the same batch. So an input's result may depend on its batch neighbours and on `batch_size`,
+        and batching should be avoided for programs which write state or which may exhaust the budget.
+
+        When `max_workers` is provided, up to `max_workers` dry run requests are in flight
+        at any given time. The order of the results is the same as that of `inputs`.
+        When `max_workers` is an `AdaptiveConcurrency`, the number of requests in flight
+        is adjusted to the latency of the node instead.
+        """
         return cast(
             Sequence[DryRunInspector],
             self._run(
-                [tuple(args) for args in inputs], txn_params=txn_params, verbose=verbose
+                [tuple(args) for args in inputs],
+                txn_params=txn_params,
+                verbose=verbose,
+                batch_size=batch_size,
+                max_workers=max_workers,
             ),
         )
 
+    def iter_sequence(
+        self,
+        inputs: Iterable[Sequence[PyTypes]],
+        *,
+        txn_params: Optional[DryRunTransactionParams] = None,
+        verbose: bool = False,
+        batch_size: Optional[int] = None,
+        max_workers: Optional[MaxWorkers] = None,
+        max_buffered: Optional[int] = None,
+    ) -> Iterator[DryRunInspector]:
+        """Lazy version of `run_sequence()` which yields an inspector for each element of `inputs`, in order.
+
+        `inputs` may be any iterable, including a generator, and is consumed only as inspectors are requested.
+        When `max_workers` is provided, at most `max_buffered` (by default `2 * max_workers`, or `2 * max_limit`
+        when `max_workers` is an `AdaptiveConcurrency`) dry runs
+        (or batches, when `batch_size` is also provided) are in flight or completed ahead of the inspector
+        being yielded, so arbitrarily long sequences run in constant memory.
+        Batches run as atomic groups, with the same CAVEAT as in `run_sequence()`.
+        """
+        if batch_size is not None:
+            assert (
+                1 <= batch_size <= MAX_GROUP_SIZE
+            ), f"batch_size must be between 1 and {MAX_GROUP_SIZE} but was {batch_size}"
+
+        all_args = (self._as_args(i, args) for i, args in enumerate(inputs))
+        if batch_size is None:
+            return _ipmap(
+                self._executor(txn_params, verbose),
+                all_args,
+                max_workers,
+                max_buffered,
+            )
+
+        batches = _ipmap(
+            self._batch_executor(txn_params, verbose),
+            _chunks(all_args, batch_size),
+            max_workers,
+            max_buffered,
+        )
+        return (inspector for batch in batches for inspector in batch)
+
+    @classmethod
+    def _as_args(cls, i: int, args: Sequence[PyTypes]) -> Tuple[PyTypes, ...]:
+        assert isinstance(
+            args, (tuple, list)
+        ), f"each args in inputs must be a tuple but at index {i=} we have {type(args)}"
+        return tuple(args)
+
     @classmethod
     def multi_exec(
         cls,
@@ -420,14 +647,59 @@ class DryRunExecutor:
         *,
         txn_params: Optional[DryRunTransactionParams] = None,
         verbose: bool = False,
+        max_workers: Optional[MaxWorkers] = None,
+        processes: Optional[int] = None,
+        shard_size: Optional[int] = None,
     ) -> Sequence[Sequence[DryRunInspector]]:
-        return [
-            cast(
-                Sequence[DryRunInspector],
-                e._run(inputs, txn_params=txn_params, verbose=verbose),
-            )
-            for e in execs
-        ]
+        """Run every executor of `execs` against `inputs`.
+        When `max_workers` is provided, each executor has up to `max_workers` dry run requests in flight.
+
+        When `processes` is provided, `inputs` are split into shards of `shard_size` (by default a quarter
+        of an even split) which are run by a pool of `processes` worker processes, so that parsing
+        and scraping responses isn't limited by the GIL. Each worker holds its own copy of the executors,
+        and so its own connections (and memos). A shard's inspectors are returned together,
+        so that what they share is sent back once, and they are reassembled in the order of `inputs`.
+        """
+        all_args = [cls._as_args(i, args) for i, args in enumerate(inputs)]
+        if processes is None:
+            return [
+                cast(
+                    Sequence[DryRunInspector],
+                    e._run(
+                        all_args,
+                        txn_params=txn_params,
+                        verbose=verbose,
+                        max_workers=max_workers,
+                    ),
+                )
+                for e in execs
+            ]
+
+        assert processes >= 1, f"processes must be positive but was {processes}"
+        assert all_args, "must provide at least one input args tuple"
+        if shard_size is None:
+            shard_size = ceil(len(all_args) / (4 * processes))
+        assert shard_size >= 1, f"shard_size must be positive but was {shard_size}"
+
+        run_kwargs = dict(
+            txn_params=txn_params, verbose=verbose, max_workers=max_workers
+        )
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_shard_worker,
+            initargs=(execs,),
+        ) as pool:
+            shards = [
+                [
+                    pool.submit(_run_shard, e, shard, run_kwargs)
+                    for shard in _chunks(all_args, shard_size)
+                ]
+                for e in range(len(execs))
+            ]
+            return [
+                [inspector for shard in shards[e] for inspector in shard.result()]
+                for e in range(len(execs))
+            ]
 
     def _run(
         self,
@@ -435,11 +707,15 @@ class DryRunExecutor:
         *,
         txn_params: Optional[DryRunTransactionParams] = None,
         verbose: bool = False,
+        batch_size: Optional[int] = None,
+        max_workers: Optional[MaxWorkers] = None,
     ) -> OneOrMany[DryRunInspector]:
         """
         Be careful when using this private method. Its behavior depends on the following type-switch:
         * when `inputs` is a tuple ---> interpret this to be a single `args` tuple and run a single dry run
         * otherwise ---> we require `inputs` to either be a `list` or a `map`, and take a dry-run for every element in the sequence
+            - when `batch_size` is provided, take a single dry run for every `batch_size` elements
+            - when `max_workers` is provided, take up to `max_workers` dry runs concurrently
         """
         executor = self._executor(txn_params, verbose)
         if isinstance(inputs, tuple):
@@ -459,41 +735,170 @@ class DryRunExecutor:
             ), f"each args in inputs list must be a tuple but at index {i=} we have {type(args)}"
 
         inputs = cast(List[Tuple[PyTypes, ...]], inputs)
-        return list(map(executor, inputs))
+        if batch_size is None:
+            return _pmap(executor, inputs, max_workers)
+
+        assert (
+            1 <= batch_size <= MAX_GROUP_SIZE
+        ), f"batch_size must be between 1 and {MAX_GROUP_SIZE} but was {batch_size}"
+        batches = [
+            inputs[i : i + batch_size] for i in range(0, len(inputs), batch_size)
+        ]
+        return [
+            inspector
+            for batch in _pmap(
+                self._batch_executor(txn_params, verbose), batches, max_workers
+            )
+            for inspector in batch
+        ]
+
+    def _dryrun(self, dryrun_req: DryrunRequest) -> dict:
+        if self.response_format == "msgpack":
+            return dryrun_msgpack(
+                self.algod, dryrun_req, traces=needs_trace(self.projection)
+            )
+        return self.algod.dryrun(dryrun_req)
 
     def _executor(
         self,
         txn_params: Optional[DryRunTransactionParams],
         verbose: bool,
     ) -> Callable[[Tuple[PyTypes, ...]], DryRunInspector]:
+        frozen_params = None if self.memo is None else _freeze(txn_params)
+        template = self._lazy_template(txn_params)
+
         def executor(args: Tuple[PyTypes, ...]) -> DryRunInspector:
             args, encoded_args = self._executor_prep(args)
+            if self.memo is not None:
+                key = self._memo_key(args, encoded_args, frozen_params)
+                memoized = self.memo.get(key)
+                if memoized is not None:
+                    return memoized
 
-            dryrun_req: DryrunRequest
-            txn_params_d = txn_params.asdict() if txn_params else {}
-            dr_acts = txn_params.dryrun_accounts if txn_params else []
-            if self.is_app:
-                dryrun_req = DryRunHelper.singleton_app_request(
-                    self.program,
-                    encoded_args,
-                    txn_params_d,
-                    dr_acts,
-                )
-            else:
-                dryrun_req = DryRunHelper.singleton_logicsig_request(
-                    self.program, encoded_args, txn_params_d
-                )
+            dryrun_req = self._dryrun_request([encoded_args], txn_params, template())
             if verbose:
                 print(f"{type(self)}._run(): {dryrun_req=}")
-            dryrun_resp = self.algod.dryrun(dryrun_req)
+            dryrun_resp = self._dryrun(dryrun_req)
             if verbose:
                 print(f"{type(self)}::_executor(): {dryrun_resp=}")
-            return DryRunInspector.from_single_response(
-                dryrun_resp, args, encoded_args, abi_type=self.abi_return_type
+            inspector = DryRunInspector.from_single_response(
+                dryrun_resp,
+                args,
+                encoded_args,
+                abi_type=self.abi_return_type,
+                projection=self.projection,
             )
+            if self.memo is not None:
+                self.memo.put(key, inspector)
+            return inspector
 
         return executor
 
+    def _batch_executor(
+        self,
+        txn_params: Optional[DryRunTransactionParams],
+        verbose: bool,
+    ) -> Callable[[List[Tuple[PyTypes, ...]]], List[DryRunInspector]]:
+        frozen_params = None if self.memo is None else _freeze(txn_params)
+        template = self._lazy_template(txn_params)
+
+        def batch_executor(inputs: List[Tuple[PyTypes, ...]]) -> List[DryRunInspector]:
+            preps = [self._executor_prep(args) for args in inputs]
+            keys: List[Hashable] = []
+            if self.memo is not None:
+                # the inputs of a batch run as one group, so each result depends on the entire batch:
+                batch_key = tuple(
+                    self._memo_key(*prep, frozen_params) for prep in preps
+                )
+                keys = [("grouped", batch_key, i) for i in range(len(preps))]
+                memoized = [self.memo.get(key) for key in keys]
+                if all(inspector is not None for inspector in memoized):
+                    return cast(List[DryRunInspector], memoized)
+
+            args_list = [prep[0] for prep in preps]
+            encoded_args_list = [prep[1] for prep in preps]
+            dryrun_req = self._dryrun_request(encoded_args_list, txn_params, template())
+            if verbose:
+                print(f"{type(self)}::_batch_executor(): {dryrun_req=}")
+            dryrun_resp = self._dryrun(dryrun_req)
+            if verbose:
+                print(f"{type(self)}::_batch_executor(): {dryrun_resp=}")
+            inspectors = DryRunInspector.from_grouped_response(
+                dryrun_resp,
+                args_list,
+                encoded_args_list,
+                abi_type=self.abi_return_type,
+                projection=self.projection,
+            )
+            if self.memo is not None:
+                for key, inspector in zip(keys, inspectors):
+                    self.memo.put(key, inspector)
+            return inspectors
+
+        return batch_executor
+
+    def _memo_key(
+        self,
+        args: Tuple[PyTypes, ...],
+        encoded_args: List[ArgType],
+        frozen_params: Hashable,
+    ) -> Hashable:
+        return (
+            self._fingerprint,
+            self.mode,
+            self.abi_method_signature,
+            repr(args),
+            repr(encoded_args),
+            frozen_params,
+        )
+
+    def _dryrun_request(
+        self,
+        encoded_args_list: List[List[ArgType]],
+        txn_params: Optional[DryRunTransactionParams],
+        template: Optional[DryRunRequestTemplate] = None,
+    ) -> DryrunRequest:
+        """
+        Build a request which runs the program once for each element of `encoded_args_list`.
+        A single element results in a singleton request.
+        """
+        if template is None:
+            template = self._request_template(txn_params)
+        if len(encoded_args_list) == 1:
+            return template.request(encoded_args_list[0])
+        return template.grouped_request(encoded_args_list)
+
+    def _request_template(
+        self, txn_params: Optional[DryRunTransactionParams]
+    ) -> DryRunRequestTemplate:
+        txn_params_d = txn_params.asdict() if txn_params else {}
+        dr_acts = txn_params.dryrun_accounts if txn_params else []
+        return DryRunRequestTemplate(
+            self._program(), self.is_app, txn_params_d, dr_acts
+        )
+
+    def _lazy_template(
+        self, txn_params: Optional[DryRunTransactionParams]
+    ) -> Callable[[], DryRunRequestTemplate]:
+        """The request template for `txn_params`, built on first use so that fully memoized runs skip it"""
+        templates: List[DryRunRequestTemplate] = []
+
+        def template() -> DryRunRequestTemplate:
+            if not templates:
+                templates.append(self._request_template(txn_params))
+            return templates[0]
+
+        return template
+
+    def _program(self) -> Program:
+        """The program as submitted in dry run requests"""
+        if not self.compile_once:
+            return self.program
+        with self._lock:
+            if self._bytecode is None:
+                self._bytecode = b64decode(self.algod.compile(self.program)["result"])
+            return self._bytecode
+
     def _executor_prep(
         self, args: Tuple[PyTypes, ...]
     ) -> Tuple[Tuple[PyTypes, ...], List[ArgType]]:
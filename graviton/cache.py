@@ -0,0 +1,233 @@
+from base64 import b64decode
+from collections import OrderedDict
+from hashlib import sha256
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Hashable, NamedTuple, Optional, Union
+import zlib
+
+from algosdk import encoding
+
+from graviton.models import DryRunClient, LockedState
+
+DEFAULT_MAX_BYTES = 256 * 2**20
+
+
+def request_digest(drr, salt: str = "") -> str:
+    """Content address of a dry run request: the sha256 hex digest of its canonical msgpack encoding"""
+    return sha256(
+        salt.encode("utf-8") + b64decode(encoding.msgpack_encode(drr))
+    ).hexdigest()
+
+
+def node_version(algod: DryRunClient) -> str:
+    """
+    Fingerprint of the algod build and network, as reported by its `/versions` endpoint.
+    Clients without a `versions()` method (e.g. `AVMClient`) are fingerprinted by their type.
+    """
+    versions_of = getattr(algod, "versions", None)
+    if versions_of is None:
+        return json.dumps(
+            {"client": f"{type(algod).__module__}.{type(algod).__qualname__}"}
+        )
+    versions = versions_of()
+    return json.dumps(
+        {"build": versions.get("build"), "genesis": versions.get("genesis_hash_b64")},
+        sort_keys=True,
+    )
+
+
+class DryRunCache(LockedState):
+    """Persistent, content-addressed cache of dry run responses, stored on disk under `directory`.
+
+    A `DryRunCache` wraps a client and may be used wherever the client is, e.g.:
+
+    ```python
+    >>> cached = DryRunCache(get_algod(), ".graviton_cache")
+    >>> inspectors = DryRunExecutor(cached, ExecutionMode.Application, teal).run_sequence(inputs)
+    ```
+
+    * responses are keyed by the canonical encoding of the request together with the algod version
+    * when the algod version differs from the one the directory was populated with, the directory is cleared.
+      Clients which don't report a version (cf. `node_version()`) are versioned by their type, so the
+      directory should be cleared by hand when their behavior changes
+    * responses are stored zlib compressed. Once the cache exceeds `max_bytes`, the least recently
+      used ones are evicted until it is back down to `EVICTION_TARGET` of `max_bytes`
+    * all other client methods are delegated to the wrapped client
+    """
+
+    EVICTION_TARGET = 0.9
+    VERSION_FILE = "VERSION"
+    SUFFIX = ".json.z"
+
+    def __init__(
+        self,
+        algod: DryRunClient,
+        directory: Union[str, Path],
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        assert max_bytes > 0, f"max_bytes must be positive but was {max_bytes}"
+        self.algod = algod
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._lock = Lock()
+        self._version: Optional[str] = None
+        self._size: int = 0
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "algod":
+            # not yet initialized, e.g. while unpickling
+            raise AttributeError(name)
+        return getattr(self.algod, name)
+
+    def dryrun(self, drr, **kwargs) -> dict:
+        """Same as `AlgodClient.dryrun()` but served from the cache when possible"""
+        path = self.directory / (request_digest(drr, self._get_version()) + self.SUFFIX)
+        try:
+            resp = json.loads(zlib.decompress(path.read_bytes()))
+        except (OSError, zlib.error, ValueError):
+            resp = None
+
+        if resp is not None:
+            try:
+                # refresh for the sake of LRU eviction
+                os.utime(path)
+            except OSError:
+                pass
+            with self._lock:
+                self.hits += 1
+            return resp
+
+        resp = self.algod.dryrun(drr, **kwargs)
+        self._store(path, zlib.compress(json.dumps(resp).encode("utf-8")))
+        with self._lock:
+            self.misses += 1
+        return resp
+
+    def clear(self) -> None:
+        """Remove every cached response"""
+        with self._lock:
+            for path in self._entries():
+                path.unlink(missing_ok=True)
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _entries(self):
+        return self.directory.glob("*" + self.SUFFIX)
+
+    def _get_version(self) -> str:
+        """Lazily fetch the algod version, invalidating the directory when it changed"""
+        if self._version is not None:
+            return self._version
+
+        version = node_version(self.algod)
+        with self._lock:
+            if self._version is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                version_file = self.directory / self.VERSION_FILE
+                prev = version_file.read_text() if version_file.exists() else None
+                if prev != version:
+                    for path in self._entries():
+                        path.unlink(missing_ok=True)
+                    version_file.write_text(version)
+                self._size = sum(p.stat().st_size for p in self._entries())
+                self._version = version
+        return self._version
+
+    def _store(self, path: Path, data: bytes) -> None:
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{id(data)}.tmp")
+        tmp.write_bytes(data)
+        with self._lock:
+            try:
+                # overwriting an entry replaces its size
+                replaced = path.stat().st_size
+            except OSError:
+                replaced = 0
+            os.replace(tmp, path)
+            self._size += len(data) - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache is down to its eviction target. Assumes the lock is held."""
+        entries = []
+        for p in self._entries():
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort(key=lambda e: e[0])
+
+        self._size = sum(size for _, size, _ in entries)
+        target = self.EVICTION_TARGET * self.max_bytes
+        for _, size, p in entries:
+            if self._size <= target:
+                break
+            p.unlink(missing_ok=True)
+            self._size -= size
+
+
+class MemoInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class DryRunMemo(LockedState):
+    """In-process LRU memo of dry run results, keyed by anything hashable.
+
+    A `DryRunExecutor` given a memo returns the previously built `DryRunInspector` when it is asked to
+    re-run the same program on the same (encoded) arguments with the same transaction parameters.
+    A single memo may be shared by several executors, e.g. by those of a `Simulation`.
+    Hit and miss counts are available via `info()`, as with `functools.lru_cache`.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        assert maxsize > 0, f"maxsize must be positive but was {maxsize}"
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key in self._data:
+                self._hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self._misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def info(self) -> MemoInfo:
+        with self._lock:
+            return MemoInfo(self._hits, self._misses, self.maxsize, len(self._data))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = 0
@@ -0,0 +1,175 @@
+from enum import Enum
+from hashlib import sha256
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional, Union
+import zlib
+
+from algosdk import encoding
+
+from graviton.cache import request_digest
+from graviton.models import DryRunClient, LockedState
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMode(Enum):
+    record = "record"
+    replay = "replay"
+
+
+class CassetteMiss(AssertionError):
+    """A request in strict replay mode which the cassette has no recorded response for"""
+
+    def __init__(self, digest: str, request: Any):
+        self.digest = digest
+        self.request = request
+        # dry run requests are shown base64 msgpack encoded, as accepted by `goal clerk dryrun-remote`
+        shown = (
+            request if isinstance(request, str) else encoding.msgpack_encode(request)
+        )
+        super().__init__(
+            f"no response was recorded in the cassette for request {digest}: {shown}"
+        )
+
+
+class DryRunCassette(LockedState):
+    """Records dry run traffic into a compressed cassette file, and replays it without an algod.
+
+    A `DryRunCassette` may be used wherever a client is, e.g.:
+
+    ```python
+    >>> with DryRunCassette("tests/cassettes/fib.z", CassetteMode.record, algod=get_algod()) as cassette:
+    ...     inspectors = DryRunExecutor(cassette, ExecutionMode.Application, teal).run_sequence(inputs)
+
+    >>> # later, no algod required:
+    >>> cassette = DryRunCassette("tests/cassettes/fib.z")
+    >>> inspectors = DryRunExecutor(cassette, ExecutionMode.Application, teal).run_sequence(inputs)
+    ```
+
+    * responses are keyed by `request_digest()` of their dry run request. Compilations (as used by `compile_once`)
+      are keyed by the digest of their TEAL source
+    * in `record` mode every request is sent to `algod` and its response recorded. The cassette is written
+      by `save()`, which is called when the cassette is used as a context manager
+    * in `replay` mode responses are served from memory. When `strict` (the default), a request that wasn't
+      recorded raises a `CassetteMiss` with the offending request. Otherwise it is sent to `algod` and recorded
+    * the cassette file is a zlib compressed JSON document
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        mode: CassetteMode = CassetteMode.replay,
+        *,
+        algod: Optional[DryRunClient] = None,
+        strict: bool = True,
+    ):
+        self.path = Path(path)
+        self.mode = mode
+        self.algod = algod
+        self.strict = strict
+        assert algod is not None or (
+            mode == CassetteMode.replay and strict
+        ), f"an algod is required to record, but was not provided for {mode} (strict={strict})"
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._lock = Lock()
+        self._dirty = False
+        self._responses: Dict[str, Any] = {}
+        if self.path.exists():
+            self._load()
+        else:
+            assert (
+                mode == CassetteMode.record or not strict
+            ), f"cannot replay the non-existent cassette {self.path}"
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "algod":
+            # not yet initialized, e.g. while unpickling
+            raise AttributeError(name)
+        assert self.algod is not None, f"cannot delegate {name} without an algod"
+        return getattr(self.algod, name)
+
+    def __enter__(self) -> "DryRunCassette":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.save()
+
+    def dryrun(self, drr, **kwargs) -> dict:
+        """Same as `AlgodClient.dryrun()` but recorded or replayed"""
+        digest = request_digest(drr)
+        return self._serve(
+            digest, drr, lambda: self.algod.dryrun(drr, **kwargs)  # type: ignore
+        )
+
+    def compile(self, source: str, **kwargs) -> dict:
+        """Same as `AlgodClient.compile()` but recorded or replayed"""
+        digest = self.compile_digest(source, **kwargs)
+        return self._serve(
+            digest, source, lambda: self.algod.compile(source, **kwargs)  # type: ignore
+        )
+
+    @classmethod
+    def compile_digest(cls, source: str, **kwargs) -> str:
+        return (
+            "compile:"
+            + sha256(
+                json.dumps([source, kwargs], sort_keys=True).encode("utf-8")
+            ).hexdigest()
+        )
+
+    def recorded(self, digest: str) -> Optional[Any]:
+        """The response recorded for the request with `digest`, if any"""
+        with self._lock:
+            return self._responses.get(digest)
+
+    def save(self) -> None:
+        """Write the recorded responses to the cassette file, if there's anything new"""
+        with self._lock:
+            if not self._dirty:
+                return
+            doc = {"version": CASSETTE_VERSION, "responses": self._responses}
+            data = zlib.compress(json.dumps(doc, sort_keys=True).encode("utf-8"), 9)
+            self._dirty = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, self.path)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "responses": len(self._responses),
+            }
+
+    def _serve(self, digest: str, request: Any, live) -> Any:
+        if self.mode == CassetteMode.replay:
+            with self._lock:
+                resp = self._responses.get(digest)
+                if resp is not None:
+                    self.hits += 1
+                    return resp
+                self.misses += 1
+            if self.strict:
+                raise CassetteMiss(digest, request)
+
+        resp = live()
+        with self._lock:
+            self._responses[digest] = resp
+            self._dirty = True
+        return resp
+
+    def _load(self) -> None:
+        doc = json.loads(zlib.decompress(self.path.read_bytes()))
+        assert (
+            doc.get("version") == CASSETTE_VERSION
+        ), f"unsupported cassette version {doc.get('version')} in {self.path}"
+        self._responses = doc["responses"]
@@ -0,0 +1,231 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from math import ceil
+from statistics import median
+from threading import Condition
+import time
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from graviton.pool import is_node_failure
+
+S = TypeVar("S")
+T = TypeVar("T")
+
+
+def percentile(xs: List[float], p: float) -> float:
+    """Nearest rank `p`-th percentile of the sorted `xs`"""
+    return xs[max(ceil(p / 100 * len(xs)), 1) - 1]
+
+
+class AdaptiveConcurrency:
+    """AIMD controller of the number of dry runs in flight, for use in place of a fixed `max_workers`.
+
+    A fixed worker count either underutilizes a fast node or overloads a slow one. `DryRunExecutor`
+    accepts an `AdaptiveConcurrency` wherever it accepts `max_workers`:
+
+    ```python
+    >>> concurrency = AdaptiveConcurrency(max_limit=32)
+    >>> inspectors = DryRunExecutor(algod, ExecutionMode.Application, teal).run_sequence(
+    ...     inputs, max_workers=concurrency
+    ... )
+    >>> concurrency.stats()
+    {'limit': 12, 'peak_limit': 14, 'requests': 1000, 'errors': 0, 'p50': 0.0041, 'p90': 0.0057, 'p99': 0.0091}
+    ```
+
+    * dry runs start with `initial` of them in flight. Once `limit` of them have completed, the median latency
+      of that window is compared to the lowest window median seen so far (the baseline)
+    * while the window median stays within `latency_tolerance` times the baseline, the limit grows by one
+    * when it exceeds it, or when a dry run fails because of the node (connection problems or a 5xx response),
+      the limit is multiplied by `backoff`. The limit decreases at most once per window
+    * a dry run which failed because of the node is retried, up to `max_retries` times. Other errors are
+      deterministic and are raised immediately
+    * the limit stays between `min_limit` and `max_limit`, and carries over to subsequent runs
+    * the latency percentiles of `stats()` are those of the last `LATENCY_SAMPLES` successful dry runs
+    """
+
+    # allows the baseline to creep up, per window, when the node gets slower for good
+    BASELINE_DRIFT = 1.02
+
+    # number of recent latencies kept for reporting percentiles
+    LATENCY_SAMPLES = 1000
+
+    def __init__(
+        self,
+        *,
+        initial: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_tolerance: float = 1.5,
+        backoff: float = 0.5,
+        max_retries: int = 3,
+    ):
+        assert (
+            1 <= min_limit <= initial <= max_limit
+        ), f"must have 1 <= min_limit <= initial <= max_limit but had {min_limit=}, {initial=}, {max_limit=}"
+        assert (
+            latency_tolerance > 1
+        ), f"latency_tolerance must exceed 1 but was {latency_tolerance}"
+        assert 0 < backoff < 1, f"backoff must be between 0 and 1 but was {backoff}"
+        assert (
+            max_retries >= 0
+        ), f"max_retries must be non-negative but was {max_retries}"
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.max_retries = max_retries
+
+        self.limit: int = initial
+        self.peak_limit: int = initial
+        self.in_flight: int = 0
+        self.requests: int = 0
+        self.errors: int = 0
+        self.baseline: Optional[float] = None
+
+        self._latencies: Deque[float] = deque(maxlen=self.LATENCY_SAMPLES)
+        self._window: List[float] = []
+        self._last_decrease: Optional[int] = None
+        self._cond = Condition()
+
+    def __getstate__(self) -> dict:
+        # conditions cannot cross process boundaries
+        state = self.__dict__.copy()
+        del state["_cond"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._cond = Condition()
+
+    def map(
+        self, f: Callable[[S], T], xs: Iterable[S], max_buffered: Optional[int] = None
+    ) -> Iterator[T]:
+        """
+        Lazy and order preserving `map()` which runs on a pool of threads, with at most `limit` calls of `f`
+        in flight at any given time, and at most `max_buffered` (by default `2 * max_limit`) results
+        in flight or computed ahead of the one being yielded
+        """
+        if max_buffered is None:
+            max_buffered = 2 * self.max_limit
+        assert (
+            max_buffered >= 1
+        ), f"max_buffered must be positive but was {max_buffered}"
+
+        def attempt(x: S) -> T:
+            return self._attempt(f, x)
+
+        pool = ThreadPoolExecutor(max_workers=self.max_limit)
+        pending: Deque[Future] = deque()
+        try:
+            for x in xs:
+                while not self._try_acquire():
+                    if pending and pending[0].done():
+                        yield pending.popleft().result()
+                    else:
+                        self._wait()
+                future = pool.submit(attempt, x)
+                future.add_done_callback(self._on_cancelled)
+                pending.append(future)
+                if len(pending) >= max_buffered:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def latency_percentiles(self, *percentiles: float) -> Dict[str, float]:
+        """Nearest rank percentiles (by default the 50th, 90th and 99th) of the most recent latencies"""
+        with self._cond:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return {}
+        return {
+            f"p{p:g}": percentile(latencies, p) for p in (percentiles or (50, 90, 99))
+        }
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of the chosen concurrency and the observed latencies"""
+        with self._cond:
+            stats: Dict[str, float] = {
+                "limit": self.limit,
+                "peak_limit": self.peak_limit,
+                "requests": self.requests,
+                "errors": self.errors,
+            }
+        stats.update(self.latency_percentiles())
+        return stats
+
+    def _attempt(self, f: Callable[[S], T], x: S) -> T:
+        # a slot was acquired on our behalf
+        retries = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                result = f(x)
+            except Exception as e:
+                node_failed = is_node_failure(e)
+                self._release(None, node_failed)
+                if not node_failed or retries >= self.max_retries:
+                    raise
+                retries += 1
+                while not self._try_acquire():
+                    self._wait()
+                continue
+            self._release(time.perf_counter() - start, False)
+            return result
+
+    def _on_cancelled(self, future: Future) -> None:
+        # the slot acquired for a cancelled attempt is returned without a sample
+        if future.cancelled():
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def _try_acquire(self) -> bool:
+        with self._cond:
+            if self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def _wait(self) -> None:
+        # completions notify, but a future may be marked done just after its notification
+        with self._cond:
+            self._cond.wait(timeout=0.05)
+
+    def _release(self, latency: Optional[float], failed: bool) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self.requests += 1
+            if failed:
+                self.errors += 1
+                self._decrease()
+            elif latency is not None:
+                self._latencies.append(latency)
+                self._window.append(latency)
+                if len(self._window) >= self.limit:
+                    self._adjust(median(self._window))
+            self._cond.notify_all()
+
+    def _adjust(self, window_median: float) -> None:
+        self.baseline = (
+            window_median
+            if self.baseline is None
+            else min(window_median, self.baseline * self.BASELINE_DRIFT)
+        )
+        if window_median > self.latency_tolerance * self.baseline:
+            self._decrease()
+            return
+
+        self.limit = min(self.limit + 1, self.max_limit)
+        self.peak_limit = max(self.peak_limit, self.limit)
+        self._window = []
+
+    def _decrease(self) -> None:
+        if self._last_decrease is None or (
+            self.requests - self._last_decrease >= self.limit
+        ):
+            self.limit = max(int(self.limit * self.backoff), self.min_limit)
+            self._last_decrease = self.requests
+        self._window = []
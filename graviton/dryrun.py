@@ -1,9 +1,15 @@
+from base64 import b64encode
+from collections import OrderedDict
 from copy import copy
+import json
 import string
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Union
 
-from algosdk import transaction
+import msgpack  # type: ignore
+
+from algosdk import constants, transaction
 from algosdk.encoding import encode_address
+from algosdk.v2client.algod import AlgodClient
 from algosdk.v2client.models import (
     DryrunRequest,
     DryrunSource,
@@ -19,6 +25,12 @@ from graviton.models import ArgType, DryRunAccountType
 
 PRINTABLE = frozenset(string.printable)
 
+# TEAL source, or its compiled bytecode
+Program = Union[str, bytes]
+
+# maximum number of transactions that may be dry run together in a single request
+MAX_GROUP_SIZE = constants.TX_GROUP_LIMIT
+
 # ### LIGHTWEIGHT ASSERTIONS FOR RE-USE ### #
 
 
@@ -64,19 +76,265 @@ def assert_no_error(drr, txn_index=None, msg=None, enforce=True):
     return ok, result
 
 
+class _TemplatedDryrunRequest(DryrunRequest):
+    """`DryrunRequest` whose invariant fields were dictified once, by its `DryRunRequestTemplate`"""
+
+    def __init__(self, dictified: Dict[str, Any], **kwargs):
+        super().__init__(**kwargs)
+        self._invariants = {attr: getattr(self, attr) for attr in dictified}
+        self._dictified = dictified
+
+    def dictify(self):
+        result = {}
+        for attr, oas_attr in self.attribute_map.items():
+            value = getattr(self, attr)
+            if attr in self._dictified and value is self._invariants[attr]:
+                result[oas_attr] = self._dictified[attr]
+            elif isinstance(value, list):
+                result[oas_attr] = [
+                    x.dictify() if hasattr(x, "dictify") else x for x in value
+                ]
+            elif hasattr(value, "dictify"):
+                result[oas_attr] = value.dictify()
+            else:
+                result[oas_attr] = value
+        return result
+
+
+class _TemplatedAppCall(transaction.SignedTransaction):
+    """App call whose dictified form is its template's, but for its own app args"""
+
+    def dictify(self):
+        if self.transaction.app_args is not self.templated_args:
+            return super().dictify()
+        d = dict(self.template_dict)
+        if self.templated_args:
+            # msgpack'ing doesn't sort dicts within lists, so keep the order of `ApplicationCallTxn.dictify()`
+            d["txn"] = OrderedDict(
+                sorted({**d["txn"], "apaa": self.templated_args}.items())
+            )
+        return d
+
+
+class _TemplatedLogicSigTransaction(transaction.LogicSigTransaction):
+    """Logic sig transaction whose dictified form is its template's, but for its own args"""
+
+    def dictify(self):
+        if self.lsig.args is not self.templated_args:
+            return super().dictify()
+        d = dict(self.template_dict)
+        if self.templated_args:
+            # as in `LogicSig.dictify()`, args come first
+            d["lsig"] = OrderedDict(arg=self.templated_args, **d["lsig"])
+        return d
+
+
+class DryRunRequestTemplate:
+    """
+    The parts of the dry run requests for `program` that don't depend on its arguments.
+
+    A template is built once per program and transaction parameters, after which `request()` and
+    `grouped_request()` only patch each input's arguments into a copy of the template's transaction.
+    The invariant apps, accounts, sources and transaction fields are shared by all requests, and are dictified only once.
+
+    The requests are identical to those of `DryRunHelper.singleton_app_request()`, `DryRunHelper.grouped_app_request()`
+    and their logic sig counterparts.
+    """
+
+    def __init__(
+        self,
+        program: Program,
+        is_app: bool,
+        txn_params: Dict[str, Any],
+        accounts: List[DryRunAccountType] = [],
+    ):
+        self.program = program
+        self.is_app = is_app
+
+        if is_app:
+            proto = DryRunHelper.singleton_app_request(
+                program, [], txn_params, accounts
+            )
+        else:
+            proto = DryRunHelper.singleton_logicsig_request(program, [], txn_params)
+        (self._stxn,) = proto.txns
+        # the transaction, but for its args, is also dictified once:
+        self._stxn.template_dict = self._stxn.dictify()
+        self._stxn_class: Any = (
+            _TemplatedAppCall if is_app else _TemplatedLogicSigTransaction
+        )
+        self._round = proto.round
+        self._sources: List[DryrunSource] = proto.sources
+        self._apps: List[Application] = proto.apps
+        self._accounts: List[Account] = proto.accounts
+
+        # grouping drops duplicate accounts:
+        grouped_accounts: Dict[str, Account] = {}
+        for acct in self._accounts or []:
+            grouped_accounts.setdefault(acct.address, acct)
+        self._grouped_accounts = list(grouped_accounts.values())
+
+        self._dictified = {
+            "apps": [app.dictify() for app in self._apps],
+            "accounts": [acct.dictify() for acct in self._accounts or []],
+            "sources": [src.dictify() for src in self._sources],
+        }
+        self._grouped_dictified = {
+            "apps": self._dictified["apps"],
+            "accounts": [acct.dictify() for acct in self._grouped_accounts],
+        }
+        if is_app:
+            self._grouped_dictified["sources"] = self._dictified["sources"]
+
+    def request(self, args: List[ArgType]) -> DryrunRequest:
+        """Request which runs the program with `args`"""
+        return _TemplatedDryrunRequest(
+            dict(self._dictified),
+            txns=[self._txn(args)],
+            sources=self._sources,
+            apps=self._apps,
+            accounts=self._accounts,
+            round=self._round,
+        )
+
+    def grouped_request(self, args_list: List[List[ArgType]]) -> DryrunRequest:
+        """Request whose i'th transaction runs the program with `args_list[i]`"""
+        assert (
+            0 < len(args_list) <= MAX_GROUP_SIZE
+        ), f"can only group between 1 and {MAX_GROUP_SIZE} requests but got {len(args_list)}"
+        if self.is_app or not self._sources:
+            sources = self._sources
+        else:
+            (src,) = self._sources
+            sources = [
+                DryrunSource(field_name="lsig", source=src.source, txn_index=i)
+                for i in range(len(args_list))
+            ]
+        return _TemplatedDryrunRequest(
+            dict(self._grouped_dictified),
+            txns=[self._txn(args) for args in args_list],
+            sources=sources,
+            apps=self._apps,
+            accounts=self._grouped_accounts,
+            round=self._round,
+        )
+
+    def _txn(self, args: List[ArgType]):
+        stxn = self._stxn_class.__new__(self._stxn_class)
+        stxn.__dict__.update(self._stxn.__dict__)
+        if self.is_app:
+            stxn.transaction = copy(stxn.transaction)
+            stxn.transaction.app_args = args
+        else:
+            stxn.lsig = copy(stxn.lsig)
+            stxn.lsig.args = args
+        stxn.templated_args = args
+        return stxn
+
+
+# ### MESSAGEPACK RESPONSES ### #
+
+# the keys of a dry run transaction result which hold traces
+TRACE_KEYS = ("app-call-trace", "logic-sig-trace")
+
+
+def dryrun_msgpack(algod: models.DryRunClient, drr, traces: bool = True) -> dict:
+    """
+    Same as `AlgodClient.dryrun()` but asking algod for a msgpack response, which is normalized into the usual
+    JSON shape.
+
+    This only helps when the server honors `format=msgpack` for dry runs, which algod's `/v2/teal/dryrun` may not:
+    the normalization was only checked against the responses of the stand-in algod of the tests (on which long
+    traces are about 3x smaller in msgpack), not against a response recorded from a real algod. A server
+    which answers in JSON regardless is handled, at the cost of the unused request parameter.
+
+    Clients other than an `AlgodClient` (e.g. pools, caches or the local AVM) are asked for the usual response.
+    Unless `traces` is set, traces are left as decoded, to be normalized by `normalize_trace()` if ever needed.
+    """
+    if not isinstance(algod, AlgodClient):
+        return algod.dryrun(drr)
+
+    body = algod.dryrun(drr, params={"format": "msgpack"}, response_format="msgpack")
+    if body[:1] == b"{":
+        # this algod only speaks JSON
+        return json.loads(body)
+    return normalize_msgpack_response(
+        msgpack.unpackb(body, raw=False, strict_map_key=False), traces=traces
+    )
+
+
+def _b64_bytes(x: Any) -> Any:
+    """Replace the bytes in `x` with their base64 encoding, as in JSON responses"""
+    if isinstance(x, bytes):
+        return b64encode(x).decode()
+    if isinstance(x, dict):
+        return {k: _b64_bytes(v) for k, v in x.items()}
+    if isinstance(x, list):
+        return [_b64_bytes(v) for v in x]
+    return x
+
+
+def _fill_teal_values(tvs: List[dict]) -> List[dict]:
+    for tv in tvs:
+        if "type" not in tv:
+            tv["type"] = 0
+        if "uint" not in tv:
+            tv["uint"] = 0
+        b = tv.get("bytes")
+        if b is None:
+            tv["bytes"] = ""
+        elif b.__class__ is bytes:
+            tv["bytes"] = b64encode(b).decode()
+    return tvs
+
+
+def normalize_trace(trace: List[dict]) -> List[dict]:
+    """Normalize the steps of a msgpack decoded `trace` in place. Normalized traces are left as they are"""
+    for step in trace:
+        if "stack" in step:
+            _fill_teal_values(step["stack"])
+        else:
+            step["stack"] = []
+        if "scratch" in step:
+            _fill_teal_values(step["scratch"])
+        else:
+            step["scratch"] = []
+    return trace
+
+
+def normalize_msgpack_response(resp: dict, traces: bool = True) -> dict:
+    """
+    Normalize a decoded msgpack dry run response into the shape of the JSON response:
+    bytes are base64 encoded, and the zero values which msgpack omits are filled into trace steps.
+    Traces, which are by far the bulk of a response, are normalized in place, and only when `traces` is set.
+    """
+    resp.setdefault("error", "")
+    resp.setdefault("protocol-version", "")
+    txns = resp.get("txns") or []
+    resp["txns"] = txns
+    for i, txn in enumerate(txns):
+        txns[i] = {
+            k: (normalize_trace(v or []) if traces else v or [])
+            if k in TRACE_KEYS
+            else _b64_bytes(v)
+            for k, v in txn.items()
+        }
+    return resp
+
+
 class DryRunHelper:
     """Utility functions for dryrun"""
 
     @classmethod
     def singleton_logicsig_request(
-        cls, program: str, args: List[ArgType], txn_params: Dict[str, Any]
+        cls, program: Program, args: List[ArgType], txn_params: Dict[str, Any]
     ):
         return cls.dryrun_request(program, models.LSig(args=args), txn_params)
 
     @classmethod
     def singleton_app_request(
         cls,
-        program: str,
+        program: Program,
         args: List[ArgType],
         txn_params: Dict[str, Any],
         accounts: List[DryRunAccountType] = [],
@@ -93,6 +351,95 @@ class DryRunHelper:
         )
         return cls.dryrun_request(program, app, txn_params)
 
+    @classmethod
+    def grouped_logicsig_request(
+        cls,
+        program: Program,
+        args_list: List[List[ArgType]],
+        txn_params: Dict[str, Any],
+    ):
+        """
+        Pack one logic sig transaction per element of `args_list` into a single `DryrunRequest`.
+        The i'th transaction of the request corresponds to `args_list[i]`.
+        """
+        return cls._group_requests(
+            [
+                cls.singleton_logicsig_request(program, args, txn_params)
+                for args in args_list
+            ]
+        )
+
+    @classmethod
+    def grouped_app_request(
+        cls,
+        program: Program,
+        args_list: List[List[ArgType]],
+        txn_params: Dict[str, Any],
+        accounts: List[DryRunAccountType] = [],
+    ):
+        """
+        Pack one app call transaction per element of `args_list` into a single `DryrunRequest`.
+        The i'th transaction of the request corresponds to `args_list[i]`.
+        """
+        return cls._group_requests(
+            [
+                cls.singleton_app_request(program, args, txn_params, accounts)
+                for args in args_list
+            ]
+        )
+
+    @classmethod
+    def _group_requests(cls, requests: List[DryrunRequest]) -> DryrunRequest:
+        """
+        Merge singleton requests into a request whose i'th transaction is the transaction of `requests[i]`.
+
+        * lsig sources point at their transaction by index, so each is re-indexed
+        * app sources, apps and accounts are keyed by app index and address, so duplicates are dropped
+
+        The transactions run as one atomic group: they share a pooled opcode budget as well as app global and
+        local state, so the result of each transaction may depend on those that precede it.
+        """
+        assert (
+            0 < len(requests) <= MAX_GROUP_SIZE
+        ), f"can only group between 1 and {MAX_GROUP_SIZE} requests but got {len(requests)}"
+
+        txns, sources, apps, accounts = [], [], [], []
+        seen_sources, seen_apps, seen_accounts = set(), set(), set()
+        for i, req in enumerate(requests):
+            assert (
+                len(req.txns) == 1
+            ), f"can only group singleton requests but request {i} has {len(req.txns)} transactions"
+            txns.append(req.txns[0])
+
+            for src in req.sources:
+                if src.field_name == "lsig":
+                    sources.append(
+                        DryrunSource(field_name="lsig", source=src.source, txn_index=i)
+                    )
+                    continue
+                key = (src.field_name, src.app_index)
+                if key not in seen_sources:
+                    seen_sources.add(key)
+                    sources.append(src)
+
+            for app in req.apps:
+                if app.id not in seen_apps:
+                    seen_apps.add(app.id)
+                    apps.append(app)
+
+            for acct in req.accounts or []:
+                if acct.address not in seen_accounts:
+                    seen_accounts.add(acct.address)
+                    accounts.append(acct)
+
+        return DryrunRequest(
+            txns=txns,
+            sources=sources,
+            apps=apps,
+            accounts=accounts,
+            round=requests[0].round,
+        )
+
     @classmethod
     def _txn_params_with_defaults(cls, txn_params: dict, for_app: bool) -> dict:
         """
@@ -193,12 +540,16 @@ class DryRunHelper:
 
     @classmethod
     def _prepare_lsig_source_request(cls, program, lsig, txn):
-        source = DryrunSource(field_name="lsig", source=program, txn_index=0)
+        """When `program` is bytecode it goes directly into the logic sig instead of a source"""
         apps = []
         accounts = []
         rnd = None
         txns = [cls._build_logicsig_txn(program, txn, lsig)]
-        sources = [source]
+        sources = (
+            []
+            if isinstance(program, bytes)
+            else [DryrunSource(field_name="lsig", source=program, txn_index=0)]
+        )
         return DryrunRequest(
             txns=txns,
             sources=sources,
@@ -209,16 +560,21 @@ class DryRunHelper:
 
     @classmethod
     def _prepare_app_source_request(cls, program, app, run_mode, txn):
+        """When `program` is bytecode it goes directly into the app's params instead of a source"""
         sender = txn.sender
-        source = DryrunSource(field_name=run_mode, source=program, txn_index=0)
         txns = [cls._build_appcall_signed_txn(txn, app)]
-        application = cls.sample_app(sender, app)
+        if isinstance(program, bytes):
+            application = cls.sample_app(sender, app, program)
+            sources = []
+        else:
+            application = cls.sample_app(sender, app)
+            source = DryrunSource(field_name=run_mode, source=program, txn_index=0)
+            # app idx must match in sources and in apps arrays so dryrun find apps sources
+            source.app_index = application.id
+            sources = [source]
         apps = [application]
         accounts = app.accounts
-        # app idx must match in sources and in apps arrays so dryrun find apps sources
-        source.app_index = application.id
         rnd = app.round
-        sources = [source]
         return DryrunRequest(
             txns=txns,
             sources=sources,
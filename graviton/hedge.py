@@ -0,0 +1,183 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import Lock
+import time
+from typing import Any, Deque, Dict, Optional, Sequence, Union
+
+from algosdk.v2client.algod import AlgodClient
+
+from graviton.concurrency import percentile as nearest_rank
+from graviton.models import DryRunClient
+from graviton.pool import AlgodPool
+
+
+class HedgedDryRunClient:
+    """Client which hedges slow dry runs: when a dry run hasn't returned after a percentile based delay,
+    a duplicate is sent and whichever response arrives first is used.
+
+    A `HedgedDryRunClient` wraps a client (or a list of clients, which are pooled so that the duplicate
+    goes to the least loaded node) and may be used wherever the client is, e.g.:
+
+    ```python
+    >>> hedged = HedgedDryRunClient([get_algod(), get_other_algod()])
+    >>> inspectors = DryRunExecutor(hedged, ExecutionMode.Application, teal).run_sequence(inputs)
+    >>> hedged.stats()
+    {'requests': 1000, 'hedged': 41, 'hedge_rate': 0.041, 'hedges_won': 17, 'saved_seconds': 12.7, ...}
+    ```
+
+    * the hedging delay is the `percentile`-th percentile latency of the last `window` dry runs,
+      and at least `min_delay` seconds. No dry run is hedged before `min_samples` of them have completed
+    * at most `max_hedge_rate` of the dry runs are hedged, so that a uniformly slow node isn't sent
+      every request twice
+    * a dry run that fails before its hedging delay is raised immediately. Otherwise the first successful
+      response is used, and the error is raised only when both fail
+    * the slower request is not cancelled. Once it completes, the time that the hedge saved is recorded
+    * requests are sent from a pool of `max_workers` threads, which should exceed the number of dry runs
+      that the caller has in flight. `close()`, or leaving a `with` block, waits for the outstanding
+      requests and shuts the threads down
+    * all other client methods are delegated to the wrapped client
+    """
+
+    def __init__(
+        self,
+        algod: Union[DryRunClient, Sequence[AlgodClient]],
+        *,
+        percentile: float = 95.0,
+        min_delay: float = 0.0,
+        min_samples: int = 20,
+        window: int = 1000,
+        max_hedge_rate: float = 0.1,
+        max_workers: int = 32,
+    ):
+        assert (
+            0 < percentile < 100
+        ), f"percentile must be in (0, 100) but was {percentile}"
+        assert min_samples >= 1, f"min_samples must be positive but was {min_samples}"
+        assert (
+            window >= min_samples
+        ), f"window must be at least min_samples={min_samples} but was {window}"
+        assert (
+            0 < max_hedge_rate <= 1
+        ), f"max_hedge_rate must be in (0, 1] but was {max_hedge_rate}"
+        if isinstance(algod, (list, tuple)):
+            algod = AlgodPool(algod)
+        self.algod: DryRunClient = algod  # type: ignore
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.max_hedge_rate = max_hedge_rate
+        self.max_workers = max_workers
+
+        self.requests: int = 0
+        self.hedged: int = 0
+        self.hedges_won: int = 0
+        self.saved_seconds: float = 0.0
+        self._init_runtime()
+
+    def _init_runtime(self) -> None:
+        self._lock = Lock()
+        self._latencies: Deque[float] = deque(maxlen=self.window)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="hedged-dryrun"
+        )
+
+    def __getstate__(self) -> dict:
+        # threads and locks cannot cross process boundaries
+        state = self.__dict__.copy()
+        del state["_lock"], state["_latencies"], state["_pool"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._init_runtime()
+
+    def __enter__(self) -> "HedgedDryRunClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "algod":
+            # not yet initialized, e.g. while unpickling
+            raise AttributeError(name)
+        return getattr(self.algod, name)
+
+    def dryrun(self, drr, **kwargs) -> dict:
+        """Same as `AlgodClient.dryrun()` but hedged"""
+        with self._lock:
+            self.requests += 1
+        primary = self._submit(drr, kwargs)
+        delay = self.hedge_delay()
+        if delay is None or not self._claim_hedge(primary, delay):
+            return primary.result()
+
+        hedge = self._submit(drr, kwargs)
+        done, _ = wait([primary, hedge], return_when=FIRST_COMPLETED)
+        winner = done.pop()
+        if winner.exception() is not None:
+            # fall back to the other request
+            winner = hedge if winner is primary else primary
+            if winner.exception() is not None:
+                raise primary.exception()  # type: ignore
+
+        if winner is hedge:
+            hedge_done = time.perf_counter()
+            with self._lock:
+                self.hedges_won += 1
+            primary.add_done_callback(lambda f: self._saved(f, hedge_done))
+        return winner.result()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a dry run is hedged, or None while there aren't enough samples"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        return max(nearest_rank(latencies, self.percentile), self.min_delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of how often dry runs were hedged and how much time it saved"""
+        delay = self.hedge_delay()
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_rate": self.hedged / self.requests if self.requests else 0.0,
+                "hedges_won": self.hedges_won,
+                "saved_seconds": self.saved_seconds,
+                "hedge_delay": delay,
+            }
+
+    def _submit(self, drr, kwargs: dict) -> Future:
+        start = time.perf_counter()
+        future = self._pool.submit(self.algod.dryrun, drr, **kwargs)
+        future.add_done_callback(lambda f: self._completed(f, start))
+        return future
+
+    def _completed(self, future: Future, start: float) -> None:
+        if future.exception() is None:
+            latency = time.perf_counter() - start
+            with self._lock:
+                self._latencies.append(latency)
+
+    def _claim_hedge(self, primary: Future, delay: float) -> bool:
+        """Whether `primary` is still outstanding after `delay`, and may be hedged"""
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return False
+        with self._lock:
+            if self.hedged + 1 > self.max_hedge_rate * self.requests:
+                return False
+            self.hedged += 1
+            return True
+
+    def _saved(self, primary: Future, hedge_done: float) -> None:
+        if primary.exception() is not None:
+            return
+        with self._lock:
+            self.saved_seconds += time.perf_counter() - hedge_done
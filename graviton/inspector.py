@@ -1,25 +1,37 @@
+from array import array
 from base64 import b64decode
+from copy import deepcopy
 import csv
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, auto
 import io
 
 from tabulate import tabulate
 from typing import (
     Any,
+    Callable,
     Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Iterator,
     List,
     Optional,
     Sequence,
     Tuple,
+    TypeVar,
     Union,
     cast,
+    overload,
 )
 
 from algosdk import abi
 from graviton.dryrun import (
+    TRACE_KEYS,
+    DryRunHelper,
     assert_error,
     assert_no_error,
+    normalize_trace,
 )
 from graviton.models import ArgType, ExecutionMode, PyTypes
 
@@ -45,6 +57,29 @@ class DryRunProperty(Enum):
 DRProp = DryRunProperty
 EncodingType = Union[abi.ABIType, str, None]
 
+T = TypeVar("T")
+
+EMPTY_SCRATCH = {"type": 0, "bytes": "", "uint": 0}
+
+# properties which are dug out of the trace, rather than out of a transaction result's summary fields:
+TRACE_PROPERTIES = frozenset(
+    {
+        DryRunProperty.stackTop,
+        DryRunProperty.maxStackHeight,
+        DryRunProperty.error,
+        DryRunProperty.errorMessage,
+    }
+)
+# properties which are dug out of the scraped trace:
+SCRAPE_PROPERTIES = frozenset({DryRunProperty.finalScratch})
+
+
+def needs_trace(projection: Optional[Iterable[DryRunProperty]]) -> bool:
+    """Whether digging the properties of the `projection` (all of them when None) requires the trace"""
+    return projection is None or bool(
+        (TRACE_PROPERTIES | SCRAPE_PROPERTIES) & set(projection)
+    )
+
 
 def mode_has_property(mode: ExecutionMode, assertion_type: "DryRunProperty") -> bool:
     missing: Dict[ExecutionMode, set] = {
@@ -93,17 +128,81 @@ class TealVal:
         return str(self) if self.is_b else self.i
 
 
+def _copied(value: T) -> T:
+    # memoized values are handed out as copies, which callers may modify, e.g. the nested lists of ABI decoded logs
+    return deepcopy(value) if isinstance(value, (dict, list)) else value  # type: ignore
+
+
+class StepView(Sequence[T]):
+    """Read only view of a per step column of `DryRunResults`, whose entries are rendered on access"""
+
+    def __init__(self, steps: int, render: Callable[[int], T]):
+        self._steps = steps
+        self._render = render
+
+    def __len__(self) -> int:
+        return self._steps
+
+    @overload
+    def __getitem__(self, i: int) -> T:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> List[T]:
+        ...
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._render(j) for j in range(*i.indices(self._steps))]
+        if i < 0:
+            i += self._steps
+        if not 0 <= i < self._steps:
+            raise IndexError(f"step {i} is out of range [0, {self._steps})")
+        return self._render(i)
+
+    def __iter__(self) -> Iterator[T]:
+        return map(self._render, range(self._steps))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (StepView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
 @dataclass
 class DryRunResults:
+    """
+    Results scraped from a dry run trace, stored by column: program counters, line numbers and the bounds
+    of each step's stack and scratch entries are typed arrays, while stack and scratch contents are indices
+    into a `pool` of distinct `TealVal`s. The per step attributes (`program_counters`, `teal_source_lines`,
+    `stack_evolution`, `scratch_evolution`, `raw_stacks`, ...) are `StepView`s of these columns.
+
+    Nothing is rendered into strings while scraping. Stacks and scratch entries are rendered only for the steps
+    which are accessed (e.g. the `last_steps` window of `DryRunInspector.tabulate()`), and each pooled value
+    is rendered at most once.
+    """
+
     steps_executed: int
-    program_counters: List[int]
-    teal_line_numbers: List[int]
-    teal_source_lines: List[str]
-    stack_evolution: List[str]
-    scratch_evolution: List[List[str]]
+    pcs: array
+    line_nums: array
+    lines: Sequence[str]
+    errors: Dict[int, str]
+    pool: List[TealVal]
+    # the stack at step i is made up of stack_entries[stack_bounds[i]:stack_bounds[i + 1]], and similarly
+    # for the scratch slots and entries of step i (its delta, or its entire state when scratch_verbose):
+    stack_bounds: array
+    stack_entries: array
+    scratch_bounds: array
+    scratch_slots: array
+    scratch_entries: array
     final_scratch_state: Dict[int, TealVal]
     slots_used: List[int]
-    raw_stacks: List[list]
+    scratch_colon: str = "->"
+    scratch_verbose: bool = False
+    rendered: Dict[int, str] = field(default_factory=dict, repr=False, compare=False)
 
     @classmethod
     def scrape(
@@ -113,90 +212,164 @@ class DryRunResults:
         scratch_colon: str = "->",
         scratch_verbose: bool = False,
     ) -> "DryRunResults":
-        pcs = [t["pc"] for t in trace]
-        line_nums = [t["line"] for t in trace]
-
-        def line_or_err(i, ln):
-            line = lines[ln - 1]
-            err = trace[i].get("error")
-            return err if err else line
-
-        tls = [line_or_err(i, ln) for i, ln in enumerate(line_nums)]
-        N = len(pcs)
-        assert N == len(tls), f"mismatch of lengths in pcs v. tls ({N} v. {len(tls)})"
+        N = len(trace)
+        pcs = array("I", [t["pc"] for t in trace])
+        line_nums = array("I", [t["line"] for t in trace])
+        errors = {i: err for i, t in enumerate(trace) if (err := t.get("error"))}
+
+        pool: List[TealVal] = []
+        pooled: Dict[tuple, int] = {}
+
+        def stack_val(s: dict) -> int:
+            key = (s["type"], s["bytes"], s["uint"])
+            if (idx := pooled.get(key)) is None:
+                idx = pooled[key] = len(pool)
+                pool.append(TealVal.from_stack(s))
+            return idx
+
+        def scratch_val(s: dict) -> int:
+            key = (None, s["bytes"], s["uint"])
+            if (idx := pooled.get(key)) is None:
+                idx = pooled[key] = len(pool)
+                pool.append(TealVal.from_scratch(s))
+            return idx
 
         # process stack var's
-        raw_stacks = [
-            [TealVal.from_stack(s) for s in x] for x in [t["stack"] for t in trace]
-        ]
-        stacks = [f"[{', '.join(map(str,stack))}]" for stack in raw_stacks]
-        assert N == len(
-            stacks
-        ), f"mismatch of lengths in tls v. stacks ({N} v. {len(stacks)})"
-
-        # process scratch var's
-        _scr1 = [
-            [TealVal.from_scratch(s) for s in x]
-            for x in [t.get("scratch", []) for t in trace]
-        ]
-        _scr2 = [
-            {i: s for i, s in enumerate(scratch) if not s.is_empty()}
-            for scratch in _scr1
-        ]
-        slots_used = sorted(set().union(*(s.keys() for s in _scr2)))
-        final_scratch_state = _scr2[-1]
-        if not scratch_verbose:
-
-            def compute_delta(prev, curr):
-                pks, cks = set(prev.keys()), set(curr.keys())
-                new_keys = cks - pks
-                if new_keys:
-                    return {k: curr[k] for k in new_keys}
-                return {k: v for k, v in curr.items() if prev[k] != v}
-
-            scratch_deltas: List[Dict[int, TealVal]] = [_scr2[0]]
-            for i in range(1, len(_scr2)):
-                scratch_deltas.append(compute_delta(_scr2[i - 1], _scr2[i]))
-
-            scratches = [
-                [f"{i}{scratch_colon}{v}" for i, v in scratch.items()]
-                for scratch in scratch_deltas
-            ]
-        else:
-            scratches = [
-                [
-                    f"{i}{scratch_colon}{scratch[i]}" if i in scratch else ""
-                    for i in slots_used
-                ]
-                for scratch in _scr2
-            ]
-
-        assert N == len(
-            scratches
-        ), f"mismatch of lengths in tls v. scratches ({N} v. {len(scratches)})"
+        stack_bounds = array("I", [0])
+        stack_entries = array("I")
+        for t in trace:
+            stack_entries.extend(map(stack_val, t["stack"]))
+            stack_bounds.append(len(stack_entries))
+
+        # process scratch var's, in a single pass over the slots which change:
+        # the entries of a step are its delta, i.e. the slots which became non-empty at that step or, when there
+        # are none, those whose non-empty value changed. When scratch_verbose, they are the entire non-empty state
+        scratch_bounds = array("I", [0])
+        scratch_slots = array("I")
+        scratch_entries = array("I")
+        state: Dict[int, int] = {}
+        slots_used = set()
+        prev: list = []
+        for t in trace:
+            curr = t.get("scratch", [])
+            new: Dict[int, int] = {}
+            changed: Dict[int, int] = {}
+            if curr != prev:
+                diffs = [i for i, (c, p) in enumerate(zip(curr, prev)) if c != p]
+                diffs.extend(
+                    range(min(len(curr), len(prev)), max(len(curr), len(prev)))
+                )
+                for slot in diffs:
+                    c = curr[slot] if slot < len(curr) else EMPTY_SCRATCH
+                    p = prev[slot] if slot < len(prev) else EMPTY_SCRATCH
+                    if c["uint"] == p["uint"] and c["bytes"] == p["bytes"]:
+                        continue
+                    if not (c["uint"] or c["bytes"]):
+                        del state[slot]
+                        continue
+                    v = scratch_val(c)
+                    (changed if slot in state else new)[slot] = v
+                    state[slot] = v
+                    slots_used.add(slot)
+                prev = curr
+            entries = state if scratch_verbose else (new or changed)
+            scratch_slots.extend(entries.keys())
+            scratch_entries.extend(entries.values())
+            scratch_bounds.append(len(scratch_slots))
+        final_scratch_state = {i: pool[v] for i, v in sorted(state.items())}
 
         bbr = cls(
             N,
             pcs,
             line_nums,
-            tls,
-            stacks,
-            scratches,
+            lines,
+            errors,
+            pool,
+            stack_bounds,
+            stack_entries,
+            scratch_bounds,
+            scratch_slots,
+            scratch_entries,
             final_scratch_state,
-            slots_used,
-            raw_stacks,
+            sorted(slots_used),
+            scratch_colon,
+            scratch_verbose,
         )
         bbr.assert_well_defined()
         return bbr
 
+    @property
+    def program_counters(self) -> StepView[int]:
+        return StepView(self.steps_executed, self.pcs.__getitem__)
+
+    @property
+    def teal_line_numbers(self) -> StepView[int]:
+        return StepView(self.steps_executed, self.line_nums.__getitem__)
+
+    @property
+    def teal_source_lines(self) -> StepView[str]:
+        return StepView(self.steps_executed, self.source_line)
+
+    @property
+    def stack_heights(self) -> StepView[int]:
+        return StepView(self.steps_executed, self.stack_height)
+
+    @property
+    def raw_stacks(self) -> StepView[List[TealVal]]:
+        return StepView(self.steps_executed, self.raw_stack)
+
+    @property
+    def stack_evolution(self) -> StepView[str]:
+        return StepView(self.steps_executed, self.render_stack)
+
+    @property
+    def scratch_evolution(self) -> StepView[List[str]]:
+        return StepView(self.steps_executed, self.render_scratch)
+
+    def source_line(self, step: int) -> str:
+        """The TEAL source line executed at `step`, or its error when it failed"""
+        return self.errors.get(step) or self.lines[self.line_nums[step] - 1]
+
+    def stack_height(self, step: int) -> int:
+        return self.stack_bounds[step + 1] - self.stack_bounds[step]
+
+    def raw_stack(self, step: int) -> List[TealVal]:
+        start, stop = self.stack_bounds[step], self.stack_bounds[step + 1]
+        return [self.pool[v] for v in self.stack_entries[start:stop]]
+
+    def render_value(self, v: int) -> str:
+        """The string rendering of the pooled value `pool[v]`"""
+        if (rendered := self.rendered.get(v)) is None:
+            rendered = self.rendered[v] = str(self.pool[v])
+        return rendered
+
+    def render_stack(self, step: int) -> str:
+        start, stop = self.stack_bounds[step], self.stack_bounds[step + 1]
+        return f"[{', '.join(map(self.render_value, self.stack_entries[start:stop]))}]"
+
+    def render_scratch(self, step: int) -> List[str]:
+        start, stop = self.scratch_bounds[step], self.scratch_bounds[step + 1]
+        scratch = {
+            slot: self.render_value(v)
+            for slot, v in zip(
+                self.scratch_slots[start:stop], self.scratch_entries[start:stop]
+            )
+        }
+        if not self.scratch_verbose:
+            return [f"{i}{self.scratch_colon}{v}" for i, v in scratch.items()]
+        return [
+            f"{i}{self.scratch_colon}{scratch[i]}" if i in scratch else ""
+            for i in self.slots_used
+        ]
+
     def assert_well_defined(self):
         assert all(
             self.steps_executed == len(x)
             for x in (
-                self.program_counters,
-                self.teal_source_lines,
-                self.stack_evolution,
-                self.scratch_evolution,
+                self.pcs,
+                self.line_nums,
+                self.stack_bounds[1:],
+                self.scratch_bounds[1:],
             )
         ), f"some mismatch in trace sizes: all expected to be {self.steps_executed}"
 
@@ -210,14 +383,14 @@ class DryRunResults:
         return self.stack_evolution[-1]
 
     def final_stack_top(self) -> Union[int, str, None]:
-        final_stack = self.raw_stacks[-1]
+        final_stack = self.raw_stack(self.steps_executed - 1)
         if not final_stack:
             return None
         top = final_stack[-1]
         return str(top) if top.is_b else top.i
 
     def max_stack_height(self) -> int:
-        return max(len(s) for s in self.raw_stacks)
+        return max(self.stack_heights)
 
     def final_scratch(
         self, with_formatting: bool = False
@@ -313,7 +486,16 @@ class DryRunInspector:
         args: Sequence[PyTypes],
         encoded_args: List[ArgType],
         abi_type: EncodingType = None,
+        projection: Optional[Iterable[DryRunProperty]] = None,
     ):
+        """
+        The transaction result is extracted lazily: each of `extracts` (logs, status, trace, `DryRunResults`, ...)
+        is computed on first access and cached.
+
+        When a `projection` is provided, only the properties it contains are expected to be dug out.
+        Unless one of them requires it, the trace may have been left un-normalized by `dryrun_msgpack()`,
+        and is normalized when first accessed.
+        """
         txns = dryrun_resp.get("txns", [])
         assert txns, "Dry Run response is missing transactions"
 
@@ -322,14 +504,21 @@ class DryRunInspector:
         ), f"Out of bounds txn_index {txn_index} when there are only {len(txns)} transactions in the Dry Run response"
 
         txn = txns[txn_index]
+        self.txn_index = txn_index
         self.args = args
         self.encoded_args = encoded_args
 
         self.mode: ExecutionMode = self.get_txn_mode(txn)
         self.parent_dryrun_response: dict = dryrun_resp
         self.txn: dict = txn
-        self.extracts: dict = self.extract_all(self.txn, self.is_app())
-        self.black_box_results: DryRunResults = self.extracts["bbr"]
+        self.projection: Optional[FrozenSet[DryRunProperty]] = (
+            None if projection is None else frozenset(projection)
+        )
+        self.extracts: dict = LazyExtracts(
+            self.txn, self.is_app(), normalize=not needs_trace(self.projection)
+        )
+        # memo of dig():
+        self._dug: Dict[Hashable, Any] = {}
         self.abi_type = abi_type
 
         # config options:
@@ -342,6 +531,24 @@ class DryRunInspector:
             show_internal_errors_on_log=True,
         )
 
+    @property
+    def abi_type(self) -> EncodingType:
+        return self._abi_type
+
+    @abi_type.setter
+    def abi_type(self, abi_type: EncodingType) -> None:
+        # the ABI type affects the dug properties, e.g. how the last log is decoded:
+        self._abi_type = abi_type
+        self._dug = {}
+
+    @property
+    def black_box_results(self) -> DryRunResults:
+        return self.extracts["bbr"]
+
+    def trace(self) -> List[dict]:
+        """The trace of the dry run, normalized into the shape of JSON responses"""
+        return self.extracts["trace"]
+
     def method_selector_param(self) -> Optional[str]:
         return cast(str, self.args[0]) if self.abi_type else None
 
@@ -359,6 +566,8 @@ class DryRunInspector:
             ), f"configuration {k}=[{v}] must be bool but was {type(v)}"
 
             setattr(self, k, v)
+        # configuration affects the dug properties, e.g. how the last log is decoded:
+        self._dug = {}
 
     def is_app(self) -> bool:
         return self.mode == ExecutionMode.Application
@@ -386,6 +595,7 @@ class DryRunInspector:
         args: Sequence[PyTypes],
         encoded_args: List[ArgType],
         abi_type: EncodingType = None,
+        projection: Optional[Iterable[DryRunProperty]] = None,
     ) -> "DryRunInspector":
         error = dryrun_resp.get("error")
         assert not error, f"dryrun response included the following error: [{error}]"
@@ -395,93 +605,237 @@ class DryRunInspector:
             len(txns) == 1
         ), f"require exactly 1 dry run transaction to create a singleton but had {len(txns)} instead"
 
-        return cls(dryrun_resp, 0, args, encoded_args, abi_type=abi_type)
+        return cls(
+            dryrun_resp,
+            0,
+            args,
+            encoded_args,
+            abi_type=abi_type,
+            projection=projection,
+        )
+
+    @classmethod
+    def from_grouped_response(
+        cls,
+        dryrun_resp: dict,
+        args_list: Sequence[Sequence[PyTypes]],
+        encoded_args_list: Sequence[List[ArgType]],
+        abi_type: EncodingType = None,
+        projection: Optional[Iterable[DryRunProperty]] = None,
+    ) -> List["DryRunInspector"]:
+        """Demultiplex a response for a request of independent transactions into
+        one inspector per transaction, where the i'th transaction was run with `args_list[i]`
+        """
+        error = dryrun_resp.get("error")
+        assert not error, f"dryrun response included the following error: [{error}]"
+
+        N = len(args_list)
+        assert N == len(
+            encoded_args_list
+        ), f"mismatch between args (length={N}) and encoded args (length={len(encoded_args_list)})"
+
+        txns = dryrun_resp.get("txns") or []
+        assert (
+            len(txns) == N
+        ), f"require exactly {N} dry run transactions to match the args but had {len(txns)} instead"
+
+        return [
+            cls(
+                dryrun_resp,
+                i,
+                args,
+                encoded_args_list[i],
+                abi_type=abi_type,
+                projection=projection,
+            )
+            for i, args in enumerate(args_list)
+        ]
+
+    # extracts which don't require the trace:
+    SUMMARY_EXTRACTS = (
+        "logs",
+        "cost",
+        "status",
+        "messages",
+        "ldeltas",
+        "gdelta",
+        "lines",
+    )
+
+    @classmethod
+    def detach(cls, inspectors: List["DryRunInspector"]) -> List["DryRunInspector"]:
+        """
+        Extract everything out of the `inspectors` right away, scraping their traces into `black_box_results`
+        (even when their projection excludes the properties which need the trace, since failures are reported
+        from it). Then drop the raw traces from their dry run responses, so that the inspectors are compact,
+        e.g. when sent back from a worker process.
+
+        Inspectors of the same (batched) dry run response keep sharing a single copy of it.
+        The `trace()` of a detached inspector is no longer available.
+        """
+        detached: Dict[int, dict] = {}
+        for inspector in inspectors:
+            extracts = inspector.extracts
+            for key in cls.SUMMARY_EXTRACTS:
+                extracts[key]
+            inspector._find_error()
+            extracts["bbr"]
+            extracts.pop("trace", None)
+
+            resp = inspector.parent_dryrun_response
+            if (stripped := detached.get(id(resp))) is None:
+                stripped = detached[id(resp)] = {
+                    **resp,
+                    "txns": [
+                        {k: v for k, v in txn.items() if k not in TRACE_KEYS}
+                        for txn in resp["txns"]
+                    ],
+                }
+            inspector.parent_dryrun_response = stripped
+            inspector.txn = stripped["txns"][inspector.txn_index]
+            if isinstance(extracts, LazyExtracts):
+                extracts.txn = inspector.txn
+        return inspectors
 
     def dig(self, dr_property: DryRunProperty, **kwargs: Dict[str, Any]) -> Any:
-        """Main router for assertable properties"""
-        txn = self.txn
-        bbr = self.black_box_results
+        """Main router for assertable properties.
+
+        Properties are dug out of the transaction result once (per distinct `kwargs`), after which they are
+        memoized until the inspector is re-configured.
+        """
+        try:
+            key: Optional[Hashable] = (dr_property, *sorted(kwargs.items()))
+            hash(key)
+        except TypeError:
+            key = None
+        if key is not None and key in self._dug:
+            return _copied(self._dug[key])
 
         assert mode_has_property(
             self.mode, dr_property
         ), f"{self.mode} cannot handle dig information from txn for assertion type {dr_property}"
 
-        if dr_property == DryRunProperty.cost:
-            # cost is treated as a derived property if budget-consumed and budget-added is available
-            return txn["budget-consumed"] - txn["budget-added"]
-
-        if dr_property == DryRunProperty.budgetAdded:
-            return txn["budget-added"]
-
-        if dr_property == DryRunProperty.budgetConsumed:
-            return txn["budget-consumed"]
-
-        if dr_property == DryRunProperty.lastLog:
-            last_log = txn.get("logs", [None])[-1]
-            if last_log is None:
-                return last_log
-
-            last_log = b64decode(last_log).hex()
-            if not self.abi_type or self.suppress_abi:
-                return last_log
-
-            try:
-                if self.has_abi_prefix:
-                    # skip the first 8 hex char's == first 4 bytes:
-                    last_log = last_log[8:]
-                return cast(abi.ABIType, self.abi_type).decode(bytes.fromhex(last_log))
-            except Exception as e:
-                if self.show_internal_errors_on_log:
-                    return str(e)
-                raise e
-
-        if dr_property == DryRunProperty.finalScratch:
-            return {k: v.as_python_type() for k, v in bbr.final_scratch_state.items()}
-
-        if dr_property == DryRunProperty.stackTop:
-            trace = self.extracts["trace"]
-            stack = trace[-1]["stack"]
-            if not stack:
+        digger = self._DIGGERS.get(dr_property)
+        if digger is None:
+            raise Exception(f"Unknown assert_type {dr_property}")
+
+        value = digger(self, **kwargs)
+        if key is not None:
+            self._dug[key] = value
+        return _copied(value)
+
+    def _dig_cost(self, **kwargs) -> int:
+        # cost is treated as a derived property if budget-consumed and budget-added is available
+        return self.txn["budget-consumed"] - self.txn["budget-added"]
+
+    def _dig_budget_added(self, **kwargs) -> int:
+        return self.txn["budget-added"]
+
+    def _dig_budget_consumed(self, **kwargs) -> int:
+        return self.txn["budget-consumed"]
+
+    def _dig_last_log(self, **kwargs) -> Any:
+        last_log = self.txn.get("logs", [None])[-1]
+        if last_log is None:
+            return last_log
+
+        last_log = b64decode(last_log).hex()
+        if not self.abi_type or self.suppress_abi:
+            return last_log
+
+        try:
+            if self.has_abi_prefix:
+                # skip the first 8 hex char's == first 4 bytes:
+                last_log = last_log[8:]
+            return cast(abi.ABIType, self.abi_type).decode(bytes.fromhex(last_log))
+        except Exception as e:
+            if self.show_internal_errors_on_log:
+                return str(e)
+            raise e
+
+    def _dig_final_scratch(self, **kwargs) -> Dict[int, Union[int, str, None]]:
+        return {
+            k: v.as_python_type()
+            for k, v in self.black_box_results.final_scratch_state.items()
+        }
+
+    def _dig_stack_top(self, **kwargs) -> Union[int, str, None]:
+        if "bbr" in self.extracts:
+            bbr = self.black_box_results
+            raw = bbr.raw_stack(bbr.steps_executed - 1)
+            if not raw:
                 return None
-            tv = TealVal.from_scratch(stack[-1])
-            return tv.as_python_type()
-
-        if dr_property == DryRunProperty.maxStackHeight:
-            return max(len(t["stack"]) for t in self.extracts["trace"])
-
-        if dr_property == DryRunProperty.status:
-            return self.extracts["status"]
-
-        if dr_property == DryRunProperty.passed:
-            return self.extracts["status"] == "PASS"
-
-        if dr_property == DryRunProperty.rejected:
-            return self.extracts["status"] == "REJECT"
-
-        if dr_property == DryRunProperty.error:
-            """
-            * when `contains` kwarg is NOT provided
-                - asserts that there was an error
-            * when `contains` kwarg IS provided
-                - asserts that there was an error AND that it's message includes `contains`'s value
-            """
-            contains = kwargs.get("contains")
-            ok, msg = assert_error(
-                self.parent_dryrun_response, contains=contains, enforce=False
-            )
-            return ok
+            # the stack top is typed by its contents, as scratch values are:
+            return TealVal(raw[-1].i, raw[-1].b, len(raw[-1].b) > 0).as_python_type()
+
+        stack = self.trace()[-1]["stack"]
+        if not stack:
+            return None
+        tv = TealVal.from_scratch(stack[-1])
+        return tv.as_python_type()
+
+    def _dig_max_stack_height(self, **kwargs) -> int:
+        if "bbr" in self.extracts:
+            return max(self.black_box_results.stack_heights)
+        return max(len(t["stack"]) for t in self.trace())
+
+    def _dig_status(self, **kwargs) -> str:
+        return self.extracts["status"]
 
-        if dr_property == DryRunProperty.errorMessage:
-            """
-            * when there was no error, we return None, else return its msg
-            """
-            _, msg = assert_no_error(self.parent_dryrun_response, enforce=False)
-            return msg if msg else None
+    def _dig_passed(self, **kwargs) -> bool:
+        return self.extracts["status"] == "PASS"
 
-        if dr_property == DryRunProperty.lastMessage:
-            return self.last_message()
+    def _dig_rejected(self, **kwargs) -> bool:
+        return self.extracts["status"] == "REJECT"
+
+    def _dig_error(self, **kwargs) -> bool:
+        """
+        * when `contains` kwarg is NOT provided
+            - asserts that there was an error
+        * when `contains` kwarg IS provided
+            - asserts that there was an error AND that it's message includes `contains`'s value
+        """
+        contains = kwargs.get("contains")
+        ok, msg = assert_error(
+            {"error": self._find_error() or ""}, contains=contains, enforce=False
+        )
+        return ok
 
-        raise Exception(f"Unknown assert_type {dr_property}")
+    def _dig_error_message(self, **kwargs) -> Optional[str]:
+        """
+        * when there was no error, we return None, else return its msg
+        """
+        _, msg = assert_no_error({"error": self._find_error() or ""}, enforce=False)
+        return msg if msg else None
+
+    def _find_error(self) -> Optional[str]:
+        """The error of the dry run (cf. `DryRunHelper.find_error()`), found once and cached with the extracts"""
+        if "error" not in self.extracts:
+            # normalize the trace that the error is found in:
+            self.trace()
+            self.extracts["error"] = DryRunHelper.find_error(
+                self.parent_dryrun_response, txn_index=self.txn_index
+            )
+        return self.extracts["error"]
+
+    def _dig_last_message(self, **kwargs) -> Optional[str]:
+        return self.last_message()
+
+    _DIGGERS: Dict[DryRunProperty, Callable[..., Any]] = {
+        DryRunProperty.cost: _dig_cost,
+        DryRunProperty.budgetAdded: _dig_budget_added,
+        DryRunProperty.budgetConsumed: _dig_budget_consumed,
+        DryRunProperty.lastLog: _dig_last_log,
+        DryRunProperty.finalScratch: _dig_final_scratch,
+        DryRunProperty.stackTop: _dig_stack_top,
+        DryRunProperty.maxStackHeight: _dig_max_stack_height,
+        DryRunProperty.status: _dig_status,
+        DryRunProperty.passed: _dig_passed,
+        DryRunProperty.rejected: _dig_rejected,
+        DryRunProperty.error: _dig_error,
+        DryRunProperty.errorMessage: _dig_error_message,
+        DryRunProperty.lastMessage: _dig_last_message,
+    }
 
     def cost(self) -> Optional[int]:
         """Assertable property for the net opcode budget consumed during dry run execution
@@ -634,21 +988,24 @@ class DryRunInspector:
         def empty_hack(se):
             return se if se else [""]
 
+        # only the steps that are shown are rendered:
+        N = bbr.steps_executed
+        first = max(N - last_steps, 0) if last_steps > 0 else 0
         rows = [
             list(
                 map(
                     str,
                     [
                         i + 1,
-                        bbr.program_counters[i],
-                        bbr.teal_line_numbers[i],
-                        bbr.teal_source_lines[i],
-                        bbr.stack_evolution[i],
-                        *empty_hack(bbr.scratch_evolution[i]),
+                        bbr.pcs[i],
+                        bbr.line_nums[i],
+                        bbr.source_line(i),
+                        bbr.render_stack(i),
+                        *empty_hack(bbr.render_scratch(i)),
                     ],
                 )
             )
-            for i in range(bbr.steps_executed)
+            for i in range(first, N)
         ]
         if col_max and col_max > 0:
             rows = [[x[:col_max] for x in row] for row in rows]
@@ -667,8 +1024,6 @@ class DryRunInspector:
             for i in range(len(rows)):
                 rows[i][-1], rows[i][-2] = rows[i][-2], rows[i][-1]
 
-        if last_steps >= 0:
-            rows = rows[-last_steps:]
         table = tabulate(rows, headers=headers, tablefmt="presto")
         return table
 
@@ -831,7 +1186,7 @@ class DryRunInspector:
         return txn["app-call-trace" if is_app else "logic-sig-trace"]
 
     @classmethod
-    def extract_all(cls, txn: dict, is_app: bool) -> dict:
+    def extract_all(cls, txn: dict, is_app: bool, scrape: bool = True) -> dict:
         result = {
             "logs": cls.extract_logs(txn),
             "cost": cls.extract_cost(txn),
@@ -843,6 +1198,55 @@ class DryRunInspector:
             "trace": cls.extract_trace(txn, is_app),
         }
 
-        result["bbr"] = DryRunResults.scrape(result["trace"], result["lines"])
+        if scrape:
+            result["bbr"] = cls.scrape(result)
 
         return result
+
+    @classmethod
+    def scrape(cls, extracts: dict) -> DryRunResults:
+        return DryRunResults.scrape(extracts["trace"], extracts["lines"])
+
+
+class LazyExtracts(dict):
+    """
+    Extracts of a dry run transaction result (cf. `DryRunInspector.extract_all()`), each of which is computed
+    on first access and cached. When `normalize` is set, the trace is normalized in place as it is extracted
+    (cf. `normalize_trace()`)
+    """
+
+    def __init__(self, txn: dict, is_app: bool, normalize: bool = False):
+        super().__init__()
+        self.txn = txn
+        self.is_app = is_app
+        self.normalize = normalize
+
+    def __missing__(self, key: str) -> Any:
+        self[key] = value = self.extract(key)
+        return value
+
+    def extract(self, key: str) -> Any:
+        txn, is_app = self.txn, self.is_app
+        if key == "logs":
+            return DryRunInspector.extract_logs(txn)
+        if key == "cost":
+            return DryRunInspector.extract_cost(txn)
+        if key == "status":
+            return DryRunInspector.extract_status(txn, is_app)
+        if key == "messages":
+            return DryRunInspector.extract_messages(txn, is_app)
+        if key == "ldeltas":
+            return DryRunInspector.extract_local_deltas(txn)
+        if key == "gdelta":
+            return DryRunInspector.extract_global_delta(txn)
+        if key == "lines":
+            return DryRunInspector.extract_lines(txn, is_app)
+        if key == "trace":
+            assert any(
+                k in txn for k in TRACE_KEYS
+            ), "the trace was dropped when its inspector was detached (cf. DryRunInspector.detach())"
+            trace = DryRunInspector.extract_trace(txn, is_app)
+            return normalize_trace(trace) if self.normalize else trace
+        if key == "bbr":
+            return DryRunInspector.scrape(self)
+        raise KeyError(key)
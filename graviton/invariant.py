@@ -137,39 +137,56 @@ class Invariant:
         identities: Optional[Sequence[DryRunInspector]] = None,
         msg: str = "",
     ):
+        for i, inspector in enumerate(inspectors):
+            ok, report = self.validate_one(
+                dr_property,
+                inspector,
+                identity=identities[i] if identities else None,
+                row=i + 1,
+                msg=msg,
+            )
+            assert ok, report
+
+    def validate_one(
+        self,
+        dr_property: DryRunProperty,
+        inspector: DryRunInspector,
+        *,
+        identity: Optional[DryRunInspector] = None,
+        row: int = 1,
+        msg: str = "",
+    ) -> Tuple[bool, str]:
+        """
+        Validate the invariant against a single inspector (paired with its `identity` for `IdenticalPair` predicates).
+        Returns whether the invariant holds, along with the inspector's report of the failure when it doesn't.
+        """
         assert isinstance(
             dr_property, DryRunProperty
         ), f"invariants types must be DryRunProperty's but got [{dr_property}] which is a {type(dr_property)}"
 
-        if identities:
+        actual = inspector.dig(dr_property)
+        if identity is None:
+            ok, fail_msg = self(inspector.args, actual)
+        else:
             assert (
                 self.predicate_kind == PredicateKind.IdenticalPair
             ), f"Unhandled PredicateKind {self.predicate_kind}"
-            for i, inspector in enumerate(inspectors):
-                identity = identities[i]
-
-                assert (
-                    inspector.abi_type == identity.abi_type
-                ), f"IdenticalPair predicates should have the same abi_type but {inspector.abi_type=} V. {identity.abi_type=}"
 
-                assert (
-                    inspector.abi_params_or_args() == identity.abi_params_or_args()
-                ), f"IdenticalPair predicates expects the same argments but they aren't: {inspector.abi_params_or_args()=} V. {identity.abi_params_or_args()=}"
-                expected = identity.dig(dr_property)
-                actual = inspector.dig(dr_property)
-                ok, fail_msg = self(inspector.args, actual, external_expected=expected)
-                if msg:
-                    fail_msg += f". invariant provided message:{msg}"
-                assert ok, inspector.report(msg=fail_msg, row=i + 1)
-
-            return
+            assert (
+                inspector.abi_type == identity.abi_type
+            ), f"IdenticalPair predicates should have the same abi_type but {inspector.abi_type=} V. {identity.abi_type=}"
 
-        for i, inspector in enumerate(inspectors):
-            actual = inspector.dig(dr_property)
-            ok, fail_msg = self(inspector.args, actual)
-            if msg:
-                fail_msg += f". invariant provided message:{msg}"
-            assert ok, inspector.report(msg=fail_msg, row=i + 1)
+            assert (
+                inspector.abi_params_or_args() == identity.abi_params_or_args()
+            ), f"IdenticalPair predicates expects the same argments but they aren't: {inspector.abi_params_or_args()=} V. {identity.abi_params_or_args()=}"
+            expected = identity.dig(dr_property)
+            ok, fail_msg = self(inspector.args, actual, external_expected=expected)
+
+        if ok:
+            return True, ""
+        if msg:
+            fail_msg += f". invariant provided message:{msg}"
+        return False, inspector.report(msg=fail_msg, row=row)
 
     @classmethod
     def prepare_predicate(
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import List, Optional, Sequence, Union
+from threading import Lock
+from typing import Any, List, Optional, Protocol, Sequence, Union
 
 from algosdk.encoding import encode_address
 from algosdk.transaction import OnComplete
@@ -15,6 +16,31 @@ Stringy = Union[str, bytes]
 PyTypes = Union[bool, int, Sequence, Stringy]
 
 
+class DryRunClient(Protocol):
+    """The subset of the `AlgodClient` API that's needed to execute dry runs"""
+
+    def dryrun(self, drr, **kwargs) -> Any:
+        ...
+
+    def compile(self, source, **kwargs) -> Any:
+        ...
+
+
+class LockedState:
+    """Mixin for classes which guard their state with `self._lock`.
+    Locks cannot cross process boundaries, so a fresh one is created when unpickling.
+    """
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+
 class ExecutionMode(Enum):
     Signature = auto()
     Application = auto()
@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+from statistics import median
+from threading import Lock
+import time
+from typing import Any, Dict, List, Optional, Sequence, cast
+
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client.algod import AlgodClient
+
+from graviton.models import LockedState
+
+
+def is_node_failure(e: Exception) -> bool:
+    """Whether a request failed because of its node (connection problems or a 5xx response), so that retrying may succeed"""
+    if isinstance(e, AlgodHTTPError):
+        return e.code is None or e.code >= 500
+    return isinstance(e, OSError)
+
+
+@dataclass
+class NodeStats:
+    """Bookkeeping for a single algod client in an `AlgodPool`"""
+
+    address: str
+    outstanding: int = 0
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    ewma_latency: Optional[float] = None
+    ejected_until: float = 0.0
+
+    def is_ejected(self, now: float) -> bool:
+        return now < self.ejected_until
+
+
+class AlgodPool(LockedState):
+    """Pool of algod clients which dispatches each dry run to one of them.
+
+    A `DryRunExecutor` (or `Simulation`) accepts an `AlgodPool` wherever it accepts an `AlgodClient`.
+
+    Routing:
+    * each dry run goes to the node with the fewest outstanding requests, breaking ties by lowest latency
+    * a node is ejected for `ejection_period` seconds after `max_failures` consecutive failures
+    * a node is ejected for `ejection_period` seconds when its average latency exceeds `slow_factor`
+      times the median average latency of the other nodes (once it has served `min_samples` dry runs)
+    * a dry run that fails because of its node (connection problems or a 5xx response)
+      is retried on another node. Other errors are deterministic and are raised immediately.
+    * when all nodes are ejected, the node whose ejection expires soonest is used anyway
+    """
+
+    EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        algods: Sequence[AlgodClient],
+        *,
+        max_failures: int = 3,
+        slow_factor: float = 4.0,
+        min_samples: int = 10,
+        ejection_period: float = 30.0,
+    ):
+        assert algods, "must provide at least one algod client"
+        assert (
+            max_failures >= 1
+        ), f"max_failures must be positive but was {max_failures}"
+        assert slow_factor > 1, f"slow_factor must exceed 1 but was {slow_factor}"
+
+        self.algods: List[AlgodClient] = list(algods)
+        self.max_failures = max_failures
+        self.slow_factor = slow_factor
+        self.min_samples = min_samples
+        self.ejection_period = ejection_period
+
+        self._nodes: List[NodeStats] = [NodeStats(a.algod_address) for a in self.algods]
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.algods)
+
+    def dryrun(self, drr, **kwargs) -> dict:
+        """Same as `AlgodClient.dryrun()` but routed to a node of the pool"""
+        return self._dispatch("dryrun", drr, **kwargs)
+
+    def compile(self, source, **kwargs) -> dict:
+        """Same as `AlgodClient.compile()` but routed to a node of the pool"""
+        return self._dispatch("compile", source, **kwargs)
+
+    def versions(self, **kwargs) -> dict:
+        """Same as `AlgodClient.versions()` but routed to a node of the pool"""
+        return self._dispatch("versions", **kwargs)
+
+    def _dispatch(self, method: str, *args, **kwargs) -> Any:
+        tried: List[int] = []
+        while True:
+            i = self._acquire(exclude=tried)
+            tried.append(i)
+            start = time.perf_counter()
+            try:
+                resp = getattr(self.algods[i], method)(*args, **kwargs)
+            except Exception as e:
+                node_failed = is_node_failure(e)
+                self._release(i, None, node_failed)
+                if node_failed and len(tried) < len(self.algods):
+                    continue
+                raise
+            self._release(i, time.perf_counter() - start, False)
+            return resp
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Snapshot of the bookkeeping for each node"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "address": n.address,
+                    "outstanding": n.outstanding,
+                    "requests": n.requests,
+                    "failures": n.failures,
+                    "ewma_latency": n.ewma_latency,
+                    "ejected": n.is_ejected(now),
+                }
+                for n in self._nodes
+            ]
+
+    def _acquire(self, exclude: List[int]) -> int:
+        now = time.monotonic()
+        with self._lock:
+            candidates = [i for i in range(len(self._nodes)) if i not in exclude]
+            healthy = [i for i in candidates if not self._nodes[i].is_ejected(now)]
+            if healthy:
+                i = min(
+                    healthy,
+                    key=lambda i: (
+                        self._nodes[i].outstanding,
+                        self._nodes[i].ewma_latency or 0.0,
+                    ),
+                )
+            else:
+                i = min(candidates, key=lambda i: self._nodes[i].ejected_until)
+            self._nodes[i].outstanding += 1
+            return i
+
+    def _release(self, i: int, latency: Optional[float], failed: bool) -> None:
+        now = time.monotonic()
+        with self._lock:
+            node = self._nodes[i]
+            node.outstanding -= 1
+            node.requests += 1
+            if failed:
+                node.failures += 1
+                node.consecutive_failures += 1
+                if node.consecutive_failures >= self.max_failures:
+                    node.consecutive_failures = 0
+                    node.ejected_until = now + self.ejection_period
+                return
+
+            node.consecutive_failures = 0
+            if latency is None:
+                return
+
+            node.ewma_latency = (
+                latency
+                if node.ewma_latency is None
+                else self.EWMA_ALPHA * latency
+                + (1 - self.EWMA_ALPHA) * node.ewma_latency
+            )
+            if node.requests >= self.min_samples and self._is_slow(node, now):
+                node.ejected_until = now + self.ejection_period
+
+    def _is_slow(self, node: NodeStats, now: float) -> bool:
+        latencies = [
+            n.ewma_latency
+            for n in self._nodes
+            if n is not node and n.ewma_latency is not None and not n.is_ejected(now)
+        ]
+        if not latencies:
+            return False
+        return cast(float, node.ewma_latency) > self.slow_factor * median(latencies)
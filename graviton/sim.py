@@ -1,13 +1,32 @@
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Sequence, TypeVar, Union, cast
-
-from algosdk.v2client.algod import AlgodClient
+from itertools import repeat, tee
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Sized,
+    TypeVar,
+    Union,
+    cast,
+)
 
 from graviton.abi_strategy import CallStrategy
-from graviton.blackbox import DryRunExecutor, DryRunTransactionParams as TxParams
+from graviton.blackbox import (
+    AlgodType,
+    DryRunExecutor,
+    DryRunTransactionParams as TxParams,
+    MaxWorkers,
+)
+from graviton.cache import DryRunMemo
 from graviton.inspector import DryRunProperty as DRProp, DryRunInspector
 from graviton.invariant import Invariant
 from graviton.models import ExecutionMode, PyTypes
+from graviton.pool import AlgodPool
 
 # TODO: this will encompass strategies, composed of
 # hypothesis strategies as well as home grown ABIStrategy sub-types
@@ -31,7 +50,7 @@ class Simulation:
 
     def __init__(
         self,
-        algod: AlgodClient,
+        algod: AlgodType,
         mode: ExecutionMode,
         simulate_teal: str,
         predicates: Dict[DRProp, Any],
@@ -40,7 +59,11 @@ class Simulation:
         omit_method_selector: bool = False,
         validation: bool = True,
         identities_teal: Optional[str] = None,
+        memo: Optional[DryRunMemo] = None,
     ):
+        if isinstance(algod, (list, tuple)):
+            # share a single pool between the executors
+            algod = AlgodPool(algod)
         self.simulate_dre: DryRunExecutor = DryRunExecutor(
             algod,
             mode,
@@ -48,6 +71,8 @@ class Simulation:
             abi_method_signature=abi_method_signature,
             omit_method_selector=omit_method_selector,
             validation=validation,
+            memo=memo,
+            projection=predicates.keys(),
         )
         self.identities_dre: Optional[DryRunExecutor] = None
         if identities_teal:
@@ -58,6 +83,8 @@ class Simulation:
                 abi_method_signature=abi_method_signature,
                 omit_method_selector=omit_method_selector,
                 validation=validation,
+                memo=memo,
+                projection=predicates.keys(),
             )
         self.predicates: Dict[DRProp, Any] = predicates
 
@@ -70,10 +97,23 @@ class Simulation:
         txn_params: Optional[TxParams] = None,
         verbose: bool = False,
         msg: str = "",
+        max_failures: Optional[int] = None,
+        max_workers: Optional[MaxWorkers] = None,
+        processes: Optional[int] = None,
     ) -> SimulationResults:
         """
         run_and_assert: simulation + InputStrategy → SUCCESS or FAILURE
 
+        When `max_failures` is provided, every result is validated as soon as it arrives, and the remaining
+        inputs are skipped once `max_failures` of them have failed an invariant. The assertion then reports
+        each failure, as well as how many inputs were skipped. Dry runs are then executed lazily.
+
+        Up to `max_workers` dry runs are in flight concurrently, where `max_workers` may also be an
+        `AdaptiveConcurrency`.
+
+        When `processes` is provided, the inputs are sharded across a pool of `processes` worker processes,
+        as with `DryRunExecutor.multi_exec()`. This cannot be combined with `max_failures`.
+
         TODO: Add some real comments (cf. Issue #51)
         """
         assert inputs, "must provide actual inputs to run against!"
@@ -92,19 +132,35 @@ class Simulation:
         else:
             inputs_iter = cast(Iterable[Sequence[PyTypes]], inputs)
 
-        inputs_l = listify(inputs_iter)
-        simulate_inspectors = listify(
-            self.simulate_dre.run_sequence(
-                inputs_l, txn_params=txn_params, verbose=verbose
+        if max_failures is not None:
+            assert (
+                processes is None
+            ), "max_failures cannot be combined with sharding across processes"
+            return self._run_incrementally(
+                inputs_iter,
+                txn_params=txn_params,
+                verbose=verbose,
+                msg=msg,
+                max_failures=max_failures,
+                max_workers=max_workers,
             )
-        )
-        identities_inspectors = None
+
+        inputs_l = listify(inputs_iter)
+        execs = [self.simulate_dre]
         if self.identities_dre:
-            identities_inspectors = listify(
-                self.identities_dre.run_sequence(
-                    inputs_l, txn_params=txn_params, verbose=verbose
-                )
+            execs.append(self.identities_dre)
+        simulate_inspectors, *identities = (
+            listify(inspectors)
+            for inspectors in DryRunExecutor.multi_exec(
+                execs,
+                inputs_l,
+                txn_params=txn_params,
+                verbose=verbose,
+                max_workers=max_workers,
+                processes=processes,
             )
+        )
+        identities_inspectors = identities[0] if identities else None
 
         Invariant.full_validation(
             self.predicates,
@@ -114,3 +170,85 @@ class Simulation:
         )
 
         return SimulationResults(True, simulate_inspectors, identities_inspectors)
+
+    def _run_incrementally(
+        self,
+        inputs: Iterable[Sequence[PyTypes]],
+        *,
+        txn_params: Optional[TxParams],
+        verbose: bool,
+        msg: str,
+        max_failures: int,
+        max_workers: Optional[MaxWorkers],
+    ) -> SimulationResults:
+        simulate_inputs: Iterable[Sequence[PyTypes]]
+        assert (
+            max_failures >= 1
+        ), f"max_failures must be positive but was {max_failures}"
+        invariants = Invariant.as_invariants(self.predicates)
+        total = len(inputs) if isinstance(inputs, Sized) else None
+
+        if self.identities_dre:
+            simulate_inputs, identities_inputs = tee(inputs)
+            identities_iter: Iterator[
+                Optional[DryRunInspector]
+            ] = self.identities_dre.iter_sequence(
+                identities_inputs,
+                txn_params=txn_params,
+                verbose=verbose,
+                max_workers=max_workers,
+            )
+        else:
+            simulate_inputs, identities_iter = inputs, repeat(None)
+        simulate_iter = self.simulate_dre.iter_sequence(
+            simulate_inputs,
+            txn_params=txn_params,
+            verbose=verbose,
+            max_workers=max_workers,
+        )
+
+        simulate_inspectors: List[DryRunInspector] = []
+        identities_inspectors: List[DryRunInspector] = []
+        failures: List[str] = []
+        stopped_early = False
+        try:
+            for row, (inspector, identity) in enumerate(
+                zip(simulate_iter, identities_iter), start=1
+            ):
+                simulate_inspectors.append(inspector)
+                if identity is not None:
+                    identities_inspectors.append(identity)
+                for dr_prop, invariant in invariants.items():
+                    ok, report = invariant.validate_one(
+                        dr_prop, inspector, identity=identity, row=row, msg=msg
+                    )
+                    if not ok:
+                        failures.append(report)
+                        break
+                if len(failures) >= max_failures:
+                    stopped_early = True
+                    break
+        finally:
+            # stop the dry runs still in flight:
+            for it in (simulate_iter, identities_iter):
+                if isinstance(it, Generator):
+                    it.close()
+
+        validated = len(simulate_inspectors)
+        if failures:
+            skipped = ""
+            if stopped_early:
+                if total is None:
+                    skipped = ", so any remaining inputs were skipped"
+                elif total > validated:
+                    skipped = f", so {total - validated} of {total} inputs were skipped"
+            raise AssertionError(
+                f"{len(failures)} of {validated} validated inputs failed{skipped}:\n"
+                + "\n".join(failures)
+            )
+
+        return SimulationResults(
+            True,
+            simulate_inspectors,
+            identities_inspectors if self.identities_dre else None,
+        )
@@ -0,0 +1,416 @@
+from base64 import b64decode
+from copy import copy
+from dataclasses import dataclass
+from hashlib import sha256
+import re
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+import msgpack  # type: ignore
+
+from algosdk import constants, encoding
+from algosdk.error import AlgodHTTPError
+from algosdk.source_map import SourceMap
+from algosdk.transaction import (
+    ApplicationCallTxn,
+    LogicSig,
+    LogicSigTransaction,
+    OnComplete,
+    PaymentTxn,
+    SignedTransaction,
+    StateSchema,
+    SuggestedParams,
+    assign_group_id,
+)
+from algosdk.v2client.algod import AlgodClient
+from algosdk.v2client.models import DryrunRequest
+
+from graviton.blackbox import _pmap
+from graviton.models import LockedState
+
+# each top level app call adds this much to the pooled opcode budget of its group:
+APP_CALL_BUDGET = 700
+MAX_PROGRAM_PAGE = 2048
+MAX_GLOBAL_SCHEMA = StateSchema(32, 32)
+MAX_LOCAL_SCHEMA = StateSchema(8, 8)
+
+EXEC_TRACE_CONFIG = {"enable": True, "stack-change": True, "scratch-change": True}
+
+# body of the clear state program of created apps: `intcblock 1; intc_0`
+CLEAR_PROGRAM_BODY = b"\x20\x01\x01\x22"
+
+EMPTY_VALUE: Dict[str, Any] = {"type": 0, "uint": 0, "bytes": ""}
+
+_PROGRAM_ERROR = re.compile(r"(?:logic eval error: |err=)(.*?)(?:\. Details:|$)")
+
+
+@dataclass(frozen=True)
+class CompiledProgram:
+    """A program's bytecode together with its TEAL source lines and source map"""
+
+    bytecode: bytes
+    lines: List[str]
+    source_map: SourceMap
+
+    def line(self, pc: int) -> int:
+        """1-based line of the instruction at `pc`, as in dry run traces"""
+        line = self.source_map.get_line_for_pc(pc)
+        return 1 if line is None else line + 1
+
+
+class SimulateClient(LockedState):
+    """Client which serves dry run requests using algod's simulate endpoint.
+
+    A `SimulateClient` may be used wherever an `AlgodClient` is, e.g.:
+
+    ```python
+    >>> algod = SimulateClient(get_algod(), sender=funded_address)
+    >>> inspectors = DryRunExecutor(algod, ExecutionMode.Application, teal).run_sequence(inputs)
+    ```
+
+    Each transaction of a dry run request is simulated as its own transaction group, with execution
+    traces enabled. The simulation results are then adapted into a response shaped like that of the
+    dry run endpoint, so that `DryRunInspector` reports the same cost, stack, scratch, logs and status.
+    Up to `max_workers` groups are simulated concurrently.
+
+    Unlike a dry run, a simulation runs against the actual ledger, hence the following limitations:
+    * every transaction is sent from `sender` (by default, the transaction's own sender), which must be funded
+    * an app call whose `index` is that of a deployed app with the same approval program calls that app.
+      Any other app call creates a new app with the program instead, so `txn ApplicationID` evaluates to 0
+      and the sender isn't opted in
+    * a logic sig is run as the sender of a 0 fee transaction, grouped after a payment from `sender` covering
+      both fees. So `txn Sender`, `txn GroupIndex` and `global GroupSize` differ from a dry run
+    * the transactions' validity rounds are those currently suggested by algod
+    * accounts and app state provided in the dry run request are not supported
+    * the source lines reported are those of the TEAL source rather than of algod's disassembly
+    """
+
+    def __init__(
+        self,
+        algod: AlgodClient,
+        *,
+        sender: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.algod = algod
+        self.sender = sender
+        self.max_workers = max_workers
+
+        self._lock = Lock()
+        self._by_source: Dict[str, CompiledProgram] = {}
+        self._by_bytecode: Dict[bytes, CompiledProgram] = {}
+        self._deployed: Dict[Tuple[int, bytes], bool] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "algod":
+            # not yet initialized, e.g. while unpickling
+            raise AttributeError(name)
+        return getattr(self.algod, name)
+
+    def compile(self, source: str, **kwargs) -> dict:
+        """Same as `AlgodClient.compile()`. The source map is kept so that traces of the bytecode can be mapped back to `source`."""
+        resp = self.algod.compile(source, source_map=True, **kwargs)
+        program = CompiledProgram(
+            b64decode(resp["result"]), source.splitlines(), SourceMap(resp["sourcemap"])
+        )
+        with self._lock:
+            self._by_source[sha256(source.encode("utf-8")).hexdigest()] = program
+            self._by_bytecode[program.bytecode] = program
+        return resp
+
+    def dryrun(self, drr: DryrunRequest, **kwargs) -> dict:
+        """Same as `AlgodClient.dryrun()`, but executed by simulating each of the request's transactions"""
+        assert (
+            not drr.accounts
+        ), "the simulate backend does not support accounts in the dry run request"
+        assert not any(
+            app.params.global_state for app in drr.apps
+        ), "the simulate backend does not support global state in the dry run request"
+
+        sp = self.algod.suggested_params()
+        sp.min_fee = sp.min_fee or constants.MIN_TXN_FEE
+        sp.fee, sp.flat_fee = sp.min_fee, True
+
+        jobs = [self._prepare(drr, i, sp) for i in range(len(drr.txns))]
+        results = _pmap(self._simulate, [group for group, *_ in jobs], self.max_workers)
+        return {
+            "error": "",
+            "protocol-version": "",
+            "txns": [
+                self._dryrun_txn(result, *job[1:]) for result, job in zip(results, jobs)
+            ],
+        }
+
+    def _prepare(
+        self, drr: DryrunRequest, i: int, sp: SuggestedParams
+    ) -> Tuple[List[Any], int, CompiledProgram, Optional[str]]:
+        """Build the group simulating the i'th transaction of `drr`.
+
+        Returns the group, the index of the transaction under test within it, its program, and
+        the key of the program's trace in the simulation results (None for logic sigs).
+        """
+        stxn = drr.txns[i]
+        if isinstance(stxn, LogicSigTransaction):
+            source = next(
+                (
+                    s.source
+                    for s in drr.sources
+                    if s.field_name == "lsig" and s.txn_index == i
+                ),
+                None,
+            )
+            program = self._program(source, stxn.lsig.logic)
+            return self._lsig_group(stxn, program, sp), 1, program, None
+
+        txn = stxn.transaction
+        assert isinstance(
+            txn, ApplicationCallTxn
+        ), f"cannot simulate transaction {i} of type {type(txn)}"
+        is_clear = txn.on_complete == OnComplete.ClearStateOC
+        field_name = "clearp" if is_clear else "approv"
+        sources = [s.source for s in drr.sources if s.field_name == field_name]
+        bytecodes = [
+            app.params.clear_state_program if is_clear else app.params.approval_program
+            for app in drr.apps
+        ]
+        assert (
+            len(set(sources)) <= 1 and len(drr.apps) <= 1
+        ), "the simulate backend supports a single app per dry run request"
+        program = self._program(
+            sources[0] if sources else None, bytecodes[0] if bytecodes else None
+        )
+        trace_key = (
+            "clear-state-program-trace" if is_clear else "approval-program-trace"
+        )
+        return [self._app_call(txn, program, sp)], 0, program, trace_key
+
+    def _program(
+        self, source: Optional[str], bytecode: Optional[bytes]
+    ) -> CompiledProgram:
+        if source is not None:
+            with self._lock:
+                program = self._by_source.get(
+                    sha256(source.encode("utf-8")).hexdigest()
+                )
+            if program is None:
+                self.compile(source)
+                return self._program(source, None)
+            return program
+
+        assert bytecode, "dry run request has neither a source nor a program"
+        if isinstance(bytecode, str):
+            bytecode = b64decode(bytecode)
+        with self._lock:
+            program = self._by_bytecode.get(bytecode)
+        if program is None:
+            # the bytecode wasn't compiled by this client, so recover a source for it:
+            teal = self.algod.algod_request(
+                "POST",
+                "/teal/disassemble",
+                data=bytecode,
+                headers={"Content-Type": "application/x-binary"},
+            )["result"]
+            program = self._program(teal, None)
+            with self._lock:
+                self._by_bytecode[bytecode] = program
+        return program
+
+    def _app_call(
+        self, txn: ApplicationCallTxn, program: CompiledProgram, sp: SuggestedParams
+    ) -> SignedTransaction:
+        sender = self.sender or txn.sender
+        common = dict(
+            sender=sender,
+            sp=sp,
+            on_complete=txn.on_complete,
+            app_args=txn.app_args,
+            accounts=txn.accounts,
+            foreign_apps=txn.foreign_apps,
+            foreign_assets=txn.foreign_assets,
+            note=txn.note,
+            lease=txn.lease,
+            rekey_to=txn.rekey_to,
+        )
+        if txn.index and self._is_deployed(txn.index, program.bytecode):
+            return SignedTransaction(
+                ApplicationCallTxn(index=txn.index, **common), None  # type: ignore
+            )
+
+        assert (
+            txn.on_complete != OnComplete.ClearStateOC
+        ), "the simulate backend can only run a clear state program of a deployed app"
+        clear_program = program.bytecode[:1] + CLEAR_PROGRAM_BODY
+        size = len(program.bytecode) + len(clear_program)
+        return SignedTransaction(
+            ApplicationCallTxn(
+                index=0,
+                approval_program=program.bytecode,
+                clear_program=clear_program,
+                global_schema=txn.global_schema or MAX_GLOBAL_SCHEMA,
+                local_schema=txn.local_schema or MAX_LOCAL_SCHEMA,
+                extra_pages=max(0, -(-size // MAX_PROGRAM_PAGE) - 1),
+                **common,  # type: ignore
+            ),
+            None,
+        )
+
+    def _lsig_group(
+        self, stxn: LogicSigTransaction, program: CompiledProgram, sp: SuggestedParams
+    ) -> List[Any]:
+        txn = stxn.transaction
+        assert isinstance(
+            txn, PaymentTxn
+        ), f"cannot simulate a logic sig for a transaction of type {type(txn)}"
+        sender = self.sender or txn.sender
+
+        lsig = LogicSig(program.bytecode, args=stxn.lsig.args)
+        free = copy(sp)
+        free.fee = 0
+        ltxn = PaymentTxn(
+            lsig.address(),
+            free,
+            txn.receiver,
+            txn.amt,
+            close_remainder_to=txn.close_remainder_to,
+            note=txn.note,
+            lease=txn.lease,
+            rekey_to=txn.rekey_to,
+        )
+        payer_sp = copy(sp)
+        payer_sp.fee = 2 * sp.min_fee
+        payer = PaymentTxn(sender, payer_sp, sender, 0)
+
+        payer, ltxn = assign_group_id([payer, ltxn])
+        return [SignedTransaction(payer, None), LogicSigTransaction(ltxn, lsig)]
+
+    def _is_deployed(self, index: int, bytecode: bytes) -> bool:
+        key = (index, bytecode)
+        with self._lock:
+            deployed = self._deployed.get(key)
+        if deployed is None:
+            try:
+                info = self.algod.application_info(index)
+                deployed = b64decode(info["params"]["approval-program"]) == bytecode
+            except AlgodHTTPError:
+                deployed = False
+            with self._lock:
+                self._deployed[key] = deployed
+        return deployed
+
+    def _simulate(self, group: List[Any]) -> dict:
+        # each transaction is msgpack'ed canonically, as in `AlgodClient.dryrun()`
+        txns = [
+            msgpack.unpackb(b64decode(encoding.msgpack_encode(stxn)), raw=False)
+            for stxn in group
+        ]
+        body = {
+            "allow-empty-signatures": True,
+            "exec-trace-config": EXEC_TRACE_CONFIG,
+            "txn-groups": [{"txns": txns}],
+        }
+        resp = self.algod.algod_request(
+            "POST",
+            "/transactions/simulate",
+            data=msgpack.packb(body, use_bin_type=True),
+            headers={"Content-Type": "application/msgpack"},
+        )
+        return resp["txn-groups"][0]
+
+    @classmethod
+    def _dryrun_txn(
+        cls,
+        group_result: dict,
+        idx: int,
+        program: CompiledProgram,
+        trace_key: Optional[str],
+    ) -> dict:
+        """Adapt the simulation of the idx'th transaction in a group into a dry run transaction result"""
+        failed_at = group_result.get("failed-at") or [None]
+        failure = group_result.get("failure-message", "")
+        assert (
+            not failure or failed_at[0] == idx
+        ), f"simulation failed at transaction {failed_at} which is not under test: {failure}"
+
+        txn_results = group_result.get("txn-results", [])
+        txn_result = txn_results[idx] if idx < len(txn_results) else {}
+        exec_trace = txn_result.get("exec-trace", {})
+
+        error = None
+        if failure:
+            match = _PROGRAM_ERROR.search(failure)
+            error = match.group(1) if match else None
+        status = "REJECT" if failure else "PASS"
+
+        if trace_key is None:
+            trace = cls._trace(exec_trace.get("logic-sig-trace", []), program, error)
+            return {
+                "logic-sig-trace": trace,
+                "logic-sig-messages": [status],
+                "logic-sig-disassembly": program.lines,
+            }
+
+        result = txn_result.get("txn-result", {})
+        label = (
+            "ApprovalProgram"
+            if trace_key == "approval-program-trace"
+            else "ClearStateProgram"
+        )
+        return {
+            "app-call-trace": cls._trace(exec_trace.get(trace_key, []), program, error),
+            "app-call-messages": [label, status],
+            "disassembly": program.lines,
+            "logs": result.get("logs", []),
+            "budget-added": max(
+                0, group_result.get("app-budget-added", 0) - APP_CALL_BUDGET
+            ),
+            "budget-consumed": txn_result.get("app-budget-consumed", 0),
+            "global-delta": result.get("global-state-delta", []),
+            "local-deltas": result.get("local-state-delta", []),
+        }
+
+    @classmethod
+    def _trace(
+        cls, units: List[dict], program: CompiledProgram, error: Optional[str]
+    ) -> List[dict]:
+        """Replay the stack and scratch changes of an execution trace into dry run trace steps.
+
+        As in a dry run, each step holds the state before the instruction at its `pc` is executed,
+        followed by a final step holding the state at the end of execution.
+        """
+        stack: List[dict] = []
+        scratch: List[dict] = []
+
+        def step(pc: int) -> dict:
+            return {
+                "pc": pc,
+                "line": program.line(pc),
+                "stack": list(stack),
+                "scratch": list(scratch),
+            }
+
+        trace = []
+        for unit in units:
+            trace.append(step(unit["pc"]))
+            if pops := unit.get("stack-pop-count", 0):
+                del stack[-pops:]
+            stack.extend(map(cls._teal_value, unit.get("stack-additions", [])))
+            for change in unit.get("scratch-changes", []):
+                slot = change["slot"]
+                if slot >= len(scratch):
+                    scratch.extend([EMPTY_VALUE] * (slot + 1 - len(scratch)))
+                scratch[slot] = cls._teal_value(change["new-value"])
+
+        final = step(units[-1]["pc"] if units else 0)
+        if error:
+            final["error"] = error
+        trace.append(final)
+        return trace
+
+    @classmethod
+    def _teal_value(cls, value: dict) -> dict:
+        """Simulate omits zero valued fields, which dry run traces always include"""
+        return {
+            "type": value.get("type", 0),
+            "uint": value.get("uint", 0),
+            "bytes": value.get("bytes", ""),
+        }
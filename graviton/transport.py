@@ -0,0 +1,198 @@
+import http.client
+import json
+import socket
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from algosdk import constants, error
+from algosdk.v2client.algod import AlgodClient, api_version_path_prefix
+
+DEFAULT_MAX_IDLE = 16
+
+# errors which mean that a previously idle connection was closed by the server in the meantime
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+class KeepAliveAlgodClient(AlgodClient):
+    """`AlgodClient` which sends its requests over persistent HTTP/1.1 keep-alive connections.
+
+    `AlgodClient` opens a new connection for every request, so for short programs connection setup
+    dominates the latency of a dry run. A `KeepAliveAlgodClient` may be used wherever an `AlgodClient` is:
+
+    ```python
+    >>> algod = KeepAliveAlgodClient.from_algod(get_algod())
+    >>> inspectors = DryRunExecutor(algod, ExecutionMode.Application, teal).run_sequence(inputs, max_workers=4)
+    ```
+
+    * the client is thread safe: each request borrows an idle connection or opens a new one,
+      and returns it to the pool once the response was read
+    * at most `max_idle` idle connections are kept. Extra ones are closed
+    * a request which fails because its reused connection went stale is retried once on a new connection
+    * `close()` closes all idle connections
+    """
+
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        headers: Optional[Dict[str, str]] = None,
+        *,
+        max_idle: int = DEFAULT_MAX_IDLE,
+        timeout: Optional[float] = None,
+    ):
+        super().__init__(algod_token, algod_address, headers)
+        assert max_idle > 0, f"max_idle must be positive but was {max_idle}"
+        self.max_idle = max_idle
+        self.timeout = timeout
+
+        url = urlsplit(algod_address)
+        assert url.scheme in (
+            "http",
+            "https",
+        ), f"unsupported scheme in algod address {algod_address}"
+        self._use_ssl: bool = url.scheme == "https"
+        self._host: str = url.hostname or "localhost"
+        self._port: int = url.port or (443 if self._use_ssl else 80)
+        self._base_path: str = url.path.rstrip("/")
+
+        self.connections_opened: int = 0
+        self._lock = Lock()
+        self._idle: List[http.client.HTTPConnection] = []
+
+    @classmethod
+    def from_algod(cls, algod: AlgodClient, **kwargs) -> "KeepAliveAlgodClient":
+        return cls(algod.algod_token, algod.algod_address, algod.headers, **kwargs)
+
+    def __getstate__(self) -> dict:
+        # connections and locks cannot cross process boundaries
+        state = self.__dict__.copy()
+        del state["_lock"], state["_idle"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = Lock()
+        self._idle = []
+
+    def __enter__(self) -> "KeepAliveAlgodClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def algod_request(
+        self,
+        method,
+        requrl,
+        params=None,
+        data=None,
+        headers=None,
+        response_format="json",
+    ):
+        """Same as `AlgodClient.algod_request()` but over a pooled keep-alive connection"""
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+
+        if requrl not in constants.unversioned_paths:
+            requrl = api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + "?" + urlencode(params)
+
+        code, body = self._send(method, self._base_path + requrl, data, header)
+        if not 200 <= code < 300:
+            msg = body.decode("utf-8", errors="replace")
+            try:
+                msg = json.loads(msg)["message"]
+            except Exception:
+                pass
+            raise error.AlgodHTTPError(msg, code)
+
+        if response_format != "json":
+            return body
+        try:
+            return json.loads(body)
+        except Exception as e:
+            raise error.AlgodResponseError(
+                "Failed to parse JSON response from algod"
+            ) from e
+
+    def _send(
+        self, method: str, path: str, data: Optional[bytes], header: Dict[str, str]
+    ) -> Tuple[int, bytes]:
+        conn, reused = self._acquire()
+        try:
+            try:
+                resp = self._roundtrip(conn, method, path, data, header)
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                conn.close()
+                conn = self._connect()
+                resp = self._roundtrip(conn, method, path, data, header)
+            body = resp.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            raise
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+        return resp.status, body
+
+    @classmethod
+    def _roundtrip(
+        cls,
+        conn: http.client.HTTPConnection,
+        method: str,
+        path: str,
+        data: Optional[bytes],
+        header: Dict[str, str],
+    ) -> http.client.HTTPResponse:
+        conn.request(method, path, body=data, headers=header)
+        return conn.getresponse()
+
+    def _acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def _connect(self) -> http.client.HTTPConnection:
+        conn_class = (
+            http.client.HTTPSConnection if self._use_ssl else http.client.HTTPConnection
+        )
+        kwargs = {} if self.timeout is None else {"timeout": self.timeout}
+        conn = conn_class(self._host, self._port, **kwargs)  # type: ignore
+        conn.connect()
+        if conn.sock is not None:
+            # small request bodies shouldn't wait on Nagle's algorithm
+            conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
@@ -0,0 +1,268 @@
+"""
+Stand-in algod HTTP server implementing the endpoints graviton requires, for benchmarking graviton's own
+client side throughput without algod's latency noise. It serves synthetic dry run responses (cf. `tests.unit.fakes`)
+or the responses recorded in a `DryRunCassette`, after a configurable latency.
+
+Serve it on algod's port with:
+
+```sh
+python -m tests.algod_stub --latency 0.002 --cassette tests/cassettes/fib.z
+```
+
+or run it in process:
+
+```python
+>>> with StandInAlgod(latency=0.002) as stand_in:
+...     inspectors = DryRunExecutor(stand_in.client(), ExecutionMode.Application, teal).run_sequence(inputs)
+```
+"""
+import argparse
+from base64 import b64encode
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import socket
+from threading import Lock, Thread
+import time
+from typing import Any, Callable, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+import msgpack  # type: ignore
+
+from algosdk.v2client.algod import AlgodClient
+
+from graviton.cassette import DryRunCassette
+from graviton.transport import KeepAliveAlgodClient
+
+from tests.clients import ALGOD_PORT, DEVNET_TOKEN
+from tests.unit.fakes import fake_dryrun_msgpack, msgpack_shaped
+
+VERSIONS = {
+    "build": {
+        "major": 0,
+        "minor": 0,
+        "build_number": 0,
+        "commit_hash": "stand-in",
+        "branch": "stand-in",
+        "channel": "stand-in",
+    },
+    "genesis_hash_b64": b64encode(b"stand-in algod".ljust(32, b"\x00")).decode(),
+    "genesis_id": "stand-in",
+    "versions": ["v2"],
+}
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_StandInServer"
+
+    def setup(self):
+        super().setup()
+        # headers and body are written separately, and shouldn't wait on Nagle's algorithm
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.stand_in._count("connections")
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/health":
+            self._reply(200, None)
+        elif path == "/versions":
+            self._reply(200, VERSIONS)
+        else:
+            self._reply(404, {"message": f"stand-in algod has no GET {path}"})
+
+    def do_POST(self):
+        stand_in = self.server.stand_in
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        url = urlsplit(self.path)
+        if self.headers.get("X-Algo-API-Token") != stand_in.token:
+            self._reply(401, {"message": "Invalid API Token"})
+            return
+
+        stand_in._count("requests")
+        stand_in._enter()
+        try:
+            stand_in._delay()
+            if url.path == "/v2/teal/dryrun":
+                resp = stand_in.dryrun(body)
+                if parse_qs(url.query).get("format") == ["msgpack"]:
+                    self._reply(200, msgpack_shaped(resp), msgpack_encoded=True)
+                else:
+                    self._reply(200, resp)
+            elif url.path == "/v2/teal/compile":
+                query = parse_qs(url.query)
+                self._reply(
+                    200,
+                    stand_in.compile(
+                        body.decode("utf-8"),
+                        sourcemap=query.get("sourcemap", ["false"])[0] == "true",
+                    ),
+                )
+            else:
+                self._reply(404, {"message": f"stand-in algod has no POST {url.path}"})
+        except AssertionError as e:
+            self._reply(400, {"message": str(e)})
+        finally:
+            stand_in._exit()
+
+    def _reply(self, code: int, payload: Any, msgpack_encoded: bool = False) -> None:
+        if msgpack_encoded:
+            body = msgpack.packb(payload, use_bin_type=True)
+        else:
+            body = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header(
+            "Content-Type",
+            "application/msgpack" if msgpack_encoded else "application/json",
+        )
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # close the connection without telling the client:
+        self.close_connection = self.server.stand_in.hang_up
+
+    def log_message(self, *args):
+        pass
+
+
+class _StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, stand_in: "StandInAlgod"):
+        super().__init__(address, _StandInHandler)
+        self.stand_in = stand_in
+
+
+class StandInAlgod:
+    """Stand-in algod serving dry runs on `address` from a background thread.
+
+    * dry run responses are synthesized by `responder` (which is handed the msgpack request body),
+      by default by "executing" each transaction as pushing its first argument (cf. `tests.unit.fakes`)
+    * when a `cassette` is provided, responses recorded in it are served instead. Requests which weren't
+      recorded are rejected as algod would reject a bad request
+    * dry runs requested with `format=msgpack` are answered in msgpack, shaped as algod would shape them
+    * every request is answered after `latency` seconds, or after `latency()` seconds when it is callable
+    * `connections` and `requests` count what the server was handed, and `peak_in_flight` is the largest
+      number of requests it was handling at once. When `hang_up` is set, connections are closed after each
+      response without telling the client
+    """
+
+    def __init__(
+        self,
+        *,
+        responder: Callable[[bytes], dict] = fake_dryrun_msgpack,
+        cassette: Optional[DryRunCassette] = None,
+        latency: Union[float, Callable[[], float]] = 0.0,
+        token: str = DEVNET_TOKEN,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.responder = responder
+        self.cassette = cassette
+        self.latency = latency
+        self.token = token
+        self.hang_up = False
+
+        self.connections: int = 0
+        self.requests: int = 0
+        self.in_flight: int = 0
+        self.peak_in_flight: int = 0
+        self._lock = Lock()
+        self._server = _StandInServer((host, port), self)
+        self._thread: Optional[Thread] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def client(self, *, keep_alive: bool = False, **kwargs) -> AlgodClient:
+        if keep_alive:
+            return KeepAliveAlgodClient(self.token, self.address, **kwargs)
+        return AlgodClient(self.token, self.address, **kwargs)
+
+    def start(self) -> "StandInAlgod":
+        assert self._thread is None, "the stand-in algod is already serving"
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "StandInAlgod":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def dryrun(self, body: bytes) -> dict:
+        if self.cassette is None:
+            return self.responder(body)
+        digest = sha256(body).hexdigest()
+        resp = self.cassette.recorded(digest)
+        assert resp is not None, f"no response was recorded for request {digest}"
+        return resp
+
+    def compile(self, source: str, sourcemap: bool = False) -> dict:
+        if self.cassette is not None:
+            kwargs = {"source_map": True} if sourcemap else {}
+            resp = self.cassette.recorded(
+                DryRunCassette.compile_digest(source, **kwargs)
+            )
+            if resp is not None:
+                return resp
+        # the "bytecode" is good enough for programs which are never really executed
+        bytecode = b"\x08" + sha256(source.encode("utf-8")).digest()
+        return {"hash": "STANDIN", "result": b64encode(bytecode).decode()}
+
+    def _delay(self) -> None:
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency > 0:
+            time.sleep(latency)
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=ALGOD_PORT)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds before each response"
+    )
+    parser.add_argument(
+        "--cassette", help="serve the responses recorded in this cassette"
+    )
+    args = parser.parse_args()
+
+    cassette = DryRunCassette(args.cassette) if args.cassette else None
+    stand_in = StandInAlgod(
+        cassette=cassette, latency=args.latency, host=args.host, port=args.port
+    )
+    print(f"stand-in algod serving on {stand_in.address} (token {stand_in.token})")
+    try:
+        stand_in._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stand_in.stop()
+
+
+if __name__ == "__main__":
+    main()
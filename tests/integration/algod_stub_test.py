@@ -0,0 +1,26 @@
+import time
+
+from graviton.blackbox import DryRunExecutor
+from graviton.models import ExecutionMode
+
+from tests.algod_stub import StandInAlgod
+
+N = 300
+
+
+def test_throughput_benchmark():
+    """Client side throughput: request building, encoding, parsing and inspection over a keep-alive connection"""
+    with StandInAlgod() as stand_in:
+        dre = DryRunExecutor(
+            stand_in.client(keep_alive=True), ExecutionMode.Application, "fake teal"
+        )
+        inputs = [(f"input {i}",) for i in range(N)]
+        start = time.perf_counter()
+        inspectors = dre.run_sequence(inputs)
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"{N} dry runs against a stand-in algod in {elapsed:.3f}s: {N / elapsed:.0f}/s"
+    )
+    assert len(inspectors) == N and stand_in.connections == 1
+    assert stand_in.peak_in_flight == 1
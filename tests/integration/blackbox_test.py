@@ -21,6 +21,7 @@ from graviton.models import ExecutionMode, PyTypes
 
 
 from tests.clients import get_algod
+from tests.oracles import fib, fib_cost
 
 TESTS_DIR = Path.cwd() / "tests"
 
@@ -33,20 +34,6 @@ def fac_with_overflow(n):
     return n * fac_with_overflow(n - 1)
 
 
-def fib(n):
-    a, b = 0, 1
-    for _ in range(n):
-        a, b = b, a + b
-    return a
-
-
-def fib_cost(args):
-    cost = 17
-    for n in range(1, args[0] + 1):
-        cost += 31 * fib(n - 1)
-    return cost
-
-
 def test_singleton_invariants():
     algod = get_algod()
     algod_status = algod.status()
@@ -0,0 +1,44 @@
+from statistics import median
+import time
+
+from graviton.blackbox import DryRunExecutor
+from graviton.models import ExecutionMode
+from graviton.transport import KeepAliveAlgodClient
+
+from tests.clients import get_algod
+
+TEAL = """#pragma version 6
+arg 0
+btoi
+int 1
++"""
+
+N = 200
+
+
+def per_request_latencies(algod, n: int = N) -> list:
+    dre = DryRunExecutor(algod, ExecutionMode.Signature, TEAL)
+    latencies = []
+    for i in range(n):
+        start = time.perf_counter()
+        assert dre.run_one((i,)).stack_top() == i + 1
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def test_keep_alive_benchmark():
+    algod = get_algod()
+    with KeepAliveAlgodClient.from_algod(algod) as keep_alive:
+        per_request_latencies(algod, n=10)
+        per_request_latencies(keep_alive, n=10)
+
+        before = per_request_latencies(algod)
+        after = per_request_latencies(keep_alive)
+
+    print(
+        f"""Per request dry run latency over {N} requests:
+    AlgodClient:          median {median(before) * 1000:.2f}ms, total {sum(before):.2f}s
+    KeepAliveAlgodClient: median {median(after) * 1000:.2f}ms, total {sum(after):.2f}s
+    connections opened by KeepAliveAlgodClient: {keep_alive.connections_opened}"""
+    )
+    assert keep_alive.connections_opened == 1
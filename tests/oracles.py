@@ -0,0 +1,13 @@
+def fib(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+def fib_cost(args):
+    """Opcode cost of the slow fibonacci programs of tests/teal"""
+    cost = 17
+    for n in range(1, args[0] + 1):
+        cost += 31 * fib(n - 1)
+    return cost
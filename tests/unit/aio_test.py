@@ -0,0 +1,150 @@
+import asyncio
+import base64
+import json
+import threading
+import pytest
+
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client.algod import AlgodClient
+
+from graviton.aio import AsyncAlgodClient, AsyncDryRunExecutor
+from graviton.blackbox import DryRunExecutor
+from graviton.models import ExecutionMode
+from graviton.pool import AlgodPool
+
+from tests.unit.fakes import fake_dryrun, fake_dryrun_msgpack
+
+TOKEN = "a" * 64
+
+
+async def start_fake_algod(status: int = 200, delay: float = 0.0):
+    """HTTP/1.0 server faking algod's dryrun endpoint. Keeps track of the max number of concurrent requests."""
+    stats = {"in_flight": 0, "max_in_flight": 0, "requests": 0}
+
+    async def handle(reader, writer):
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode().split("\r\n")
+        headers = {
+            k.lower(): v.strip() for k, _, v in (line.partition(":") for line in lines)
+        }
+        assert lines[0].startswith("POST /v2/teal/dryrun ")
+        assert headers["x-algo-api-token"] == TOKEN
+        body = await reader.readexactly(int(headers["content-length"]))
+
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        await asyncio.sleep(delay)
+        stats["in_flight"] -= 1
+
+        resp = (
+            fake_dryrun_msgpack(body)
+            if status == 200
+            else {"message": "something went wrong"}
+        )
+        writer.write(f"HTTP/1.0 {status} Whatever\r\n\r\n".encode())
+        writer.write(json.dumps(resp).encode())
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, AlgodClient(TOKEN, f"http://127.0.0.1:{port}"), stats
+
+
+@pytest.mark.parametrize("mode", ExecutionMode)
+def test_async_executor_same_as_sync(mode):
+    inputs = [(f"input {i}",) for i in range(10)]
+
+    sync_algod = AlgodClient(TOKEN, "http://unused")
+    sync_algod.dryrun = fake_dryrun  # type: ignore
+    sync_inspectors = DryRunExecutor(sync_algod, mode, "fake teal").run_sequence(inputs)
+
+    async def go():
+        server, algod, stats = await start_fake_algod(delay=0.01)
+        async with server:
+            adre = AsyncDryRunExecutor(algod, mode, "fake teal", max_in_flight=3)
+            one = await adre.arun_one(inputs[0])
+            seq = await adre.arun_sequence(inputs)
+            streamed = [i async for i in adre.aiter_sequence(iter(inputs))]
+        return one, seq, streamed, stats
+
+    one, seq, streamed, stats = asyncio.run(go())
+    assert stats["requests"] == 1 + 2 * len(inputs)
+    assert 1 < stats["max_in_flight"] <= 3
+
+    assert one.args == inputs[0]
+    for inspectors in (seq, streamed):
+        assert [i.args for i in inspectors] == inputs
+        for i, s in zip(inspectors, sync_inspectors):
+            assert i.parent_dryrun_response == s.parent_dryrun_response
+            assert i.stack_top() == s.stack_top()
+            assert i.last_log() == s.last_log()
+            assert i.status() == s.status()
+
+
+def test_async_executor_requires_algod_client():
+    algods = [AlgodClient(TOKEN, f"http://localhost:{port}") for port in (1, 2)]
+    for algod in (algods, AlgodPool(algods)):
+        with pytest.raises(AssertionError, match="requires an AlgodClient"):
+            AsyncDryRunExecutor(algod, ExecutionMode.Signature, "fake teal")
+
+
+def test_async_algod_http_error():
+    async def go():
+        server, algod, _ = await start_fake_algod(status=400)
+        async with server:
+            await AsyncAlgodClient.from_algod(algod).dryrun(
+                DryRunExecutor(
+                    algod, ExecutionMode.Signature, "fake teal"
+                )._dryrun_request([[b"x"]], None)
+            )
+
+    with pytest.raises(AlgodHTTPError) as he:
+        asyncio.run(go())
+
+    assert he.value.code == 400
+    assert str(he.value) == "something went wrong"
+
+
+def test_async_algod_timeout():
+    async def go():
+        server, algod, stats = await start_fake_algod(delay=5)
+        async with server:
+            adre = AsyncDryRunExecutor(
+                algod, ExecutionMode.Signature, "fake teal", timeout=0.1
+            )
+            with pytest.raises(TimeoutError, match="timed out after 0.1s awaiting"):
+                await adre.arun_one(("x",))
+        return stats
+
+    assert asyncio.run(go())["requests"] == 1
+
+
+def test_async_compile_once_off_the_event_loop():
+    compiled_on = []
+
+    def compile(source):
+        compiled_on.append(threading.current_thread())
+        return {"hash": "FAKE", "result": base64.b64encode(b"\x06bytecode").decode()}
+
+    async def go():
+        server, algod, stats = await start_fake_algod()
+        algod.compile = compile  # type: ignore
+        async with server:
+            adre = AsyncDryRunExecutor(
+                algod, ExecutionMode.Signature, "fake teal", compile_once=True
+            )
+            inspectors = await adre.arun_sequence([(f"input {i}",) for i in range(4)])
+        return inspectors
+
+    inspectors = asyncio.run(go())
+    assert [i.stack_top() for i in inspectors] == [
+        "0x" + f"input {i}".encode().hex() for i in range(4)
+    ]
+    assert len(compiled_on) == 1 and compiled_on[0] is not threading.main_thread()
+
+
+def test_dechunk():
+    raw = b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n4\r\n{"a"\r\n3\r\n: 1\r\n1\r\n}\r\n0\r\n\r\n'
+    assert AsyncAlgodClient._parse_response(raw) == (200, b'{"a": 1}')
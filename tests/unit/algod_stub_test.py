@@ -0,0 +1,54 @@
+from unittest.mock import Mock
+
+import pytest
+
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client.algod import AlgodClient
+
+from graviton.blackbox import DryRunExecutor
+from graviton.cassette import CassetteMode, DryRunCassette
+from graviton.models import ExecutionMode
+
+from tests.algod_stub import VERSIONS, StandInAlgod
+from tests.unit.fakes import fake_dryrun
+
+
+@pytest.mark.parametrize("mode", [ExecutionMode.Application, ExecutionMode.Signature])
+@pytest.mark.parametrize("compile_once", [False, True])
+def test_synthetic_responses(mode, compile_once):
+    with StandInAlgod(latency=0.01) as stand_in:
+        algod = stand_in.client()
+        assert algod.versions() == VERSIONS
+
+        dre = DryRunExecutor(algod, mode, "stand-in teal", compile_once=compile_once)
+        inputs = [(f"input {i}",) for i in range(8)]
+        inspectors = dre.run_sequence(inputs, max_workers=8)
+
+    assert [i.args for i in inspectors] == inputs
+    assert all(i.passed() for i in inspectors)
+    assert stand_in.requests >= 8
+    # the dry runs overlapped:
+    assert stand_in.peak_in_flight > 1
+    assert stand_in.in_flight == 0
+
+
+def test_cassette_responses(tmp_path):
+    path = tmp_path / "fake.z"
+    algod = Mock(AlgodClient)
+    algod.dryrun.side_effect = fake_dryrun
+    with DryRunCassette(path, CassetteMode.record, algod=algod) as cassette:
+        DryRunExecutor(cassette, ExecutionMode.Application, "fake teal").run_sequence(
+            [("x",), ("y",)]
+        )
+
+    with StandInAlgod(cassette=DryRunCassette(path)) as stand_in:
+        dre = DryRunExecutor(
+            stand_in.client(keep_alive=True), ExecutionMode.Application, "fake teal"
+        )
+        assert [i.last_log() for i in dre.run_sequence([("y",), ("x",)])] == [
+            b"y".hex(),
+            b"x".hex(),
+        ]
+        with pytest.raises(AlgodHTTPError, match="no response was recorded") as e:
+            dre.run_one(("z",))
+    assert e.value.code == 400
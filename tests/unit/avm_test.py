@@ -0,0 +1,175 @@
+from pathlib import Path
+
+import pytest
+
+from graviton.avm import AVMClient, TealProgram
+from graviton.blackbox import DryRunExecutor
+from graviton.invariant import Invariant
+from graviton.models import ExecutionMode
+
+from tests.integration.blackbox_test import APP_SCENARIOS, LOGICSIG_SCENARIOS
+
+TEAL_DIR = Path.cwd() / "tests" / "teal"
+
+# line numbers in error messages refer to algod's disassembly rather than to the TEAL source:
+SOURCE_LINE_SENSITIVE = {("lsig_oldfac", "errorMessage")}
+
+
+def run_scenario(mode, filebase, scenario):
+    teal = (TEAL_DIR / f"{filebase}.teal").read_text()
+    inspectors = DryRunExecutor(AVMClient(), mode, teal).run_sequence(
+        scenario["inputs"]
+    )
+    for i, (dr_property, predicate) in enumerate(scenario["invariants"].items()):
+        if (filebase, dr_property.name) in SOURCE_LINE_SENSITIVE:
+            continue
+        Invariant(predicate, name=f"{filebase}[{i}]@{mode}-{dr_property}").validates(
+            dr_property, inspectors
+        )
+    return inspectors
+
+
+@pytest.mark.parametrize("filebase", APP_SCENARIOS.keys())
+def test_app_scenarios(filebase):
+    run_scenario(ExecutionMode.Application, filebase, APP_SCENARIOS[filebase])
+
+
+@pytest.mark.parametrize("filebase", LOGICSIG_SCENARIOS.keys())
+def test_logicsig_scenarios(filebase):
+    run_scenario(ExecutionMode.Signature, filebase, LOGICSIG_SCENARIOS[filebase])
+
+
+def test_lsig_overflow_error():
+    inspector = run_scenario(
+        ExecutionMode.Signature,
+        "lsig_oldfac",
+        {"inputs": [(21,)], "invariants": {}},
+    )[0]
+    assert inspector.rejected()
+    assert inspector.error(contains="* overflowed")
+
+
+def test_assemble():
+    program = TealProgram.assemble(
+        """#pragma version 6
+int 1000 // shared so goes into an intcblock
+int 1000
+byte "hi"
+pop
++
+loop:
+bz loop"""
+    )
+    ops = [(ins.op, ins.imm, ins.line, ins.pc) for ins in program.code]
+    assert ops == [
+        ("intcblock", ((1000,),), 1, 1),
+        ("intc", (0,), 2, 5),
+        ("intc", (0,), 3, 7),
+        ("pushbytes", (b"hi",), 4, 9),
+        ("pop", (), 5, 13),
+        ("+", (), 6, 14),
+        ("bz", (6,), 8, 15),
+    ]
+
+    with pytest.raises(ValueError, match="unknown opcode: itxn_begin"):
+        TealProgram.assemble("#pragma version 6\nitxn_begin")
+
+
+def test_compile_once_unsupported():
+    with pytest.raises(AssertionError, match="cannot compile_once"):
+        DryRunExecutor(
+            AVMClient(), ExecutionMode.Application, "int 1", compile_once=True
+        ).run_one(())
+
+
+def test_app_state_and_logs():
+    teal = """#pragma version 8
+byte "counter"
+txna ApplicationArgs 0
+btoi
+app_global_put
+byte "hello"
+log
+int 1
+return"""
+    inspector = DryRunExecutor(AVMClient(), ExecutionMode.Application, teal).run_one(
+        (7,)
+    )
+    assert inspector.passed()
+    assert inspector.last_log() == b"hello".hex()
+    assert inspector.cost() == 8
+    assert inspector.txn["global-delta"] == [
+        {"key": "Y291bnRlcg==", "value": {"action": 2, "uint": 7}}
+    ]
+
+
+def test_group_shares_global_state():
+    teal = """#pragma version 8
+byte "counter"
+byte "counter"
+app_global_get
+int 1
++
+app_global_put
+byte "counter"
+app_global_get
+itob
+log
+global LogicSigVersion
+int 8
+=="""
+    dre = DryRunExecutor(AVMClient(), ExecutionMode.Application, teal)
+    inputs = [()] * 3
+    assert [i.last_log() for i in dre.run_sequence(inputs)] == [
+        (1).to_bytes(8, "big").hex()
+    ] * 3
+    batched = dre.run_sequence(inputs, batch_size=3)
+    assert all(i.passed() for i in batched)
+    assert [i.last_log() for i in batched] == [
+        (n).to_bytes(8, "big").hex() for n in (1, 2, 3)
+    ]
+    assert batched[-1].txn["global-delta"] == [
+        {"key": "Y291bnRlcg==", "value": {"action": 2, "uint": 3}}
+    ]
+
+
+def test_opcode_budget():
+    teal = """#pragma version 6
+global OpcodeBudget"""
+    dre = DryRunExecutor(AVMClient(), ExecutionMode.Application, teal)
+    # as reported by algod for a single app call, and for the app calls of a group which pool their budget:
+    assert dre.run_one(()).stack_top() == 699
+    assert [i.stack_top() for i in dre.run_sequence([()] * 2, batch_size=2)] == [
+        1399,
+        1398,
+    ]
+    lsig = DryRunExecutor(AVMClient(), ExecutionMode.Signature, teal)
+    assert lsig.run_one(()).stack_top() == 19999
+
+    # loops which burn the budget down to a margin stay within it:
+    burn = """#pragma version 6
+burn:
+global OpcodeBudget
+int 10
+>
+bnz burn
+int 1"""
+    inspector = DryRunExecutor(AVMClient(), ExecutionMode.Application, burn).run_one(())
+    assert inspector.passed(), inspector.report()
+    assert 690 <= inspector.cost() <= 700
+
+
+def test_logic_sig_version():
+    teal = "#pragma version 8\nglobal LogicSigVersion\nint 8\n=="
+    for version, passed in [(8, True), (9, False)]:
+        dre = DryRunExecutor(
+            AVMClient(logic_sig_version=version), ExecutionMode.Signature, teal
+        )
+        assert dre.run_one(()).passed() is passed
+
+    with pytest.raises(
+        AssertionError, match="program version 8 greater than max supported version 7"
+    ):
+        DryRunExecutor(
+            AVMClient(logic_sig_version=7), ExecutionMode.Signature, teal
+        ).run_one(())
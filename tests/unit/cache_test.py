@@ -0,0 +1,144 @@
+import os
+from unittest.mock import Mock
+
+from algosdk.v2client.algod import AlgodClient
+
+from graviton.avm import AVMClient
+from graviton.blackbox import DryRunExecutor
+from graviton.cache import DryRunCache, DryRunMemo, MemoInfo, request_digest
+from graviton.models import ExecutionMode
+
+from tests.unit.fakes import fake_dryrun
+
+
+def make_algod(build_number=1):
+    algod = Mock(AlgodClient)
+    algod.dryrun.side_effect = fake_dryrun
+    algod.versions.return_value = {
+        "build": {"major": 3, "minor": 14, "build_number": build_number},
+        "genesis_hash_b64": "abc=",
+    }
+    return algod
+
+
+def test_cache_hits_and_misses(tmp_path):
+    algod = make_algod()
+    cache = DryRunCache(algod, tmp_path)
+    dre = DryRunExecutor(cache, ExecutionMode.Application, "fake teal")
+
+    inputs = [(f"input {i}",) for i in range(5)]
+    live = dre.run_sequence(inputs)
+    assert algod.dryrun.call_count == 5
+    assert cache.stats()["misses"] == 5
+
+    # a fresh cache over the same directory serves from disk:
+    cache2 = DryRunCache(algod, tmp_path)
+    cached = DryRunExecutor(
+        cache2, ExecutionMode.Application, "fake teal"
+    ).run_sequence(inputs + [("new input",)])
+    assert algod.dryrun.call_count == 6
+    assert cache2.stats()["hits"] == 5 and cache2.stats()["misses"] == 1
+    for x, y in zip(live, cached):
+        assert x.parent_dryrun_response == y.parent_dryrun_response
+        assert x.last_log() == y.last_log()
+
+    # different program ==> different requests ==> misses:
+    DryRunExecutor(cache2, ExecutionMode.Application, "other teal").run_sequence(inputs)
+    assert algod.dryrun.call_count == 11
+
+
+def test_cache_invalidated_by_node_version(tmp_path):
+    dre_args = (ExecutionMode.Signature, "fake teal")
+    inputs = [("x",), ("y",)]
+
+    algod1 = make_algod(build_number=1)
+    DryRunExecutor(DryRunCache(algod1, tmp_path), *dre_args).run_sequence(inputs)
+    assert len(list(tmp_path.glob("*.json.z"))) == 2
+
+    algod2 = make_algod(build_number=2)
+    cache = DryRunCache(algod2, tmp_path)
+    DryRunExecutor(cache, *dre_args).run_sequence(inputs)
+    assert algod2.dryrun.call_count == 2
+    assert cache.stats()["hits"] == 0
+    assert len(list(tmp_path.glob("*.json.z"))) == 2
+
+
+def test_cache_of_client_without_versions(tmp_path):
+    teal = "#pragma version 6\narg 0\nbtoi\nint 1\n+"
+    inputs = [(i,) for i in range(3)]
+    avm = AVMClient()
+    assert not hasattr(avm, "versions")
+
+    live = DryRunExecutor(
+        DryRunCache(avm, tmp_path), ExecutionMode.Signature, teal
+    ).run_sequence(inputs)
+    cache = DryRunCache(AVMClient(), tmp_path)
+    cached = DryRunExecutor(cache, ExecutionMode.Signature, teal).run_sequence(inputs)
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 0
+    assert [i.stack_top() for i in cached] == [i.stack_top() for i in live] == [1, 2, 3]
+    assert "graviton.avm.AVMClient" in (tmp_path / DryRunCache.VERSION_FILE).read_text()
+
+    # switching to a client which reports its version invalidates the directory:
+    algod = make_algod()
+    DryRunExecutor(
+        DryRunCache(algod, tmp_path), ExecutionMode.Signature, "fake teal"
+    ).run_one(("x",))
+    assert algod.dryrun.call_count == 1
+    assert len(list(tmp_path.glob("*.json.z"))) == 1
+
+
+def test_cache_lru_eviction(tmp_path):
+    algod = make_algod()
+    probe = DryRunCache(algod, tmp_path / "probe")
+    dre = DryRunExecutor(probe, ExecutionMode.Signature, "fake teal")
+    dre.run_one(("probe",))
+    entry_size = probe.stats()["bytes"]
+
+    cache = DryRunCache(algod, tmp_path / "lru", max_bytes=int(3.5 * entry_size))
+    dre = DryRunExecutor(cache, ExecutionMode.Signature, "fake teal")
+    for i, x in enumerate("abc"):
+        dre.run_one((x,))
+        req = dre._dryrun_request(dre._executor_prep((x,))[1:], None)
+        path = cache.directory / (request_digest(req, cache._version) + cache.SUFFIX)
+        os.utime(path, (i, i))
+
+    dre.run_one(("a",))  # hit, so "a" becomes the most recently used
+    assert cache.stats()["hits"] == 1
+    dre.run_one(("d",))  # miss which causes eviction of "b"
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+    calls = algod.dryrun.call_count
+    for x in "acd":
+        dre.run_one((x,))
+    assert algod.dryrun.call_count == calls
+    dre.run_one(("b",))
+    assert algod.dryrun.call_count == calls + 1
+
+
+def test_memo_lru():
+    memo = DryRunMemo(maxsize=2)
+    memo.put("a", 1)
+    memo.put("b", 2)
+    assert memo.get("a") == 1
+    memo.put("c", 3)
+    assert memo.get("b") is None
+    assert memo.get("a") == 1
+    assert memo.get("c") == 3
+    assert memo.info() == MemoInfo(hits=3, misses=1, maxsize=2, currsize=2)
+
+    memo.clear()
+    assert memo.info() == MemoInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+
+def test_cache_size_after_overwrite(tmp_path):
+    algod = make_algod()
+    cache = DryRunCache(algod, tmp_path)
+    dre = DryRunExecutor(cache, ExecutionMode.Signature, "fake teal")
+    dre.run_one(("x",))
+    (path,) = tmp_path.glob("*" + cache.SUFFIX)
+
+    # e.g. concurrent misses of the same request overwrite the same entry:
+    data = path.read_bytes()
+    for _ in range(3):
+        cache._store(path, data)
+    assert cache.stats()["bytes"] == path.stat().st_size
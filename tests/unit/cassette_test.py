@@ -0,0 +1,104 @@
+from unittest.mock import Mock
+
+import pytest
+
+from algosdk.v2client.algod import AlgodClient
+
+from graviton.blackbox import DryRunExecutor
+from graviton.cache import request_digest
+from graviton.cassette import CassetteMiss, CassetteMode, DryRunCassette
+from graviton.models import ExecutionMode
+
+from tests.unit.fakes import fake_dryrun
+
+
+def make_algod():
+    algod = Mock(AlgodClient)
+    algod.dryrun.side_effect = fake_dryrun
+    algod.compile.return_value = {"hash": "h", "result": "AYEB"}
+    return algod
+
+
+@pytest.mark.parametrize("mode", [ExecutionMode.Application, ExecutionMode.Signature])
+def test_record_then_replay(tmp_path, mode):
+    path = tmp_path / "cassettes" / "fake.z"
+    inputs = [(f"input {i}",) for i in range(5)]
+
+    algod = make_algod()
+    with DryRunCassette(path, CassetteMode.record, algod=algod) as cassette:
+        recorded = DryRunExecutor(cassette, mode, "fake teal").run_sequence(inputs)
+    assert algod.dryrun.call_count == 5
+    assert cassette.stats()["responses"] == 5 and path.exists()
+
+    replayer = DryRunCassette(path)
+    replayed = DryRunExecutor(replayer, mode, "fake teal").run_sequence(
+        inputs, batch_size=1
+    )
+    assert replayer.stats() == {"hits": 5, "misses": 0, "responses": 5}
+    for x, y in zip(recorded, replayed):
+        assert x.parent_dryrun_response == y.parent_dryrun_response
+        assert x.stack_top() == y.stack_top()
+
+
+def test_strict_miss(tmp_path):
+    path = tmp_path / "fake.z"
+    with DryRunCassette(path, CassetteMode.record, algod=make_algod()) as cassette:
+        DryRunExecutor(cassette, ExecutionMode.Application, "fake teal").run_one(("x",))
+
+    dre = DryRunExecutor(DryRunCassette(path), ExecutionMode.Application, "fake teal")
+    assert dre.run_one(("x",)).last_log() == b"x".hex()
+    with pytest.raises(CassetteMiss, match="no response was recorded") as e:
+        dre.run_one(("y",))
+    assert e.value.digest == request_digest(e.value.request)
+    assert e.value.request.txns[0].transaction.app_args == ["y"]
+
+
+def test_lenient_replay_records_misses(tmp_path):
+    path = tmp_path / "fake.z"
+    algod = make_algod()
+    inputs = [("x",), ("y",)]
+    with DryRunCassette(path, strict=False, algod=algod) as cassette:
+        dre = DryRunExecutor(cassette, ExecutionMode.Signature, "fake teal")
+        dre.run_sequence(inputs)
+        dre.run_sequence(inputs)
+    assert algod.dryrun.call_count == 2
+    assert cassette.stats() == {"hits": 2, "misses": 2, "responses": 2}
+
+    DryRunExecutor(
+        DryRunCassette(path), ExecutionMode.Signature, "fake teal"
+    ).run_sequence(inputs)
+
+
+def test_compile_once_is_recorded(tmp_path):
+    path = tmp_path / "fake.z"
+    teal = "fake teal recorded with compile_once"
+    algod = make_algod()
+    # another executor (with another client) compiling the same program first is irrelevant:
+    DryRunExecutor(
+        make_algod(), ExecutionMode.Signature, teal, compile_once=True
+    ).run_one(("x",))
+
+    with DryRunCassette(path, CassetteMode.record, algod=algod) as cassette:
+        DryRunExecutor(
+            cassette, ExecutionMode.Signature, teal, compile_once=True
+        ).run_one(("x",))
+    algod.compile.assert_called_once_with(teal)
+
+    replay = DryRunCassette(path)
+    assert replay.recorded(DryRunCassette.compile_digest(teal)) == {
+        "hash": "h",
+        "result": "AYEB",
+    }
+    replayed = DryRunExecutor(
+        replay, ExecutionMode.Signature, teal, compile_once=True
+    ).run_one(("x",))
+    assert replayed.stack_top() == "0x" + b"x".hex()
+    # both the compile and the dry run were served by the cassette:
+    assert replay.stats() == {"hits": 2, "misses": 0, "responses": 2}
+
+
+def test_replay_requires_a_cassette(tmp_path):
+    with pytest.raises(AssertionError, match="non-existent cassette"):
+        DryRunCassette(tmp_path / "nope.z")
+    with pytest.raises(AssertionError, match="an algod is required"):
+        DryRunCassette(tmp_path / "nope.z", CassetteMode.record)
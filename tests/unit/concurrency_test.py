@@ -0,0 +1,145 @@
+from threading import Lock
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client.algod import AlgodClient
+
+from graviton.blackbox import DryRunExecutor
+from graviton.concurrency import AdaptiveConcurrency
+from graviton.models import ExecutionMode
+
+from tests.unit.fakes import fake_dryrun
+
+LATENCY = 0.01
+
+
+def make_algod(capacity=None, failures=0, code=503):
+    """
+    Fake algod whose latency stays flat up to `capacity` concurrent dry runs and grows linearly beyond it.
+    Its first `failures` dry runs fail with an HTTP error `code`.
+    """
+    lock = Lock()
+    state = {"in_flight": 0, "peak": 0, "calls": 0}
+
+    def dryrun(drr):
+        with lock:
+            state["calls"] += 1
+            if state["calls"] <= failures:
+                raise AlgodHTTPError("overloaded", code)
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+            load = state["in_flight"]
+        try:
+            time.sleep(LATENCY * max(1, load / capacity) if capacity else LATENCY)
+            return fake_dryrun(drr)
+        finally:
+            with lock:
+                state["in_flight"] -= 1
+
+    algod = Mock(AlgodClient)
+    algod.dryrun.side_effect = dryrun
+    return algod, state
+
+
+def run(algod, concurrency, n):
+    inputs = [(f"input {i}",) for i in range(n)]
+    inspectors = DryRunExecutor(
+        algod, ExecutionMode.Signature, "fake teal"
+    ).run_sequence(inputs, max_workers=concurrency)
+    assert [i.args for i in inspectors] == inputs
+    assert concurrency.in_flight == 0
+
+
+def test_grows_while_latency_is_flat():
+    algod, state = make_algod()
+    concurrency = AdaptiveConcurrency(max_limit=16)
+    run(algod, concurrency, 400)
+
+    stats = concurrency.stats()
+    assert 8 <= stats["limit"] <= stats["peak_limit"] == 16
+    assert stats["requests"] == 400 and stats["errors"] == 0
+    assert LATENCY <= stats["p50"] <= stats["p90"] <= stats["p99"]
+    assert state["peak"] <= 16
+
+
+def test_backs_off_on_rising_latency():
+    algod, state = make_algod(capacity=4)
+    concurrency = AdaptiveConcurrency(max_limit=64)
+    run(algod, concurrency, 400)
+
+    assert 2 <= concurrency.limit < 16
+    assert concurrency.peak_limit < 16
+
+
+def test_backs_off_and_retries_on_http_errors():
+    algod, _ = make_algod(failures=3)
+    concurrency = AdaptiveConcurrency(initial=8, max_limit=8)
+    run(algod, concurrency, 3)
+
+    assert concurrency.errors == 3
+    assert concurrency.limit == 4
+    assert algod.dryrun.call_count == 6
+
+
+def test_deterministic_errors_are_raised():
+    algod, _ = make_algod(failures=1, code=400)
+    concurrency = AdaptiveConcurrency()
+    with pytest.raises(AlgodHTTPError, match="overloaded"):
+        run(algod, concurrency, 10)
+
+    assert concurrency.in_flight == 0
+    assert concurrency.errors == 0
+
+
+def test_lazy_iter_sequence():
+    algod, _ = make_algod()
+    concurrency = AdaptiveConcurrency(max_limit=4)
+    dre = DryRunExecutor(algod, ExecutionMode.Signature, "fake teal")
+    inspectors = dre.iter_sequence(
+        ((f"input {i}",) for i in range(10**9)), max_workers=concurrency
+    )
+    assert [next(inspectors).args for _ in range(20)] == [
+        (f"input {i}",) for i in range(20)
+    ]
+    inspectors.close()
+    assert concurrency.in_flight == 0
+    assert algod.dryrun.call_count <= 20 + 3 * 4
+
+
+@pytest.mark.parametrize("max_buffered", [None, 1, 3])
+def test_lazy_iter_sequence_max_buffered(max_buffered):
+    algod, _ = make_algod()
+    concurrency = AdaptiveConcurrency(initial=4, max_limit=8)
+    dre = DryRunExecutor(algod, ExecutionMode.Signature, "fake teal")
+    inspectors = dre.iter_sequence(
+        ((f"input {i}",) for i in range(10**9)),
+        max_workers=concurrency,
+        max_buffered=max_buffered,
+    )
+    assert next(inspectors).args == ("input 0",)
+    # no more than the buffer was run ahead of the first inspector:
+    assert algod.dryrun.call_count <= 1 + (max_buffered or 2 * 8)
+    inspectors.close()
+    assert concurrency.in_flight == 0
+
+
+def test_percentiles():
+    concurrency = AdaptiveConcurrency()
+    assert concurrency.latency_percentiles() == {}
+    concurrency._latencies.extend(i / 100 for i in range(1, 101))
+    assert concurrency.latency_percentiles() == {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+    assert concurrency.latency_percentiles(99.9) == {"p99.9": 1.0}
+
+
+def test_latencies_are_bounded():
+    concurrency = AdaptiveConcurrency()
+    samples = AdaptiveConcurrency.LATENCY_SAMPLES
+    for i in range(3 * samples):
+        assert concurrency._try_acquire()
+        concurrency._release(i / samples, False)
+    assert len(concurrency._latencies) == samples
+    assert concurrency.stats()["requests"] == 3 * samples
+    assert concurrency.latency_percentiles(0.1) == {"p0.1": 2.0}
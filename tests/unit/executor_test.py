@@ -1,5 +1,8 @@
+from base64 import b64encode
 from dataclasses import asdict
 import pytest
+import threading
+import time
 from unittest.mock import Mock
 
 from algosdk.transaction import StateSchema
@@ -8,7 +11,11 @@ from algosdk.v2client.algod import AlgodClient
 
 
 from graviton.blackbox import DryRunExecutor, DryRunEncoder, DryRunTransactionParams
-from graviton.models import ExecutionMode
+from graviton.cache import DryRunMemo, MemoInfo, request_digest
+from graviton.dryrun import DryRunHelper, DryRunRequestTemplate
+from graviton.models import ZERO_ADDRESS, ExecutionMode
+
+from tests.unit.fakes import fake_dryrun
 
 
 NONSENSE = "not a valid signature"
@@ -225,3 +232,264 @@ def test_DryRunTransactionParams_update_fields():
     for k, v in asdict(drtp1).items():
         if k not in explitly_asserted:
             assert not v
+
+
+@pytest.mark.parametrize("mode", ExecutionMode)
+@pytest.mark.parametrize("batch_size", [None, 1, 5, 16])
+def test_run_sequence_batching(mode, batch_size):
+    algod = Mock(AlgodClient)
+    algod.dryrun.side_effect = fake_dryrun
+    dre = DryRunExecutor(algod, mode, "fake teal")
+
+    inputs = [(f"input {i}",) for i in range(37)]
+    inspectors = dre.run_sequence(inputs, batch_size=batch_size)
+
+    expected_calls = len(inputs) if batch_size is None else -(-37 // batch_size)
+    assert algod.dryrun.call_count == expected_calls
+    assert len(inspectors) == len(inputs)
+    for i, (args, inspector) in enumerate(zip(inputs, inspectors)):
+        assert inspector.args == args
+        assert inspector.txn_index == (0 if batch_size is None else i % batch_size)
+        assert inspector.passed()
+        assert inspector.stack_top() == "0x" + args[0].encode().hex()
+        if mode == ExecutionMode.Application:
+            assert inspector.last_log() == args[0].encode().hex()
+
+
+def test_run_sequence_bad_batch_size():
+    dre = DryRunExecutor(Mock(AlgodClient), ExecutionMode.Signature, "fake teal")
+    for batch_size in (0, 17):
+        with pytest.raises(AssertionError, match="batch_size must be between 1 and 16"):
+            dre.run_sequence([("x",)], batch_size=batch_size)
+
+
+@pytest.mark.parametrize("mode", ExecutionMode)
+def test_grouped_request(mode):
+    args_list = [[f"arg {i}".encode()] for i in range(3)]
+    if mode == ExecutionMode.Application:
+        drr = DryRunHelper.grouped_app_request("fake teal", args_list, {})
+        assert [t.transaction.app_args for t in drr.txns] == args_list
+        assert len(drr.apps) == 1
+        assert [(s.field_name, s.app_index) for s in drr.sources] == [
+            ("approv", drr.apps[0].id)
+        ]
+    else:
+        drr = DryRunHelper.grouped_logicsig_request("fake teal", args_list, {})
+        assert [t.lsig.args for t in drr.txns] == args_list
+        assert drr.apps == []
+        assert [(s.field_name, s.txn_index) for s in drr.sources] == [
+            ("lsig", i) for i in range(3)
+        ]
+
+    with pytest.raises(AssertionError, match="can only group between 1 and 16"):
+        DryRunHelper._group_requests([])
+
+
+@pytest.mark.parametrize("program", ["fake teal", b"\x06\x81\x01"])
+@pytest.mark.parametrize(
+    "txn_params",
+    [
+        None,
+        DryRunTransactionParams.for_logicsig(amt=5, note="hi"),
+        DryRunTransactionParams.for_app(
+            index=42,
+            accounts=[ZERO_ADDRESS],
+            dryrun_accounts=[ZERO_ADDRESS, ZERO_ADDRESS],
+        ),
+    ],
+)
+@pytest.mark.parametrize("mode", ExecutionMode)
+def test_request_template(mode, txn_params, program):
+    is_app = mode == ExecutionMode.Application
+    if txn_params and (txn_params.index is not None) != is_app:
+        pytest.skip(f"{txn_params} don't apply to {mode}")
+
+    params = txn_params.asdict() if txn_params else {}
+    accounts = txn_params.dryrun_accounts if txn_params else []
+    template = DryRunRequestTemplate(program, is_app, params, accounts)
+    args_list = [[f"arg {i}".encode(), i] for i in range(3)]
+    if is_app:
+        singleton = DryRunHelper.singleton_app_request(
+            program, args_list[0], params, accounts
+        )
+        grouped = DryRunHelper.grouped_app_request(program, args_list, params, accounts)
+    else:
+        singleton = DryRunHelper.singleton_logicsig_request(
+            program, args_list[0], params
+        )
+        grouped = DryRunHelper.grouped_logicsig_request(program, args_list, params)
+
+    assert request_digest(template.request(args_list[0])) == request_digest(singleton)
+    assert request_digest(template.grouped_request(args_list)) == request_digest(
+        grouped
+    )
+    # the template isn't modified along the way:
+    assert request_digest(template.request(args_list[0])) == request_digest(singleton)
+
+
+@pytest.mark.parametrize("batch_size", [None, 3])
+@pytest.mark.parametrize("max_workers", [None, 1, 4])
+def test_run_sequence_concurrently(batch_size, max_workers):
+    lock = threading.Lock()
+    in_flight, max_in_flight = 0, 0
+
+    def slow_dryrun(drr):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return fake_dryrun(drr)
+
+    algod = Mock(AlgodClient)
+    algod.dryrun.side_effect = slow_dryrun
+    dre = DryRunExecutor(algod, ExecutionMode.Application, "fake teal")
+
+    inputs = [(f"input {i}",) for i in range(20)]
+    inspectors = dre.run_sequence(
+        inputs, batch_size=batch_size, max_workers=max_workers
+    )
+    assert [i.args for i in inspectors] == inputs
+    assert [i.last_log() for i in inspectors] == [a.encode().hex() for a, in inputs]
+    assert max_in_flight <= (max_workers or 1)
+    if max_workers == 4:
+        assert max_in_flight > 1
+
+    multi = DryRunExecutor.multi_exec([dre, dre], inputs, max_workers=max_workers)
+    assert [[i.args for i in inspectors] for inspectors in multi] == [inputs, inputs]
+
+    with pytest.raises(AssertionError, match="max_workers must be positive"):
+        dre.run_sequence(inputs, max_workers=0)
+
+
+@pytest.mark.parametrize("mode", ExecutionMode)
+def test_compile_once(mode):
+    teal = f"#pragma version 8\n// compile once test for {mode}\nint 1"
+    bytecode = b"\x08\x81\x01"
+
+    algod = Mock(AlgodClient)
+    algod.dryrun.side_effect = fake_dryrun
+    algod.compile.return_value = {"hash": "whatever", "result": b64encode(bytecode)}
+
+    inputs = [(f"input {i}",) for i in range(5)]
+    dres = [DryRunExecutor(algod, mode, teal, compile_once=True) for _ in range(2)]
+    for dre in dres:
+        dre.run_sequence(inputs)
+        dre.run_sequence(inputs, batch_size=3)
+
+    # each executor compiles once, with its own client:
+    assert [c.args for c in algod.compile.call_args_list] == [(teal,)] * len(dres)
+    assert algod.dryrun.call_count == 2 * (5 + 2)
+    for call in algod.dryrun.call_args_list:
+        drr = call.args[0]
+        assert drr.sources == []
+        if mode == ExecutionMode.Application:
+            assert [app.params.approval_program for app in drr.apps] == [bytecode]
+        else:
+            assert all(txn.lsig.logic == bytecode for txn in drr.txns)
+
+    other = Mock(AlgodClient)
+    other.dryrun.side_effect = fake_dryrun
+    other.compile.return_value = algod.compile.return_value
+    DryRunExecutor(other, mode, teal, compile_once=True).run_one(inputs[0])
+    other.compile.assert_called_once_with(teal)
+
+    # without compile_once, sources are sent as before:
+    algod.reset_mock()
+    DryRunExecutor(algod, mode, teal).run_one(inputs[0])
+    algod.compile.assert_not_called()
+    assert [s.source for s in algod.dryrun.call_args.args[0].sources] == [teal]
+
+
+@pytest.mark.parametrize("mode", ExecutionMode)
+def test_memo(mode):
+    algod = Mock(AlgodClient)
+    algod.dryrun.side_effect = fake_dryrun
+
+    memo = DryRunMemo(maxsize=100)
+    dre = DryRunExecutor(algod, mode, "fake teal", memo=memo)
+    inputs = [(f"input {i % 3}",) for i in range(9)]
+
+    inspectors = dre.run_sequence(inputs)
+    assert algod.dryrun.call_count == 3
+    assert memo.info() == MemoInfo(hits=6, misses=3, maxsize=100, currsize=3)
+    assert [i.args for i in inspectors] == inputs
+    assert inspectors[0] is inspectors[3] is inspectors[6]
+
+    # batches are memoized as a whole, apart from singleton runs:
+    more = inputs[:3] + [("new one",), ("new two",)]
+    batched = dre.run_sequence(more, batch_size=5)
+    assert algod.dryrun.call_count == 4
+    assert len(algod.dryrun.call_args.args[0].txns) == 5
+    assert all(x is not y for x, y in zip(batched, inspectors))
+    assert [i.args for i in batched] == more
+    assert memo.info().currsize == 8
+    assert dre.run_sequence(more, batch_size=5) == batched
+    assert algod.dryrun.call_count == 4
+    assert dre.run_one(("new one",)) is not batched[3]
+    assert dre.run_sequence(more[1:], batch_size=5)[0] is not batched[1]
+    assert algod.dryrun.call_count == 6
+
+    # distinct txn_params, programs and executors sharing the memo:
+    params = DryRunTransactionParams(note="a note")
+    assert dre.run_one(inputs[0], txn_params=params) is not inspectors[0]
+    assert dre.run_one(inputs[0], txn_params=params) is dre.run_one(
+        inputs[0], txn_params=DryRunTransactionParams(note="a note")
+    )
+    assert algod.dryrun.call_count == 7
+    assert (
+        DryRunExecutor(algod, mode, "fake teal", memo=memo).run_one(inputs[0])
+        is inspectors[0]
+    )
+    assert (
+        DryRunExecutor(algod, mode, "other teal", memo=memo).run_one(inputs[0])
+        is not inspectors[0]
+    )
+    assert algod.dryrun.call_count == 8
+
+    # no memo, no memoization:
+    plain = DryRunExecutor(algod, mode, "fake teal")
+    assert plain.run_one(inputs[0]) is not plain.run_one(inputs[0])
+    assert algod.dryrun.call_count == 10
+
+
+@pytest.mark.parametrize("batch_size", [None, 3])
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_iter_sequence_is_lazy(batch_size, max_workers):
+    algod = Mock(AlgodClient)
+    algod.dryrun.side_effect = fake_dryrun
+    consumed = 0
+
+    def inputs():
+        nonlocal consumed
+        i = 0
+        while True:  # infinitely many
+            consumed += 1
+            yield (f"input {i}",)
+            i += 1
+
+    dre = DryRunExecutor(algod, ExecutionMode.Application, "fake teal")
+    inspectors = dre.iter_sequence(
+        inputs(), batch_size=batch_size, max_workers=max_workers, max_buffered=2
+    )
+    assert consumed == 0
+
+    for i, inspector in zip(range(10), inspectors):
+        assert inspector.args == (f"input {i}",)
+        assert inspector.last_log() == f"input {i}".encode().hex()
+    inspectors.close()
+
+    # no more than the buffered batches were run ahead of the last yielded inspector:
+    batch = batch_size or 1
+    assert 10 <= consumed <= 10 + 2 * batch + batch
+    assert algod.dryrun.call_count <= -(-consumed // batch)
+
+
+def test_iter_sequence_bad_args():
+    dre = DryRunExecutor(Mock(AlgodClient), ExecutionMode.Signature, "fake teal")
+    with pytest.raises(AssertionError, match="batch_size must be between 1 and 16"):
+        dre.iter_sequence([("x",)], batch_size=17)
+    with pytest.raises(AssertionError, match="at index i=0 we have <class 'str'>"):
+        next(dre.iter_sequence(["x"]))
@@ -0,0 +1,101 @@
+"""
+Fake algod behavior for unit tests: every transaction is "executed" by pushing its first argument
+onto the stack, and for apps also logging it
+"""
+from base64 import b64decode, b64encode
+import msgpack  # type: ignore
+
+from algosdk.transaction import LogicSigTransaction
+
+
+def _as_bytes(arg) -> bytes:
+    return arg if isinstance(arg, bytes) else arg.encode()
+
+
+def fake_txn_result(arg: bytes, is_app: bool) -> dict:
+    prefix = "app-call" if is_app else "logic-sig"
+    b64_arg = b64encode(arg).decode()
+    txn = {
+        ("disassembly" if is_app else "logic-sig-disassembly"): [
+            "#pragma version 6",
+            "arg 0",
+        ],
+        f"{prefix}-trace": [
+            {"line": 1, "pc": 1, "stack": [], "scratch": []},
+            {
+                "line": 2,
+                "pc": 2,
+                "stack": [{"type": 1, "bytes": b64_arg, "uint": 0}],
+                "scratch": [],
+            },
+        ],
+        f"{prefix}-messages": (["ApprovalProgram"] if is_app else []) + ["PASS"],
+    }
+    if is_app:
+        txn.update({"logs": [b64_arg], "budget-added": 0, "budget-consumed": 1})
+    return txn
+
+
+def fake_response(txn_results: list) -> dict:
+    return {"error": "", "protocol-version": "future", "txns": txn_results}
+
+
+def fake_dryrun(drr) -> dict:
+    """Stand-in for `AlgodClient.dryrun()`"""
+    txns = []
+    for stxn in drr.txns:
+        if isinstance(stxn, LogicSigTransaction):
+            arg, is_app = stxn.lsig.args[0], False
+        else:
+            arg, is_app = stxn.transaction.app_args[0], True
+        txns.append(fake_txn_result(_as_bytes(arg), is_app))
+    return fake_response(txns)
+
+
+def fake_dryrun_msgpack(body: bytes) -> dict:
+    """Stand-in for algod's dryrun endpoint handler of a msgpack encoded request body"""
+    drr = msgpack.unpackb(body, raw=False)
+    txns = []
+    for stxn in drr["txns"]:
+        if "lsig" in stxn:
+            arg, is_app = stxn["lsig"]["arg"][0], False
+        else:
+            arg, is_app = stxn["txn"]["apaa"][0], True
+        txns.append(fake_txn_result(_as_bytes(arg), is_app))
+    return fake_response(txns)
+
+
+def _omit_empty(d: dict) -> dict:
+    return {k: v for k, v in d.items() if v or v is False}
+
+
+def _packed_teal_value(tv: dict) -> dict:
+    return _omit_empty({**tv, "bytes": b64decode(tv.get("bytes", ""))})
+
+
+def msgpack_shaped(resp: dict) -> dict:
+    """
+    The JSON dry run response `resp` as algod would encode it in msgpack:
+    with raw bytes, and with the zero values of trace steps omitted
+    """
+    txns = []
+    for txn in resp.get("txns") or []:
+        packed = dict(txn)
+        if "logs" in txn:
+            packed["logs"] = [b64decode(log) for log in txn["logs"]]
+        for key in ("app-call-trace", "logic-sig-trace"):
+            if key in txn:
+                packed[key] = [
+                    _omit_empty(
+                        {
+                            **step,
+                            "stack": [_packed_teal_value(tv) for tv in step["stack"]],
+                            "scratch": [
+                                _packed_teal_value(tv) for tv in step.get("scratch", [])
+                            ],
+                        }
+                    )
+                    for step in txn[key]
+                ]
+        txns.append(packed)
+    return {**resp, "txns": txns}
@@ -0,0 +1,96 @@
+import pickle
+from threading import Lock
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client.algod import AlgodClient
+
+from graviton.blackbox import DryRunExecutor
+from graviton.hedge import HedgedDryRunClient
+from graviton.models import ExecutionMode
+
+from tests.unit.fakes import _as_bytes, fake_dryrun
+
+STALL = 0.3
+
+
+def make_algod(stalls, fail=False):
+    """Fake algod whose first attempt of each input in `stalls` stalls (or fails, when `fail`)"""
+    lock = Lock()
+    attempted = set()
+
+    def dryrun(drr):
+        arg = _as_bytes(drr.txns[0].lsig.args[0])
+        with lock:
+            first = arg not in attempted
+            attempted.add(arg)
+        if arg in stalls and (first or fail):
+            time.sleep(STALL)
+            if fail:
+                raise AlgodHTTPError("stalled", 503)
+        else:
+            time.sleep(0.002)
+        return fake_dryrun(drr)
+
+    algod = Mock(AlgodClient)
+    algod.dryrun.side_effect = dryrun
+    return algod
+
+
+def test_stalls_are_hedged():
+    inputs = [(f"input {i}",) for i in range(80)]
+    stalls = {f"input {i}".encode() for i in range(29, 80, 10)}
+    algod = make_algod(stalls)
+    with HedgedDryRunClient(algod, max_hedge_rate=0.2) as hedged:
+        dre = DryRunExecutor(hedged, ExecutionMode.Signature, "fake teal")
+        inspectors = dre.run_sequence(inputs)
+
+    assert [i.args for i in inspectors] == inputs
+    stats = hedged.stats()
+    assert stats["requests"] == 80
+    assert algod.dryrun.call_count == 80 + stats["hedged"]
+    assert stats["hedged"] >= stats["hedges_won"] >= len(stalls)
+    assert stats["hedge_rate"] == stats["hedged"] / 80 <= 0.2
+    # the stalled requests completed before the client was closed:
+    assert stats["saved_seconds"] > 0
+    assert stats["hedge_delay"] is not None
+
+
+def test_no_hedging_before_min_samples():
+    algod = make_algod({b"input 0"})
+    with HedgedDryRunClient(algod) as hedged:
+        assert hedged.hedge_delay() is None
+        dre = DryRunExecutor(hedged, ExecutionMode.Signature, "fake teal")
+        dre.run_sequence([("input 0",), ("input 1",)])
+    assert hedged.stats()["hedged"] == 0
+    assert algod.dryrun.call_count == 2
+
+
+def test_both_failing_raises():
+    with HedgedDryRunClient(make_algod({b"bad"}, fail=True), min_samples=5) as hedged:
+        dre = DryRunExecutor(hedged, ExecutionMode.Signature, "fake teal")
+        dre.run_sequence([(f"input {i}",) for i in range(20)])
+        before = hedged.stats()["hedged"]
+        with pytest.raises(AlgodHTTPError, match="stalled"):
+            dre.run_one(("bad",))
+    assert hedged.stats()["hedged"] == before + 1
+
+
+def test_close():
+    hedged = HedgedDryRunClient(make_algod(set()))
+    hedged.close()
+    with pytest.raises(RuntimeError, match="shutdown"):
+        hedged.dryrun(Mock())
+
+
+def test_pickle():
+    with HedgedDryRunClient(AlgodClient("a" * 64, "http://localhost:4001")) as hedged:
+        clone = pickle.loads(pickle.dumps(hedged))
+    with clone:
+        assert (
+            clone.hedge_delay() is None
+            and clone.algod.algod_address == "http://localhost:4001"
+        )
@@ -1,6 +1,14 @@
+from pathlib import Path
+import pickle
+
 import pytest
 
-from graviton.inspector import DryRunInspector
+from algosdk import abi
+
+from graviton.avm import AVMClient
+from graviton.blackbox import DryRunExecutor
+from graviton.inspector import DRProp, DryRunInspector, DryRunResults
+from graviton.models import ExecutionMode
 
 
 def test_from_single_response_errors():
@@ -68,3 +76,163 @@ def test_from_single_response_errors():
         ae.value.args[0]
         == "dryrun response included the following error: [this is REALLLY REALLY BAD!!!]"
     )
+
+
+def test_lazy_extracts():
+    teal = (Path.cwd() / "tests" / "teal" / "app_slow_fibonacci.teal").read_text()
+    resp = (
+        DryRunExecutor(AVMClient(), ExecutionMode.Application, teal)
+        .run_one((7,))
+        .parent_dryrun_response
+    )
+    inspector = DryRunInspector.from_single_response(resp, (7,), [7])
+    assert dict(inspector.extracts) == {}
+
+    assert inspector.passed() and inspector.last_log() == (13).to_bytes(8, "big").hex()
+    assert set(inspector.extracts) == {"status"}
+    assert len(inspector.logs()) == 1 and set(inspector.extracts) == {"status", "logs"}
+
+    eager = DryRunInspector.extract_all(inspector.txn, True)
+    for key in eager:
+        if key != "bbr":
+            assert inspector.extracts[key] == eager[key], key
+    assert "bbr" not in inspector.extracts
+    assert inspector.final_scratch() == {
+        k: v.as_python_type() for k, v in eager["bbr"].final_scratch_state.items()
+    }
+
+    with pytest.raises(KeyError):
+        inspector.extracts["unknown"]
+
+    unpickled = pickle.loads(pickle.dumps(inspector))
+    assert "bbr" in unpickled.extracts
+    assert unpickled.report() == inspector.report()
+
+
+def test_columnar_results():
+    stack = [
+        {"type": 2, "bytes": "", "uint": 7},
+        {"type": 1, "bytes": "AAE=", "uint": 0},
+    ]
+    scratch = [
+        {"type": 0, "bytes": "", "uint": 0},
+        {"type": 2, "bytes": "", "uint": 7},
+    ]
+    trace = [
+        {"line": 1, "pc": 1, "stack": [], "scratch": []},
+        {"line": 2, "pc": 3, "stack": stack[:1], "scratch": []},
+        {"line": 3, "pc": 4, "stack": stack, "scratch": scratch},
+        {"line": 3, "pc": 4, "stack": stack, "scratch": scratch, "error": "oops"},
+    ]
+    bbr = DryRunResults.scrape(trace, ["int 7", "byte 0x0001", "store 1"])
+
+    assert len(bbr.pool) == 3
+    assert bbr.program_counters == [1, 3, 4, 4]
+    assert bbr.teal_line_numbers[-1] == 3
+    assert bbr.teal_source_lines == ["int 7", "byte 0x0001", "store 1", "oops"]
+    assert bbr.stack_heights == [0, 1, 2, 2]
+    assert bbr.stack_evolution[1:] == ["[7]", "[7, 0x0001]", "[7, 0x0001]"]
+    assert bbr.scratch_evolution == [[], [], ["1->7"], []]
+    assert bbr.final_scratch() == {1: 7}
+    assert bbr.max_stack_height() == 2 and bbr.final_stack_top() == "0x0001"
+    with pytest.raises(IndexError):
+        bbr.stack_evolution[4]
+
+    assert pickle.loads(pickle.dumps(bbr)) == bbr
+
+
+def test_tabulate_renders_last_steps_only():
+    teal = (Path.cwd() / "tests" / "teal" / "app_slow_fibonacci.teal").read_text()
+    inspector = DryRunExecutor(AVMClient(), ExecutionMode.Application, teal).run_one(
+        (10,)
+    )
+    bbr = inspector.black_box_results
+    assert bbr.rendered == {}
+
+    table = inspector.tabulate(-1, last_steps=3)
+    assert len(table.splitlines()) == 2 + 3
+    start = bbr.stack_bounds[bbr.steps_executed - 3]
+    assert set(bbr.rendered) <= set(bbr.stack_entries[start:]) | set(
+        bbr.scratch_entries[bbr.scratch_bounds[bbr.steps_executed - 3] :]
+    )
+    assert table.splitlines()[-1].split("|")[-1].strip() == bbr.final_stack()
+
+
+def test_sparse_scratch_deltas():
+    def scratch(*uints):
+        return [{"type": 2, "bytes": "", "uint": u} for u in uints]
+
+    trace = [
+        {"line": 1, "pc": 1, "stack": [], "scratch": scratch(0, 5)},
+        {"line": 1, "pc": 1, "stack": [], "scratch": scratch(0, 5)},
+        # a slot becomes non-empty while another one changes:
+        {"line": 1, "pc": 1, "stack": [], "scratch": scratch(3, 6)},
+        {"line": 1, "pc": 1, "stack": [], "scratch": scratch(3, 7)},
+        # emptied slots aren't deltas:
+        {"line": 1, "pc": 1, "stack": [], "scratch": scratch(0, 7)},
+        {"line": 1, "pc": 1, "stack": [], "scratch": scratch(0, 7, 0, 1)},
+    ]
+    bbr = DryRunResults.scrape(trace, ["x"])
+    assert bbr.scratch_evolution == [["1->5"], [], ["0->3"], ["1->7"], [], ["3->1"]]
+    assert bbr.slots_used == [0, 1, 3]
+    assert bbr.final_scratch() == {1: 7, 3: 1}
+
+    verbose = DryRunResults.scrape(trace, ["x"], scratch_verbose=True)
+    assert verbose.scratch_evolution[2:4] == [
+        ["0->3", "1->6", ""],
+        ["0->3", "1->7", ""],
+    ]
+    assert verbose.scratch_evolution[-1] == ["", "1->7", "3->1"]
+
+
+def test_dig_memo():
+    teal = (Path.cwd() / "tests" / "teal" / "app_slow_fibonacci.teal").read_text()
+    inspector = DryRunExecutor(AVMClient(), ExecutionMode.Application, teal).run_one(
+        (8,)
+    )
+    props = [
+        p for p in DRProp if p not in (DRProp.globalStateHas, DRProp.localStateHas)
+    ]
+    dug = {p: inspector.dig(p) for p in props}
+    assert dug[DRProp.lastLog] == (21).to_bytes(8, "big").hex()
+    assert inspector.error(contains="nope") is False
+
+    # repeated digs are served from the memo:
+    inspector.txn = {}
+    inspector.extracts = {}
+    assert {p: inspector.dig(p) for p in props} == dug
+    assert inspector.error(contains="nope") is False
+    with pytest.raises(KeyError):
+        inspector.error(contains="other")
+
+    # memoized values are handed out as copies:
+    inspector.final_scratch()[0] = "changed"
+    assert inspector.final_scratch() == dug[DRProp.finalScratch]
+
+    # re-configuring forgets them:
+    inspector.config(suppress_abi=True)
+    assert inspector.last_log() is None
+
+    with pytest.raises(Exception, match="Unknown assert_type"):
+        inspector.dig(DRProp.globalStateHas)
+
+
+def test_dig_memo_abi():
+    teal = """#pragma version 6
+byte 0x151f7c750000000000000001000000000000000280
+log
+int 1"""
+    inspector = DryRunExecutor(AVMClient(), ExecutionMode.Application, teal).run_one(())
+    inspector.config(has_abi_prefix=True)
+    assert inspector.last_log() == "151f7c750000000000000001000000000000000280"
+
+    # assigning the ABI type forgets the memoized values:
+    inspector.abi_type = abi.ABIType.from_string("(uint64[2],bool)")
+    assert inspector.last_log() == [[1, 2], True]
+
+    # nested memoized values are handed out as copies as well:
+    inspector.last_log()[0][0] = "changed"
+    assert inspector.last_log() == [[1, 2], True]
+
+    inspector.abi_type = None
+    assert inspector.last_log() == "151f7c750000000000000001000000000000000280"
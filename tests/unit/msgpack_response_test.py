@@ -0,0 +1,98 @@
+import json
+from pathlib import Path
+from unittest.mock import Mock
+
+import msgpack  # type: ignore
+import pytest
+
+from algosdk.v2client.algod import AlgodClient
+
+from graviton.avm import AVMClient
+from graviton.blackbox import DryRunExecutor
+from graviton.dryrun import dryrun_msgpack, normalize_msgpack_response
+from graviton.models import ExecutionMode
+
+from tests.algod_stub import StandInAlgod
+from tests.unit.fakes import fake_response, msgpack_shaped
+
+TEAL_DIR = Path.cwd() / "tests" / "teal"
+
+
+@pytest.mark.parametrize(
+    "mode, filebase, args",
+    [
+        (ExecutionMode.Application, "app_slow_fibonacci", (7,)),
+        (ExecutionMode.Application, "app_oldfac", (21,)),
+        (ExecutionMode.Signature, "lsig_slow_fibonacci", (5,)),
+        (ExecutionMode.Signature, "lsig_oldfac", (21,)),
+    ],
+)
+def test_normalize_round_trip(mode, filebase, args):
+    teal = (TEAL_DIR / f"{filebase}.teal").read_text()
+    resp = DryRunExecutor(AVMClient(), mode, teal).run_one(args).parent_dryrun_response
+
+    packed = msgpack.packb(msgpack_shaped(resp), use_bin_type=True)
+    assert len(packed) < len(json.dumps(resp))
+    assert normalize_msgpack_response(msgpack.unpackb(packed, raw=False)) == resp
+
+
+def test_normalize_omitted_zero_values():
+    step = {"line": 1, "pc": 1, "stack": [], "scratch": []}
+    resp = fake_response([])
+    resp["txns"] = [
+        {
+            "disassembly": ["int 1"],
+            "logic-sig-messages": ["PASS"],
+            "logic-sig-trace": [
+                {
+                    **step,
+                    "stack": [{"bytes": "", "type": 2, "uint": 0}],
+                    "scratch": [
+                        {"bytes": "", "type": 0, "uint": 0},
+                        {"bytes": "AQ==", "type": 1, "uint": 0},
+                    ],
+                },
+                step,
+            ],
+        }
+    ]
+
+    shaped = msgpack_shaped(resp)
+    assert shaped["txns"][0]["logic-sig-trace"][0]["scratch"][0] == {}
+    packed = msgpack.packb(shaped, use_bin_type=True)
+    assert normalize_msgpack_response(msgpack.unpackb(packed, raw=False)) == resp
+
+
+@pytest.mark.parametrize("keep_alive", [False, True])
+@pytest.mark.parametrize("mode", [ExecutionMode.Application, ExecutionMode.Signature])
+def test_msgpack_responses(keep_alive, mode):
+    inputs = [(f"input {i}",) for i in range(5)]
+    with StandInAlgod() as stand_in:
+        algod = stand_in.client(keep_alive=keep_alive)
+        json_inspectors = DryRunExecutor(algod, mode, "fake teal").run_sequence(inputs)
+        dre = DryRunExecutor(algod, mode, "fake teal", response_format="msgpack")
+        msgpack_inspectors = dre.run_sequence(inputs, batch_size=2)
+
+    for x, y in zip(json_inspectors, msgpack_inspectors):
+        assert x.txn == y.txn
+        assert x.stack_top() == y.stack_top()
+
+
+def test_clients_without_msgpack():
+    dre = DryRunExecutor(
+        AVMClient(), ExecutionMode.Signature, "int 1", response_format="msgpack"
+    )
+    assert dre.run_one(()).passed()
+
+    # an algod which ignores the requested format:
+    algod = Mock(AlgodClient)
+    algod.dryrun.return_value = json.dumps(fake_response([])).encode()
+    assert dryrun_msgpack(algod, None) == fake_response([])
+    algod.dryrun.assert_called_once_with(
+        None, params={"format": "msgpack"}, response_format="msgpack"
+    )
+
+    with pytest.raises(AssertionError, match="must be json or msgpack"):
+        DryRunExecutor(
+            AVMClient(), ExecutionMode.Signature, "int 1", response_format="xml"
+        )
@@ -0,0 +1,94 @@
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client.algod import AlgodClient
+
+from graviton.blackbox import DryRunExecutor
+from graviton.models import ExecutionMode
+from graviton.pool import AlgodPool
+
+from tests.unit.fakes import fake_dryrun
+
+
+def make_algod(address, dryrun):
+    algod = Mock(AlgodClient)
+    algod.algod_address = address
+    algod.dryrun.side_effect = dryrun
+    return algod
+
+
+def test_least_outstanding_spreads_concurrent_load():
+    def slow(drr):
+        time.sleep(0.02)
+        return fake_dryrun(drr)
+
+    algods = [make_algod(f"node{i}", slow) for i in range(3)]
+    dre = DryRunExecutor(algods, ExecutionMode.Signature, "fake teal")
+    assert isinstance(dre.algod, AlgodPool)
+
+    inputs = [(f"input {i}",) for i in range(30)]
+    inspectors = dre.run_sequence(inputs, max_workers=3)
+    assert [i.args for i in inspectors] == inputs
+    assert [a.dryrun.call_count for a in algods] == [10, 10, 10]
+    assert all(s["outstanding"] == 0 for s in dre.algod.stats())
+
+
+def test_failing_node_is_retried_and_ejected():
+    def down(drr):
+        raise ConnectionRefusedError("nobody home")
+
+    bad, good = make_algod("bad", down), make_algod("good", fake_dryrun)
+    pool = AlgodPool([bad, good], max_failures=2)
+    dre = DryRunExecutor(pool, ExecutionMode.Application, "fake teal")
+
+    inputs = [(f"input {i}",) for i in range(10)]
+    inspectors = dre.run_sequence(inputs)
+    assert [i.last_log() for i in inspectors] == [a.encode().hex() for a, in inputs]
+
+    # 2 strikes and you're out:
+    assert bad.dryrun.call_count == 2
+    assert good.dryrun.call_count == 10
+    bad_stats, good_stats = pool.stats()
+    assert bad_stats["ejected"] and bad_stats["failures"] == 2
+    assert not good_stats["ejected"] and good_stats["failures"] == 0
+
+    # when every node is down, the error surfaces:
+    with pytest.raises(ConnectionRefusedError):
+        AlgodPool([make_algod("bad", down)]).dryrun(None)
+
+
+def test_deterministic_errors_are_not_retried():
+    def bad_request(drr):
+        raise AlgodHTTPError("bad request", 400)
+
+    algods = [make_algod(f"node{i}", bad_request) for i in range(3)]
+    pool = AlgodPool(algods, max_failures=1)
+    with pytest.raises(AlgodHTTPError, match="bad request"):
+        pool.dryrun(None)
+
+    assert sum(a.dryrun.call_count for a in algods) == 1
+    assert not any(s["ejected"] for s in pool.stats())
+
+
+def test_slow_node_is_ejected():
+    def latency(delay):
+        def dryrun(drr):
+            time.sleep(delay)
+            return fake_dryrun(drr)
+
+        return dryrun
+
+    slow, fast = make_algod("slow", latency(0.05)), make_algod("fast", latency(0.002))
+    pool = AlgodPool([slow, fast], min_samples=3)
+    dre = DryRunExecutor(pool, ExecutionMode.Signature, "fake teal")
+    inputs = [(f"input {i}",) for i in range(400)]
+    assert [i.args for i in dre.run_sequence(inputs, max_workers=2)] == inputs
+
+    slow_stats, fast_stats = pool.stats()
+    assert slow_stats["ejected"]
+    assert not fast_stats["ejected"]
+    assert slow.dryrun.call_count == 3
+    assert fast.dryrun.call_count == 397
@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import pytest
+
+from graviton.avm import AVMClient
+from graviton.blackbox import DryRunExecutor
+from graviton.inspector import DryRunProperty as DRProp, mode_has_property, needs_trace
+from graviton.models import ExecutionMode
+
+from tests.algod_stub import StandInAlgod
+
+TEAL_DIR = Path.cwd() / "tests" / "teal"
+
+# properties which dig() can't dig on its own:
+STATE_PROPERTIES = {DRProp.globalStateHas, DRProp.localStateHas}
+SUMMARY = [DRProp.cost, DRProp.lastLog, DRProp.status, DRProp.passed]
+
+
+def test_needs_trace():
+    assert needs_trace(None)
+    assert not needs_trace([])
+    assert not needs_trace(SUMMARY)
+    assert needs_trace(SUMMARY + [DRProp.stackTop])
+    assert needs_trace({DRProp.finalScratch})
+
+
+@pytest.mark.parametrize(
+    "projection",
+    [SUMMARY, SUMMARY + [DRProp.maxStackHeight], SUMMARY + [DRProp.finalScratch]],
+)
+def test_projected_inspectors_dig_the_same(projection):
+    teal = (TEAL_DIR / "app_slow_fibonacci.teal").read_text()
+    mode = ExecutionMode.Application
+    inputs = [(i,) for i in range(6)]
+    full = DryRunExecutor(AVMClient(), mode, teal).run_sequence(inputs)
+    dre = DryRunExecutor(AVMClient(), mode, teal, projection=projection)
+    projected = dre.run_sequence(inputs)
+
+    for x, y in zip(full, projected):
+        assert "bbr" not in y.extracts
+        for prop in DRProp:
+            if mode_has_property(mode, prop) and prop not in STATE_PROPERTIES:
+                assert x.dig(prop) == y.dig(prop), prop
+        # scraped on demand:
+        assert x.report() == y.report()
+        assert "bbr" in y.extracts
+
+
+@pytest.mark.parametrize("mode", [ExecutionMode.Application, ExecutionMode.Signature])
+def test_msgpack_traces_are_normalized_on_demand(mode):
+    inputs = [(f"input {i}",) for i in range(4)]
+    with StandInAlgod() as stand_in:
+        algod = stand_in.client()
+        full = DryRunExecutor(algod, mode, "fake teal").run_sequence(inputs)
+        dre = DryRunExecutor(
+            algod, mode, "fake teal", response_format="msgpack", projection=SUMMARY
+        )
+        projected = dre.run_sequence(inputs, batch_size=2)
+
+    for x, y in zip(full, projected):
+        assert y.passed() and x.last_log() == y.last_log()
+        assert "trace" not in y.extracts
+        assert x.stack_top() == y.stack_top()
+        assert x.error() == y.error()
+        assert x.final_scratch() == y.final_scratch()
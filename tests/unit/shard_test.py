@@ -0,0 +1,220 @@
+from pathlib import Path
+import pickle
+
+import pytest
+
+from algosdk.v2client.algod import AlgodClient
+
+from graviton.avm import AVMClient
+from graviton.blackbox import DryRunExecutor
+from graviton.cache import DryRunCache, DryRunMemo
+from graviton.cassette import CassetteMode, DryRunCassette
+from graviton.concurrency import AdaptiveConcurrency
+from graviton.dryrun import TRACE_KEYS
+from graviton.inspector import (
+    DryRunInspector,
+    DryRunProperty as DRProp,
+    mode_has_property,
+)
+from graviton.invariant import PredicateKind
+from graviton.models import ExecutionMode
+from graviton.pool import AlgodPool
+from graviton.sim import Simulation
+from graviton.simulate import SimulateClient
+
+from tests.oracles import fib_cost
+
+TEAL_DIR = Path.cwd() / "tests" / "teal"
+SLOW_FIB = (TEAL_DIR / "app_slow_fibonacci.teal").read_text()
+
+
+def test_sharded_multi_exec():
+    execs = [
+        DryRunExecutor(AVMClient(), ExecutionMode.Application, SLOW_FIB),
+        DryRunExecutor(
+            AVMClient(),
+            ExecutionMode.Signature,
+            (TEAL_DIR / "lsig_slow_fibonacci.teal").read_text(),
+        ),
+    ]
+    inputs = [(i % 10,) for i in range(20)]
+
+    threaded = DryRunExecutor.multi_exec(execs, inputs)
+    sharded = DryRunExecutor.multi_exec(execs, inputs, processes=2, shard_size=3)
+
+    for xs, ys in zip(threaded, sharded):
+        assert [x.args for x in xs] == [y.args for y in ys] == inputs
+        for x, y in zip(xs, ys):
+            assert x.stack_top() == y.stack_top()
+            assert x.cost() == y.cost()
+            assert (
+                x.black_box_results.stack_evolution
+                == y.black_box_results.stack_evolution
+            )
+
+
+ASSERT_SMALL = """#pragma version 6
+arg 0
+btoi
+int 3
+<
+assert
+byte ""
+"""
+SUMMARY = [DRProp.cost, DRProp.lastLog, DRProp.status, DRProp.passed]
+
+
+def dig_all(inspector):
+    props = [
+        p
+        for p in DRProp
+        if mode_has_property(inspector.mode, p)
+        and p not in {DRProp.globalStateHas, DRProp.localStateHas}
+    ]
+    return (
+        {p: inspector.dig(p) for p in props},
+        inspector.error(contains="assert"),
+        inspector.report(),
+    )
+
+
+@pytest.mark.parametrize(
+    "mode, teal",
+    [(ExecutionMode.Application, SLOW_FIB), (ExecutionMode.Signature, ASSERT_SMALL)],
+)
+def test_sharded_inspectors_come_back_scraped(mode, teal):
+    inputs = [(i,) for i in range(6)]
+    dre = DryRunExecutor(AVMClient(), mode, teal)
+    threaded = dre.run_sequence(inputs)
+    sharded = DryRunExecutor.multi_exec([dre], inputs, processes=2, shard_size=2)[0]
+
+    for x, y in zip(threaded, sharded):
+        assert "bbr" in y.extracts and "trace" not in y.extracts
+        assert not TRACE_KEYS & y.txn.keys()
+        assert not any(
+            TRACE_KEYS & txn.keys() for txn in y.parent_dryrun_response["txns"]
+        )
+        assert dig_all(x) == dig_all(y)
+        with pytest.raises(AssertionError, match="detached"):
+            y.trace()
+
+
+def test_detached_projections_still_report():
+    inputs = [(i,) for i in range(6)]
+    dre = DryRunExecutor(
+        AVMClient(), ExecutionMode.Signature, ASSERT_SMALL, projection=SUMMARY
+    )
+    inspectors = dre.run_sequence(inputs, batch_size=3)
+    detached = pickle.loads(pickle.dumps(DryRunInspector.detach(inspectors)))
+
+    # the inspectors of a batch still share their response:
+    assert detached[0].parent_dryrun_response is detached[2].parent_dryrun_response
+    for x, y in zip(dre.run_sequence(inputs, batch_size=3), detached):
+        # scraped before the trace was dropped, even though the projection doesn't need it:
+        assert "bbr" in y.extracts
+        for prop in [DRProp.status, DRProp.passed, DRProp.error, DRProp.errorMessage]:
+            assert x.dig(prop) == y.dig(prop), prop
+        assert x.error(contains="assert") == y.error(contains="assert")
+        assert x.report() == y.report()
+
+
+def test_detached_long_traces_are_smaller():
+    dre = DryRunExecutor(AVMClient(), ExecutionMode.Application, SLOW_FIB)
+    inspectors = dre.run_sequence([(8,)] * 3)
+    size = len(pickle.dumps(inspectors))
+    assert len(pickle.dumps(DryRunInspector.detach(inspectors))) < size
+
+
+def test_sharded_simulation_reports_failures():
+    sim = Simulation(
+        AVMClient(), ExecutionMode.Application, SLOW_FIB, {DRProp.lastLog: "00"}
+    )
+    with pytest.raises(AssertionError) as err:
+        sim.run_and_assert([(i,) for i in range(4)], processes=2)
+
+    report = str(err.value)
+    assert (
+        "Invariant of PredicateKind.Constant for 'DryRunProperty.lastLog' failed"
+        in report
+    )
+    assert "App Trace:" in report and "callsub slowfibonacci_0" in report
+    assert "detached" not in report
+
+
+def test_sharded_simulation():
+    sim = Simulation(
+        AVMClient(),
+        ExecutionMode.Application,
+        SLOW_FIB,
+        {
+            DRProp.cost: PredicateKind.IdenticalPair,
+            DRProp.lastLog: PredicateKind.IdenticalPair,
+        },
+        identities_teal=SLOW_FIB,
+        memo=DryRunMemo(),
+    )
+    inputs = [(i,) for i in range(10)]
+    results = sim.run_and_assert(inputs, processes=2)
+    assert [i.args for i in results.simulate_inspectors] == inputs
+    assert [i.cost() for i in results.simulate_inspectors] == list(
+        map(fib_cost, inputs)
+    )
+    assert results.identities_inspectors is not None
+    assert [i.args for i in results.identities_inspectors] == inputs
+
+
+def test_clients_are_picklable(tmp_path):
+    def clone(x):
+        return pickle.loads(pickle.dumps(x))
+
+    algod = AlgodClient("a" * 64, "http://localhost:4001")
+
+    avm = AVMClient(logic_sig_version=7)
+    DryRunExecutor(avm, ExecutionMode.Application, SLOW_FIB).run_one((3,))
+    avm_clone = clone(avm)
+    assert avm_clone.logic_sig_version == 7
+    assert avm_clone._programs.keys() == avm._programs.keys()
+    assert DryRunExecutor(avm_clone, ExecutionMode.Application, SLOW_FIB).run_one(
+        (3,)
+    ).cost() == fib_cost((3,))
+
+    pool = AlgodPool([algod], max_failures=5)
+    pool_clone = clone(pool)
+    assert pool_clone.max_failures == 5
+    assert pool_clone.stats() == pool.stats()
+
+    cache = DryRunCache(algod, tmp_path / "cache", max_bytes=1234)
+    cache.hits, cache.misses = 3, 4
+    cache_clone = clone(cache)
+    assert cache_clone.directory == cache.directory and cache_clone.max_bytes == 1234
+    assert cache_clone.stats() == cache.stats()
+
+    simulate = SimulateClient(algod, max_workers=3)
+    simulate_clone = clone(simulate)
+    assert simulate_clone.max_workers == 3
+    assert simulate_clone.algod.algod_address == "http://localhost:4001"
+
+    memo = DryRunMemo(maxsize=10)
+    memo.put("key", "value")
+    assert memo.get("key") == "value" and memo.get("missing") is None
+    memo_clone = clone(memo)
+    assert memo_clone.info() == memo.info()
+    assert memo_clone.get("key") == "value"
+
+    cassette = DryRunCassette(tmp_path / "cassette.z", CassetteMode.record, algod=avm)
+    DryRunExecutor(cassette, ExecutionMode.Application, SLOW_FIB).run_sequence(
+        [(1,), (2,)]
+    )
+    cassette_clone = clone(cassette)
+    assert cassette_clone.mode == CassetteMode.record
+    assert cassette_clone.stats() == cassette.stats()
+    assert cassette_clone.stats()["responses"] == 2
+    for digest in cassette._responses:
+        assert cassette_clone.recorded(digest) == cassette.recorded(digest)
+
+    concurrency = AdaptiveConcurrency(initial=2, max_limit=4)
+    assert list(concurrency.map(lambda x: x + 1, range(10))) == list(range(1, 11))
+    concurrency_clone = clone(concurrency)
+    assert concurrency_clone.stats() == concurrency.stats()
+    assert concurrency_clone.stats()["requests"] == 10
+    assert list(concurrency_clone.map(lambda x: x * 2, range(3))) == [0, 2, 4]
@@ -0,0 +1,111 @@
+import pytest
+
+from graviton.avm import AVMClient
+from graviton.inspector import DryRunProperty as DRProp
+from graviton.invariant import PredicateKind
+from graviton.models import ExecutionMode
+from graviton.sim import Simulation
+
+SQUARE = """#pragma version 6
+arg 0
+btoi
+dup
+*"""
+
+# a buggy "square" which is off by one for inputs above 10
+BUGGY_SQUARE = """#pragma version 6
+arg 0
+btoi
+dup
+*
+arg 0
+btoi
+int 10
+>
++"""
+
+
+class CountingAVMClient(AVMClient):
+    def __init__(self):
+        super().__init__()
+        self.dryruns = 0
+
+    def dryrun(self, drr, **kwargs):
+        self.dryruns += 1
+        return super().dryrun(drr, **kwargs)
+
+
+def simulation(algod, teal, **kwargs):
+    return Simulation(
+        algod,
+        ExecutionMode.Signature,
+        teal,
+        {DRProp.stackTop: lambda args: args[0] ** 2},
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("max_workers", [None, 3])
+def test_fail_fast(max_workers):
+    algod = CountingAVMClient()
+    inputs = [(x,) for x in range(100)]
+    with pytest.raises(
+        AssertionError,
+        match=r"2 of 13 validated inputs failed, so 87 of 100 inputs were skipped",
+    ):
+        simulation(algod, BUGGY_SQUARE).run_and_assert(
+            inputs, max_failures=2, max_workers=max_workers
+        )
+    assert algod.dryruns < 13 + 2 * (max_workers or 1) + 1
+
+
+def test_fail_fast_generator_inputs():
+    algod = CountingAVMClient()
+    with pytest.raises(AssertionError, match="any remaining inputs were skipped"):
+        simulation(algod, BUGGY_SQUARE).run_and_assert(
+            ((x,) for x in range(10**9)), max_failures=1
+        )
+    assert algod.dryruns == 12
+
+
+@pytest.mark.parametrize(
+    "inputs", [[(x,) for x in range(12)], ((x,) for x in range(12))]
+)
+def test_fail_fast_exhausted_inputs_are_not_skipped(inputs):
+    with pytest.raises(AssertionError) as err:
+        simulation(AVMClient(), BUGGY_SQUARE).run_and_assert(inputs, max_failures=2)
+    assert "1 of 12 validated inputs failed:" in str(err.value)
+    assert "skipped" not in str(err.value)
+
+
+def test_fail_fast_identities_require_identical_pair():
+    sim = Simulation(
+        AVMClient(),
+        ExecutionMode.Signature,
+        SQUARE,
+        {DRProp.stackTop: lambda args: args[0] ** 2},
+        identities_teal=SQUARE,
+    )
+    with pytest.raises(AssertionError, match="Unhandled PredicateKind"):
+        sim.run_and_assert([(x,) for x in range(3)], max_failures=1)
+
+
+def test_fail_fast_success_and_identities():
+    algod = AVMClient()
+    inputs = [(x,) for x in range(20)]
+    results = simulation(algod, SQUARE).run_and_assert(inputs, max_failures=1)
+    assert results.succeeded
+    assert [i.stack_top() for i in results.simulate_inspectors] == [
+        x**2 for x in range(20)
+    ]
+    assert results.identities_inspectors is None
+
+    sim = Simulation(
+        algod,
+        ExecutionMode.Signature,
+        BUGGY_SQUARE,
+        {DRProp.stackTop: PredicateKind.IdenticalPair},
+        identities_teal=SQUARE,
+    )
+    with pytest.raises(AssertionError, match="1 of 12 validated"):
+        sim.run_and_assert(inputs, max_failures=1)
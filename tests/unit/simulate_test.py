@@ -0,0 +1,177 @@
+from base64 import b64encode
+import msgpack  # type: ignore
+import pytest
+from unittest.mock import Mock
+
+from algosdk import encoding
+from algosdk.error import AlgodHTTPError
+from algosdk.transaction import LogicSig, SuggestedParams
+from algosdk.v2client.algod import AlgodClient
+
+from graviton.blackbox import DryRunExecutor, DryRunTransactionParams
+from graviton.models import ExecutionMode
+from graviton.simulate import SimulateClient
+
+SENDER = encoding.encode_address(bytes(range(32)))
+
+# 1 + 2 with a scratch store along the way
+TEAL = """#pragma version 8
+int 1
+int 2
++
+return"""
+BYTECODE = b"\x08\x81\x01\x81\x02\x08\x43"
+SOURCE_MAP = {
+    "version": 3,
+    "sources": [],
+    "names": [],
+    "mappings": "AAAA;AACA;;AACA;;AACA;AACA",
+}
+
+APP_RESULT = {
+    "app-budget-added": 700,
+    "app-budget-consumed": 4,
+    "txn-results": [
+        {
+            "app-budget-consumed": 4,
+            "txn-result": {"logs": [b64encode(b"hi").decode()]},
+            "exec-trace": {
+                "approval-program-trace": [
+                    {"pc": 1, "stack-additions": [{"type": 2, "uint": 1}]},
+                    {
+                        "pc": 3,
+                        "stack-additions": [{"type": 2, "uint": 2}],
+                        "scratch-changes": [
+                            {"slot": 2, "new-value": {"type": 1, "bytes": "aGk="}}
+                        ],
+                    },
+                    {
+                        "pc": 5,
+                        "stack-pop-count": 2,
+                        "stack-additions": [{"type": 2, "uint": 3}],
+                    },
+                    {
+                        "pc": 6,
+                        "stack-pop-count": 1,
+                        "stack-additions": [{"type": 2, "uint": 3}],
+                    },
+                ]
+            },
+        }
+    ],
+}
+
+LSIG_FAILURE = {
+    "failed-at": [1],
+    "failure-message": "transaction ABC: rejected by logic err=assert failed pc=3. Details: pc=3, opcodes=assert",
+    "txn-results": [
+        {"txn-result": {}},
+        {
+            "exec-trace": {
+                "logic-sig-trace": [
+                    {"pc": 1, "stack-additions": [{"type": 2}]},
+                    {"pc": 3, "stack-pop-count": 1},
+                ]
+            }
+        },
+    ],
+}
+
+
+def fake_algod(simulate_result: dict, deployed: bool = False):
+    algod = Mock(AlgodClient)
+    algod.compile.return_value = {
+        "hash": "whatever",
+        "result": b64encode(BYTECODE).decode(),
+        "sourcemap": SOURCE_MAP,
+    }
+    algod.suggested_params.side_effect = lambda: SuggestedParams(
+        0, 10, 1010, b64encode(bytes(32)).decode(), "testnet", min_fee=1000
+    )
+    algod.algod_request.return_value = {"txn-groups": [simulate_result]}
+    if deployed:
+        algod.application_info.return_value = {
+            "params": {"approval-program": b64encode(BYTECODE).decode()}
+        }
+    else:
+        algod.application_info.side_effect = AlgodHTTPError("not found", 404)
+    return algod
+
+
+def simulated_txns(algod) -> list:
+    method, path = algod.algod_request.call_args.args
+    assert (method, path) == ("POST", "/transactions/simulate")
+    body = msgpack.unpackb(algod.algod_request.call_args.kwargs["data"], raw=False)
+    assert body["allow-empty-signatures"] is True
+    assert body["exec-trace-config"]["enable"] is True
+    return body["txn-groups"][0]["txns"]
+
+
+@pytest.mark.parametrize("deployed", [False, True])
+@pytest.mark.parametrize("compile_once", [False, True])
+def test_simulate_app(deployed, compile_once):
+    algod = fake_algod(APP_RESULT, deployed=deployed)
+    client = SimulateClient(algod, sender=SENDER)
+    dre = DryRunExecutor(
+        client,
+        ExecutionMode.Application,
+        TEAL + f"\n// {deployed=} {compile_once=}",
+        compile_once=compile_once,
+    )
+    txn_params = DryRunTransactionParams.for_app(index=42) if deployed else None
+    inspector = dre.run_one((b"x",), txn_params=txn_params)
+
+    algod.compile.assert_called_once()
+    (stxn,) = simulated_txns(algod)
+    txn = stxn["txn"]
+    assert txn["snd"] == encoding.decode_address(SENDER)
+    assert (txn["fv"], txn["lv"], txn["fee"]) == (10, 1010, 1000)
+    assert txn["apaa"] == [b"x"]
+    if deployed:
+        assert txn["apid"] == 42 and "apap" not in txn
+    else:
+        assert "apid" not in txn
+        assert txn["apap"] == BYTECODE
+        assert txn["apsu"] == b"\x08\x20\x01\x01\x22"
+
+    assert inspector.passed()
+    assert not inspector.error()
+    assert inspector.stack_top() == 3
+    assert inspector.max_stack_height() == 2
+    assert inspector.final_scratch() == {2: "0x6869"}
+    assert inspector.last_log() == b"hi".hex()
+    assert inspector.cost() == 4
+    assert inspector.budget_added() == 0
+
+    bbr = inspector.black_box_results
+    assert bbr.program_counters == [1, 3, 5, 6, 6]
+    assert bbr.teal_source_lines == ["int 1", "int 2", "+", "return", "return"]
+    assert bbr.stack_evolution == ["[]", "[1]", "[1, 2]", "[3]", "[3]"]
+
+
+def test_simulate_lsig_failure():
+    algod = fake_algod(LSIG_FAILURE)
+    client = SimulateClient(algod, sender=SENDER)
+    inspector = DryRunExecutor(client, ExecutionMode.Signature, TEAL).run_one((b"x",))
+
+    payer, lsig_txn = simulated_txns(algod)
+    assert payer["txn"]["snd"] == payer["txn"]["rcv"] == encoding.decode_address(SENDER)
+    assert payer["txn"]["fee"] == 2000
+    assert payer["txn"]["grp"] == lsig_txn["txn"]["grp"]
+    assert lsig_txn["txn"]["snd"] == encoding.decode_address(
+        LogicSig(BYTECODE).address()
+    )
+    assert "fee" not in lsig_txn["txn"]
+    assert lsig_txn["lsig"] == {"l": BYTECODE, "arg": [b"x"]}
+
+    assert inspector.rejected()
+    assert inspector.error(contains="assert failed pc=3")
+    assert inspector.black_box_results.stack_evolution == ["[]", "[0]", "[]"]
+    assert inspector.black_box_results.teal_source_lines[-1] == "assert failed pc=3"
+
+
+def test_simulate_failure_outside_program():
+    result = dict(LSIG_FAILURE, **{"failed-at": [0]})
+    client = SimulateClient(fake_algod(result), sender=SENDER)
+    with pytest.raises(AssertionError, match="not under test"):
+        DryRunExecutor(client, ExecutionMode.Signature, TEAL).run_one((b"x",))
@@ -0,0 +1,64 @@
+import pickle
+
+import pytest
+
+from algosdk.error import AlgodHTTPError
+
+from graviton.blackbox import DryRunExecutor
+from graviton.models import ExecutionMode
+from graviton.transport import KeepAliveAlgodClient
+
+from tests.algod_stub import StandInAlgod
+
+
+@pytest.fixture
+def stand_in():
+    with StandInAlgod() as stand_in:
+        yield stand_in
+
+
+@pytest.mark.parametrize("max_workers", [None, 4])
+def test_connections_are_reused(stand_in, max_workers):
+    with stand_in.client(keep_alive=True) as algod:
+        dre = DryRunExecutor(algod, ExecutionMode.Application, "fake teal")
+        inputs = [(f"input {i}",) for i in range(20)]
+        inspectors = dre.run_sequence(inputs, max_workers=max_workers)
+
+    assert [i.last_log() for i in inspectors] == [a.encode().hex() for a, in inputs]
+    assert algod.connections_opened == stand_in.connections
+    assert stand_in.connections <= (max_workers or 1)
+
+
+def test_stale_connection_is_replaced(stand_in):
+    stand_in.hang_up = True
+    algod = stand_in.client(keep_alive=True)
+    dre = DryRunExecutor(algod, ExecutionMode.Signature, "fake teal")
+    for i in range(3):
+        assert (
+            dre.run_one((f"run {i}",)).stack_top() == "0x" + f"run {i}".encode().hex()
+        )
+    assert algod.connections_opened == 3
+
+
+def test_http_errors(stand_in):
+    algod = KeepAliveAlgodClient("wrong token", stand_in.address)
+    with pytest.raises(AlgodHTTPError, match="Invalid API Token") as e:
+        DryRunExecutor(algod, ExecutionMode.Signature, "fake teal").run_one(("x",))
+    assert e.value.code == 401
+
+    # the connection survives the error response:
+    with pytest.raises(AlgodHTTPError):
+        algod.algod_request("POST", "/nowhere", data=b"")
+    assert algod.connections_opened == 1
+
+
+def test_pickle(stand_in):
+    algod = stand_in.client(keep_alive=True)
+    algod.algod_request("POST", "/teal/dryrun", data=b"\x81\xa4txns\x90")
+    clone = pickle.loads(pickle.dumps(algod))
+    assert clone.algod_address == stand_in.address and clone._idle == []
+    assert clone.algod_request("POST", "/teal/dryrun", data=b"\x81\xa4txns\x90") == {
+        "error": "",
+        "protocol-version": "future",
+        "txns": [],
+    }